@@ -0,0 +1,125 @@
+from typing import Callable
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.metrics import registry
+from app.services.auth import verify_access_token
+from app.services.rate_limit import TokenBucketLimiter
+
+# Limited per client IP, they are open to anyone and end up in bcrypt
+AUTH_PATHS = frozenset({"/api/v1/login", "/api/v1/register"})
+# Streams would hold an in-flight slot for as long as they are open, and
+# metrics have to stay readable while load is being shed
+EXEMPT_PATHS = frozenset({"/api/v1/tasks/stream", "/metrics"})
+EXEMPT_PREFIXES = ("/api/v1/internal/",)
+
+rejections_total = registry.counter(
+    "admission_rejections_total",
+    "Requests turned away by admission control or rate limits",
+    labelnames=("reason",),
+)
+
+
+class AdmissionControlMiddleware:
+    """Sheds load before it reaches the database pool or the password hasher
+
+    Requests are refused with 503 while `max_in_flight` are already being
+    served in this process, or while some database checkout has been waiting
+    longer than `max_pool_wait` seconds. Those admitted then take a token from
+    their client's bucket: the user named by a valid bearer token's `sub`,
+    and the client IP on login and registration. An empty bucket answers 429.
+    Both carry a Retry-After.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        user_limiter: TokenBucketLimiter | None = None,
+        auth_limiter: TokenBucketLimiter | None = None,
+        max_in_flight: int = 0,
+        max_pool_wait: float = 0,
+        pool_wait: Callable[[], float] = lambda: 0.0,
+        retry_after: int = 1,
+    ) -> None:
+        self.app = app
+        self.user_limiter = user_limiter
+        self.auth_limiter = auth_limiter
+        self.max_in_flight = max_in_flight
+        self.max_pool_wait = max_pool_wait
+        self.pool_wait = pool_wait
+        self.retry_after = retry_after
+        self.in_flight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or path in EXEMPT_PATHS
+            or path.startswith(EXEMPT_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        overload = self._overload()
+        if overload:
+            rejections_total.inc(reason=overload)
+            response = JSONResponse(
+                {"detail": "Server is busy, try again later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            limit, wait = await self._rate_limit(scope)
+            if wait:
+                rejections_total.inc(reason=limit)
+                response = JSONResponse(
+                    {"detail": "Too many requests"},
+                    status_code=429,
+                    headers={"Retry-After": str(wait)},
+                )
+                await response(scope, receive, send)
+                return
+
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    def _overload(self) -> str | None:
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return "in_flight"
+        if self.max_pool_wait and self.pool_wait() >= self.max_pool_wait:
+            return "pool_wait"
+
+        return None
+
+    async def _rate_limit(self, scope: Scope) -> tuple[str | None, int]:
+        """The limit the request ran into and the seconds to wait, or (None, 0)"""
+        client = scope.get("client")
+        if self.auth_limiter and scope["path"] in AUTH_PATHS and client:
+            wait = await self.auth_limiter.check(client[0])
+            if wait:
+                return self.auth_limiter.name, wait
+
+        subject = self._subject(scope)
+        if self.user_limiter and subject:
+            wait = await self.user_limiter.check(subject)
+            if wait:
+                return self.user_limiter.name, wait
+
+        return None, 0
+
+    @staticmethod
+    def _subject(scope: Scope) -> str | None:
+        """The `sub` of a valid bearer token, invalid ones are left for the route to reject"""
+        scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+
+        payload = verify_access_token(token)
+        return payload.get("sub") if payload else None
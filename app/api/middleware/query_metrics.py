@@ -0,0 +1,88 @@
+import time
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.db.instrumentation import RequestQueryStats, current_query_stats
+from app.metrics import registry
+
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+requests_total = registry.counter(
+    "http_requests_total", "HTTP requests served", labelnames=("method", "route")
+)
+request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Time spent serving HTTP requests",
+    labelnames=("method", "route"),
+)
+db_statements_per_request = registry.histogram(
+    "db_statements_per_request",
+    "SQL statements issued while serving one request",
+    labelnames=("method", "route"),
+    buckets=STATEMENT_BUCKETS,
+)
+db_time_seconds_total = registry.counter(
+    "db_time_seconds_total",
+    "Time spent executing SQL statements",
+    labelnames=("method", "route"),
+)
+db_rows_total = registry.counter(
+    "db_rows_total",
+    "Rows returned or affected by SQL statements",
+    labelnames=("method", "route"),
+)
+
+# route -> (duration, statement shape) of the slowest statement seen so far
+slowest_statements: dict[tuple[str, str], tuple[float, str]] = {}
+
+registry.gauge(
+    "db_slowest_statement_seconds",
+    "Duration of the slowest SQL statement seen per route",
+    callback=lambda: {
+        key: duration for key, (duration, _) in slowest_statements.items()
+    },
+    labelnames=("method", "route"),
+)
+
+
+class QueryMetricsMiddleware:
+    """Attributes the SQL statements issued during a request to its route template"""
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 0) -> None:
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(self.n_plus_one_threshold)
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_query_stats.reset(token)
+            self._record(scope, stats, time.perf_counter() - started)
+
+    @staticmethod
+    def _record(scope: Scope, stats: RequestQueryStats, duration: float) -> None:
+        # The router stores the matched route in the scope, unmatched paths are
+        # grouped together to keep the label set bounded
+        route = getattr(scope.get("route"), "path", "<unmatched>")
+        labels = {"method": scope["method"], "route": route}
+
+        requests_total.inc(**labels)
+        request_duration_seconds.observe(duration, **labels)
+        db_statements_per_request.observe(stats.statements, **labels)
+        db_time_seconds_total.inc(stats.db_time, **labels)
+        db_rows_total.inc(stats.rows, **labels)
+
+        key = (scope["method"], route)
+        if (
+            stats.slowest_statement
+            and stats.slowest_time > slowest_statements.get(key, (0.0, ""))[0]
+        ):
+            slowest_statements[key] = (stats.slowest_time, stats.slowest_statement)
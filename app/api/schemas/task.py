@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, Field, field_validator
 
 from app.db.common.enums import PriorityEnum, StatusEnum
 
@@ -24,9 +26,113 @@ class TaskUpdate(TaskBase):
     priority: PriorityEnum | None = None
 
 
+class TaskVersionedUpdate(TaskUpdate):
+    # The version the change was based on, it is rejected if the task has
+    # moved on since
+    version: int | None = None
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int
+
+
 class TaskResponse(TaskBase):
     id: int
     responsible_person_id: int
+    version: int
 
     class Config:
         orm_mode = True
+
+
+class TaskFilter(BaseModel):
+    status: StatusEnum | None = None
+    priority: PriorityEnum | None = None
+    responsible_person_id: int | None = None
+    assignee_id: int | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    updated_after: datetime | None = None
+    updated_before: datetime | None = None
+
+
+class TaskPageResponse(BaseModel):
+    items: list[TaskResponse]
+    next_cursor: str | None = None
+
+
+class TaskSearchHit(BaseModel):
+    task: TaskResponse
+    rank: float
+
+
+class TaskSearchPageResponse(BaseModel):
+    items: list[TaskSearchHit]
+    next_cursor: str | None = None
+
+
+class TaskBulkItemError(BaseModel):
+    index: int
+    detail: str
+
+
+class TaskBulkResponse(BaseModel):
+    items: list[TaskResponse]
+    errors: list[TaskBulkItemError]
+
+
+class TaskAssignmentRequest(BaseModel):
+    task_ids: list[int] = Field(..., min_length=1)
+    user_ids: list[int] = Field(..., min_length=1)
+
+
+class TaskAssigneesResponse(BaseModel):
+    task_id: int
+    assignee_ids: list[int]
+
+
+class TaskAssignmentResponse(BaseModel):
+    items: list[TaskAssigneesResponse]
+    skipped_task_ids: list[int]
+    skipped_user_ids: list[int]
+
+
+class TaskImportItem(TaskCreate):
+    title: str = Field(..., max_length=255)
+    description: str | None = None
+    assignee_ids: list[int] = []
+
+    @field_validator("assignee_ids", mode="before")
+    @classmethod
+    def split_assignee_ids(cls, value):
+        # CSV exports list assignee ids separated by spaces
+        if isinstance(value, str):
+            return value.split()
+        return value
+
+
+class TaskImportRowError(BaseModel):
+    row: int
+    detail: str
+
+
+class TaskImportResponse(BaseModel):
+    imported: int
+    rejected_count: int
+    rejected: list[TaskImportRowError]
+
+
+class TaskPurgeResponse(BaseModel):
+    deleted: int
+
+
+class TaskStatsItem(BaseModel):
+    status: StatusEnum
+    priority: PriorityEnum
+    count: int
+
+
+class TaskStatsResponse(BaseModel):
+    user_id: int
+    responsible: list[TaskStatsItem]
+    assigned: list[TaskStatsItem]
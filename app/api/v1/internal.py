@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.api.middleware.query_metrics import slowest_statements
+from app.db.common.enums import RoleEnum
+from app.db.main import database
+from app.db.pool import checkout_timeouts_total, checkout_wait_seconds
+from app.metrics import registry
+from app.services.auth import role_required
+
+router = APIRouter(prefix="/api/v1/internal", tags=["Internal"])
+metrics_router = APIRouter(tags=["Internal"])
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return registry.render_prometheus()
+
+
+@router.get("/db/pool")
+async def get_pool_stats(
+    current_user: dict = Depends(role_required(RoleEnum.ADMIN)),
+):
+    return {
+        name: {
+            **stats,
+            "checkout_timeouts": checkout_timeouts_total.get(pool=name),
+            "checkout_wait_seconds": checkout_wait_seconds.snapshot(pool=name),
+        }
+        for name, stats in database.pool_stats().items()
+    }
+
+
+@router.get("/db/slow-statements")
+async def get_slow_statements(
+    current_user: dict = Depends(role_required(RoleEnum.ADMIN)),
+):
+    return [
+        {"method": method, "route": route, "seconds": seconds, "statement": statement}
+        for (method, route), (seconds, statement) in sorted(
+            slowest_statements.items(), key=lambda item: item[1][0], reverse=True
+        )
+    ]
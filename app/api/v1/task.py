@@ -1,15 +1,110 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Literal
 
-from app.api.schemas.task import TaskCreate, TaskResponse, TaskUpdate
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+from app.api.schemas.task import (
+    TaskAssignmentRequest,
+    TaskAssignmentResponse,
+    TaskBulkResponse,
+    TaskBulkUpdateItem,
+    TaskCreate,
+    TaskFilter,
+    TaskImportItem,
+    TaskImportResponse,
+    TaskPageResponse,
+    TaskPurgeResponse,
+    TaskResponse,
+    TaskSearchPageResponse,
+    TaskVersionedUpdate,
+)
 from app.db.common.enums import RoleEnum, StatusEnum
 from app.services.auth import get_current_user, role_required
-from app.services.exceptions.task import TaskNotFoundException
-from app.services.task import BaseTaskService, get_task_service
+from app.services.exceptions.pagination import InvalidCursorError
+from app.services.exceptions.task import (
+    TaskNotFoundException,
+    TaskVersionConflictException,
+)
+from app.services.exceptions.user import UserNotFoundError
+from app.services.task import BaseTaskService, get_read_task_service, get_task_service
+from app.services.task_export import stream_task_export
+from app.services.task_feed import TaskFeedFilter, stream_task_events, task_feed
+from app.services.task_import import TaskImportReader
 from app.services.user import BaseUserService, get_user_service
+from app.settings.config import get_config
+
+config = get_config()
 
 router = APIRouter(prefix="/api/v1", tags=["Tasks"])
 
 
+def _validate_batch(
+    items: list[dict[str, Any]], schema: type[BaseModel]
+) -> tuple[list[tuple[int, BaseModel]], list[dict]]:
+    """Validate every item of a bulk request on its own so one bad item does not reject the batch"""
+    valid, errors = [], []
+
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            detail = "; ".join(
+                f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )
+            errors.append({"index": index, "detail": detail})
+
+    return valid, errors
+
+
+def _task_etag(task_id: int, version: int) -> str:
+    # Strong validator: the version changes on every write to the row
+    return f'"{task_id}-{version}"'
+
+
+def _parse_task_etag(etag: str) -> tuple[int, int] | None:
+    task_id, _, version = etag.strip('"').partition("-")
+    try:
+        return int(task_id), int(version)
+    except ValueError:
+        return None
+
+
+def _etags(header: str) -> list[str]:
+    return [etag.strip() for etag in header.split(",") if etag.strip()]
+
+
+def _matching_version(if_match: str, task_id: int) -> int | None:
+    """The version an If-Match header expects for the task, if it names one"""
+    for etag in _etags(if_match):
+        # If-Match uses strong comparison, so weak validators never match
+        version = None if etag.startswith("W/") else _parse_task_etag(etag)
+        if version and version[0] == task_id:
+            return version[1]
+
+    return None
+
+
+async def _current_user_id(current_user: dict, user_service: BaseUserService) -> int:
+    # Tokens issued before user_id was added to the claims still carry only the username
+    if "user_id" in current_user:
+        return current_user["user_id"]
+
+    user = await user_service.get_by_username(username=current_user["sub"])
+    return user.id
+
+
 @router.post("/tasks", response_model=TaskCreate)
 async def create_task(
     task: TaskCreate,
@@ -17,13 +112,12 @@ async def create_task(
     task_service: BaseTaskService = Depends(get_task_service),
     user_service: BaseUserService = Depends(get_user_service),
 ):
-    user = await user_service.get_by_username(username=current_user["sub"])
-    print(user)
+    responsible_person_id = await _current_user_id(current_user, user_service)
     try:
         return await task_service.create_task(
             title=task.title,
             description=task.description,
-            responsible_person_id=user.id,
+            responsible_person_id=responsible_person_id,
             status=task.status,
             priority=task.priority,
         )
@@ -31,33 +125,318 @@ async def create_task(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/tasks/{task_id}", response_model=TaskResponse)
+@router.post("/tasks/bulk", response_model=TaskBulkResponse)
+async def create_tasks(
+    items: list[dict[str, Any]] = Body(..., max_length=config.TASK_BULK_MAX_SIZE),
+    current_user: dict = Depends(get_current_user),
+    task_service: BaseTaskService = Depends(get_task_service),
+    user_service: BaseUserService = Depends(get_user_service),
+):
+    valid, errors = _validate_batch(items, TaskCreate)
+    responsible_person_id = await _current_user_id(current_user, user_service)
+
+    try:
+        created = await task_service.create_tasks(
+            responsible_person_id=responsible_person_id,
+            tasks=[task.dict() for _, task in valid],
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return {"items": created, "errors": errors}
+
+
+@router.patch("/tasks/bulk", response_model=TaskBulkResponse)
+async def update_tasks(
+    items: list[dict[str, Any]] = Body(..., max_length=config.TASK_BULK_MAX_SIZE),
+    task_service: BaseTaskService = Depends(get_task_service),
+    current_user: dict = Depends(role_required(RoleEnum.MANAGER)),
+):
+    valid, errors = _validate_batch(items, TaskBulkUpdateItem)
+
+    updates, indexes = [], {}
+    for index, item in valid:
+        if item.id in indexes:
+            errors.append({"index": index, "detail": "Duplicate task id in batch"})
+            continue
+        indexes[item.id] = index
+        updates.append(item.dict(exclude_unset=True))
+
+    try:
+        updated, missing_ids = await task_service.update_tasks(updates=updates)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    errors.extend(
+        {"index": indexes[task_id], "detail": f"Task with id {task_id} not found"}
+        for task_id in missing_ids
+    )
+    errors.sort(key=lambda error: error["index"])
+
+    return {"items": updated, "errors": errors}
+
+
+@router.post("/tasks/import", response_model=TaskImportResponse)
+async def import_tasks(
+    file: UploadFile,
+    format: Literal["ndjson", "csv"] | None = None,
+    current_user: dict = Depends(get_current_user),
+    task_service: BaseTaskService = Depends(get_task_service),
+    user_service: BaseUserService = Depends(get_user_service),
+):
+    if format is None:
+        format = "csv" if (file.filename or "").lower().endswith(".csv") else "ndjson"
+
+    responsible_person_id = await _current_user_id(current_user, user_service)
+    reader = TaskImportReader(file.file, format)
+    rejected, rejected_count = [], 0
+
+    def reject(errors: list[dict]) -> None:
+        nonlocal rejected_count
+        rejected_count += len(errors)
+        rejected.extend(errors[: config.TASK_IMPORT_MAX_REJECTED - len(rejected)])
+
+    async def batches():
+        # Parsing and validation are CPU bound, keep them off the event loop
+        while True:
+            records, errors = await run_in_threadpool(
+                reader.read_batch, config.TASK_IMPORT_BATCH_SIZE
+            )
+            if not records and not errors:
+                return
+
+            valid, invalid = await run_in_threadpool(
+                _validate_batch, [record for _, record in records], TaskImportItem
+            )
+            reject(errors)
+            reject(
+                [
+                    {"row": records[error["index"]][0], "detail": error["detail"]}
+                    for error in invalid
+                ]
+            )
+            if valid:
+                yield [
+                    (
+                        records[index][0],
+                        task.title,
+                        task.description,
+                        task.status.name,
+                        task.priority.name,
+                        task.assignee_ids,
+                    )
+                    for index, task in valid
+                ]
+
+    try:
+        imported, unknown_assignee_rows = await task_service.import_tasks(
+            responsible_person_id=responsible_person_id, batches=batches()
+        )
+    except UnicodeDecodeError as e:
+        raise HTTPException(
+            status_code=400, detail=f"Upload is not valid UTF-8: {e.reason}"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    reject(
+        [
+            {"row": row, "detail": "assignee_ids: unknown user"}
+            for row in unknown_assignee_rows
+        ]
+    )
+    rejected.sort(key=lambda error: error["row"])
+
+    return {
+        "imported": imported,
+        "rejected_count": rejected_count,
+        "rejected": rejected,
+    }
+
+
+@router.get("/tasks", response_model=TaskPageResponse)
+async def list_tasks(
+    filters: TaskFilter = Depends(),
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user),
+    task_service: BaseTaskService = Depends(get_read_task_service),
+):
+    try:
+        tasks, next_cursor = await task_service.list_tasks(
+            limit=limit, cursor=cursor, **filters.dict(exclude_none=True)
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"items": tasks, "next_cursor": next_cursor}
+
+
+@router.delete("/tasks", response_model=TaskPurgeResponse)
+async def purge_tasks(
+    filters: TaskFilter = Depends(),
+    task_service: BaseTaskService = Depends(get_task_service),
+    current_user: dict = Depends(role_required(RoleEnum.ADMIN)),
+):
+    filters = filters.dict(exclude_none=True)
+    if not filters:
+        raise HTTPException(
+            status_code=422, detail="At least one filter is required to purge tasks"
+        )
+
+    deleted = await task_service.purge_tasks(
+        batch_size=config.TASK_PURGE_BATCH_SIZE, **filters
+    )
+    return {"deleted": deleted}
+
+
+@router.get("/tasks/stream")
+async def stream_task_changes(
+    task_id: list[int] = Query([]),
+    responsible_person_id: int | None = None,
+    assignee_id: int | None = None,
+    current_user: dict = Depends(get_current_user),
+):
+    if not task_feed.running:
+        raise HTTPException(status_code=503, detail="Task change feed is disabled")
+
+    filter = TaskFeedFilter(
+        task_ids=frozenset(task_id),
+        responsible_person_id=responsible_person_id,
+        assignee_id=assignee_id,
+    )
+    return StreamingResponse(
+        stream_task_events(task_feed, filter, config.TASK_FEED_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they come
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/tasks/search", response_model=TaskSearchPageResponse)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=256),
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user),
+    task_service: BaseTaskService = Depends(get_read_task_service),
+):
+    try:
+        hits, next_cursor = await task_service.search_tasks(
+            query=q, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "items": [{"task": task, "rank": rank} for task, rank in hits],
+        "next_cursor": next_cursor,
+    }
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("/tasks/export")
+async def export_tasks(
+    filters: TaskFilter = Depends(),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    current_user: dict = Depends(get_current_user),
+):
+    headers = {"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        stream_task_export(
+            format,
+            gzip,
+            fetch_size=config.TASK_EXPORT_FETCH_SIZE,
+            **filters.dict(exclude_none=True),
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+
+@router.get(
+    "/tasks/{task_id}",
+    response_model=TaskResponse,
+    responses={304: {"description": "The task matches If-None-Match"}},
+)
 async def get_task(
     task_id: int,
+    response: Response,
+    if_none_match: str | None = Header(None),
     current_user: dict = Depends(get_current_user),
-    task_service: BaseTaskService = Depends(get_task_service),
+    task_service: BaseTaskService = Depends(get_read_task_service),
 ):
     try:
-        return await task_service.get_task_by_id(task_id=task_id)
+        if if_none_match:
+            # Answered from the row version alone, the task is not loaded
+            etag = _task_etag(
+                task_id, await task_service.get_task_version(task_id=task_id)
+            )
+            candidates = {
+                candidate.removeprefix("W/") for candidate in _etags(if_none_match)
+            }
+            if etag in candidates or "*" in candidates:
+                return Response(status_code=304, headers={"ETag": etag})
+
+        task = await task_service.get_task_by_id(task_id=task_id)
+        response.headers["ETag"] = _task_etag(task.id, task.version)
+        return task
     except TaskNotFoundException as e:
-        raise TaskNotFoundException(task_id)
+        raise HTTPException(status_code=404, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.put("/tasks/{task_id}", response_model=TaskResponse)
+@router.put(
+    "/tasks/{task_id}",
+    response_model=TaskResponse,
+    responses={
+        409: {"description": "The task is no longer at the version in the body"},
+        412: {"description": "The task no longer matches If-Match"},
+    },
+)
 async def update_task(
     task_id: int,
-    task_update: TaskUpdate,
+    task_update: TaskVersionedUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
     task_service: BaseTaskService = Depends(get_task_service),
     current_user: dict = Depends(role_required(RoleEnum.MANAGER)),
 ):
+    changes = task_update.dict(exclude_unset=True)
+    expected_version = changes.pop("version", None)
+    precondition = bool(if_match) and if_match.strip() != "*"
+
+    if precondition:
+        matched_version = _matching_version(if_match, task_id)
+        if matched_version is None or expected_version not in (
+            None,
+            matched_version,
+        ):
+            raise HTTPException(status_code=412, detail="Precondition failed")
+        expected_version = matched_version
+
     try:
-        return await task_service.update_task(
-            task_id=task_id, **task_update.dict(exclude_unset=True)
+        task = await task_service.update_task(
+            task_id=task_id, expected_version=expected_version, **changes
+        )
+        response.headers["ETag"] = _task_etag(task.id, task.version)
+        return task
+    except TaskVersionConflictException as e:
+        # If-Match is a precondition, a version in the body is an edit conflict
+        raise HTTPException(
+            status_code=412 if precondition else 409,
+            detail=e.message,
+            headers={"ETag": _task_etag(task_id, e.current_version)},
         )
     except TaskNotFoundException as e:
-        raise TaskNotFoundException(task_id)
+        raise HTTPException(status_code=404, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -72,7 +451,7 @@ async def delete_task(
         await task_service.delete_task(task_id=task_id)
         return {"message": "Task deleted successfully"}
     except TaskNotFoundException as e:
-        raise TaskNotFoundException(task_id)
+        raise HTTPException(status_code=404, detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -84,7 +463,63 @@ async def assign_task(
     task_service: BaseTaskService = Depends(get_task_service),
     current_user: dict = Depends(role_required(RoleEnum.MANAGER)),
 ):
-    return await task_service.assign_task(task_id=task_id, user_id=user_id)
+    try:
+        return await task_service.assign_task(task_id=task_id, user_id=user_id)
+    except TaskNotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
+    except UserNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+def _check_assignment_size(assignment: TaskAssignmentRequest) -> None:
+    pairs = len(set(assignment.task_ids)) * len(set(assignment.user_ids))
+    if pairs > config.TASK_BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {config.TASK_BULK_MAX_SIZE} task/user pairs per request",
+        )
+
+
+@router.post("/tasks/assign", response_model=TaskAssignmentResponse)
+async def assign_users(
+    assignment: TaskAssignmentRequest,
+    task_service: BaseTaskService = Depends(get_task_service),
+    current_user: dict = Depends(role_required(RoleEnum.MANAGER)),
+):
+    _check_assignment_size(assignment)
+    assignees, skipped_task_ids, skipped_user_ids = await task_service.assign_users(
+        task_ids=assignment.task_ids, user_ids=assignment.user_ids
+    )
+
+    return {
+        "items": [
+            {"task_id": task_id, "assignee_ids": user_ids}
+            for task_id, user_ids in assignees.items()
+        ],
+        "skipped_task_ids": skipped_task_ids,
+        "skipped_user_ids": skipped_user_ids,
+    }
+
+
+@router.post("/tasks/unassign", response_model=TaskAssignmentResponse)
+async def unassign_users(
+    assignment: TaskAssignmentRequest,
+    task_service: BaseTaskService = Depends(get_task_service),
+    current_user: dict = Depends(role_required(RoleEnum.MANAGER)),
+):
+    _check_assignment_size(assignment)
+    assignees, skipped_task_ids, skipped_user_ids = await task_service.unassign_users(
+        task_ids=assignment.task_ids, user_ids=assignment.user_ids
+    )
+
+    return {
+        "items": [
+            {"task_id": task_id, "assignee_ids": user_ids}
+            for task_id, user_ids in assignees.items()
+        ],
+        "skipped_task_ids": skipped_task_ids,
+        "skipped_user_ids": skipped_user_ids,
+    }
 
 
 @router.put("/tasks/{task_id}/status", response_model=TaskResponse)
@@ -94,4 +529,9 @@ async def change_task_status(
     task_service: BaseTaskService = Depends(get_task_service),
     current_user: dict = Depends(get_current_user),
 ):
-    return await task_service.change_task_status(task_id=task_id, new_status=new_status)
+    try:
+        return await task_service.change_task_status(
+            task_id=task_id, new_status=new_status
+        )
+    except TaskNotFoundException as e:
+        raise HTTPException(status_code=404, detail=e.message)
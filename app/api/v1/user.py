@@ -2,14 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.exc import IntegrityError
 
+from app.api.schemas.task import TaskStatsResponse
 from app.api.schemas.token import RefreshTokenResponseSchema, TokenResponseSchema
 from app.api.schemas.user import UserRegisterSchema, UserResponseSchema
+from app.db.common.enums import TaskRoleEnum
 from app.services.auth import (
     create_access_token,
     create_refresh_token,
     decode_access_token,
+    get_current_user,
 )
+from app.services.exceptions.hashing import HashingUnavailableError
 from app.services.exceptions.user import InvalidCredentialsError, UserNotFoundError
+from app.services.task import BaseTaskService, get_read_task_service
 from app.services.user import BaseUserService, get_user_service
 
 router = APIRouter(prefix="/api/v1", tags=["Users"])
@@ -38,6 +43,12 @@ async def register(
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except HashingUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
 
 
 @router.post("/login", response_model=TokenResponseSchema)
@@ -49,18 +60,13 @@ async def login(
         authenticated_user = await user_service.authenticate_user(
             form_data.username, form_data.password
         )
-        access_token = create_access_token(
-            data={
-                "sub": authenticated_user.username,
-                "role": authenticated_user.role.value,
-            }
-        )
-        refresh_token = create_refresh_token(
-            data={
-                "sub": authenticated_user.username,
-                "role": authenticated_user.role.value,
-            }
-        )
+        claims = {
+            "sub": authenticated_user.username,
+            "user_id": authenticated_user.id,
+            "role": authenticated_user.role.value,
+        }
+        access_token = create_access_token(data=claims)
+        refresh_token = create_refresh_token(data=claims)
 
         return TokenResponseSchema(
             access_token=access_token, refresh_token=refresh_token, token_type="bearer"
@@ -73,6 +79,12 @@ async def login(
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except HashingUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -92,9 +104,11 @@ async def refresh_token(refresh_token: str):
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        new_access_token = create_access_token(
-            data={"sub": payload["sub"], "role": payload["role"]}
-        )
+        claims = {"sub": payload["sub"], "role": payload["role"]}
+        if "user_id" in payload:
+            claims["user_id"] = payload["user_id"]
+
+        new_access_token = create_access_token(data=claims)
 
         return RefreshTokenResponseSchema(
             access_token=new_access_token, token_type="bearer"
@@ -104,3 +118,21 @@ async def refresh_token(refresh_token: str):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred during token refresh {e}",
         )
+
+
+@router.get("/users/{user_id}/task-stats", response_model=TaskStatsResponse)
+async def get_user_task_stats(
+    user_id: int,
+    current_user: dict = Depends(get_current_user),
+    task_service: BaseTaskService = Depends(get_read_task_service),
+):
+    try:
+        stats = await task_service.get_task_stats(user_id)
+    except UserNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    return {
+        "user_id": user_id,
+        "responsible": stats[TaskRoleEnum.RESPONSIBLE],
+        "assigned": stats[TaskRoleEnum.ASSIGNEE],
+    }
@@ -0,0 +1,95 @@
+"""Move tasks that have been done for a while to the monthly partitioned archive.
+
+    python -m app.commands.archive_tasks
+    python -m app.commands.archive_tasks --after-days 180 --max-batches 100
+
+Tasks move in batches, each in its own transaction, with a pause between
+them. An interrupted run loses at most the batch in flight, and the next
+run carries on where it stopped. Tasks locked by a writer are skipped and
+left for the next run. Archived tasks can still be fetched and listed, but
+no longer updated.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import timedelta
+
+from app.db.main import database
+from app.repositories.task_archive import TaskArchiveRepository
+from app.settings.config import get_config
+
+config = get_config()
+
+
+async def archive(
+    after_days: int, batch_size: int, pause: float, max_batches: int | None
+) -> int:
+    async with database.get_session() as session:
+        repository = TaskArchiveRepository(session)
+        # Fixed for the whole run, so every batch fits the partitions made for it
+        cutoff = await repository.get_cutoff(timedelta(days=after_days))
+        for name in await repository.ensure_partitions(cutoff):
+            print(f"Created partition {name}")
+
+    archived = batches = 0
+    started = time.monotonic()
+    while max_batches is None or batches < max_batches:
+        # A fresh session per batch, so no connection is held while pausing
+        async with database.get_session() as session:
+            moved = await TaskArchiveRepository(session).archive_batch(
+                cutoff, batch_size
+            )
+        archived += moved
+        batches += 1
+
+        if moved < batch_size:
+            break
+        await asyncio.sleep(pause)
+
+    print(
+        f"Archived {archived} tasks done before {cutoff:%Y-%m-%d %H:%M} "
+        f"in {batches} batches, {time.monotonic() - started:.1f}s"
+    )
+    return 0
+
+
+async def run(args: argparse.Namespace) -> int:
+    try:
+        return await archive(
+            args.after_days, args.batch_size, args.pause, args.max_batches
+        )
+    finally:
+        await database.dispose()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--after-days",
+        type=int,
+        default=config.TASK_ARCHIVE_AFTER_DAYS,
+        help="archive tasks done at least this many days ago",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=config.TASK_ARCHIVE_BATCH_SIZE,
+        help="tasks moved per transaction",
+    )
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=config.TASK_ARCHIVE_PAUSE_SECONDS,
+        help="seconds to wait between batches",
+    )
+    parser.add_argument("--max-batches", type=int, help="stop after this many batches")
+    return parser.parse_args()
+
+
+def main() -> None:
+    sys.exit(asyncio.run(run(parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Check the task_counters table against tasks and task_assignee, or fix it.
+
+    python -m app.commands.task_counters verify
+    python -m app.commands.task_counters rebuild
+
+`verify` lists counters that are off and exits with status 1 if there are
+any, without blocking writes. `rebuild` overwrites them with the actual
+counts, holding a SHARE lock on the task tables meanwhile, so writes to
+tasks wait for it to finish.
+"""
+import argparse
+import asyncio
+import sys
+
+from app.db.main import database
+from app.repositories.task_counter import TaskCounterRepository
+
+
+async def verify(limit: int) -> int:
+    async with database.get_session() as session:
+        mismatches = await TaskCounterRepository(session).find_mismatches(limit)
+
+    for row in mismatches:
+        print(
+            f"user {row.user_id} {row.role.name} {row.status.name} "
+            f"{row.priority.name}: stored {row.stored}, actual {row.actual}"
+        )
+    print(
+        f"{len(mismatches)}{'+' if len(mismatches) == limit else ''} "
+        "counters out of step"
+    )
+
+    return 1 if mismatches else 0
+
+
+async def rebuild() -> int:
+    async with database.get_session() as session:
+        repaired = await TaskCounterRepository(session).repair()
+
+    print(f"Repaired {repaired} counters")
+    return 0
+
+
+async def run(args: argparse.Namespace) -> int:
+    try:
+        if args.command == "verify":
+            return await verify(args.limit)
+        return await rebuild()
+    finally:
+        await database.dispose()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("verify", "rebuild"))
+    parser.add_argument(
+        "--limit", type=int, default=100, help="most mismatches verify lists"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    sys.exit(asyncio.run(run(parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import re
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -20,12 +21,15 @@ db_config = get_db_config()
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option("sqlalchemy.url", db_config.full_database_url)
+# Unless the caller already chose a database, as the tests do
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", db_config.full_database_url)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
+# Loggers created before migrations run in-process, as in the tests, stay enabled.
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -33,6 +37,15 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Monthly partitions of the archive tables are created by the archive job,
+# autogenerate must not drop them
+ARCHIVE_PARTITION = re.compile(r"^tasks_archive(_assignee)?_y\d{4}m\d{2}$")
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    return not (type_ == "table" and reflected and ARCHIVE_PARTITION.match(name))
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -55,6 +68,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -64,7 +78,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
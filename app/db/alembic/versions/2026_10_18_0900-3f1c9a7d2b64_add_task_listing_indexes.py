@@ -0,0 +1,81 @@
+"""Add composite indexes for task listing
+
+Revision ID: 3f1c9a7d2b64
+Revises: e8b3e57515c8
+Create Date: 2026-10-18 09:00:12.481205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c9a7d2b64"
+down_revision: Union[str, None] = "e8b3e57515c8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so existing tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_created_at_id",
+            "tasks",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_status_priority_created_at_id",
+            "tasks",
+            ["status", "priority", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_responsible_person_id_created_at_id",
+            "tasks",
+            ["responsible_person_id", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_updated_at",
+            "tasks",
+            ["updated_at"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_task_assignee_user_id_task_id",
+            "task_assignee",
+            ["user_id", "task_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_task_assignee_user_id_task_id",
+            table_name="task_assignee",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_updated_at", table_name="tasks", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_tasks_responsible_person_id_created_at_id",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_status_priority_created_at_id",
+            table_name="tasks",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_created_at_id", table_name="tasks", postgresql_concurrently=True
+        )
@@ -0,0 +1,68 @@
+"""Add task full-text search and drop description index
+
+Revision ID: 8d2e4b61c0f7
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-18 09:30:47.902113
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2e4b61c0f7"
+down_revision: Union[str, None] = "3f1c9a7d2b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# An expression index rather than a stored column, which would rewrite the
+# table under an exclusive lock. Has to match `search_document` in the model.
+SEARCH_DOCUMENT = (
+    "(setweight(to_tsvector('english'::regconfig, title), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B'))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_search_vector",
+            "tasks",
+            [sa.text(SEARCH_DOCUMENT)],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_tasks_title_trgm",
+            "tasks",
+            ["title"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        # A B-tree over unbounded text serves neither word nor substring search
+        op.drop_index(
+            "ix_tasks_description", table_name="tasks", postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_description",
+            "tasks",
+            ["description"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_tasks_title_trgm", table_name="tasks", postgresql_concurrently=True
+        )
+        op.drop_index(
+            "ix_tasks_search_vector", table_name="tasks", postgresql_concurrently=True
+        )
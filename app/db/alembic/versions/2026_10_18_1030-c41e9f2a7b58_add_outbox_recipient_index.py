@@ -0,0 +1,38 @@
+"""Add pending outbox messages by recipient index
+
+Revision ID: c41e9f2a7b58
+Revises: 5b7a2c9e4d13
+Create Date: 2026-10-18 10:30:05.618094
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41e9f2a7b58"
+down_revision: Union[str, None] = "5b7a2c9e4d13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_outbox_messages_pending_recipient",
+            "outbox_messages",
+            ["recipient_id", "created_at"],
+            unique=False,
+            postgresql_where=sa.text("sent_at IS NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_outbox_messages_pending_recipient",
+            table_name="outbox_messages",
+            postgresql_concurrently=True,
+        )
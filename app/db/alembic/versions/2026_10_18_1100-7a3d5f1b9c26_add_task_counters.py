@@ -0,0 +1,239 @@
+"""Add task counters maintained by triggers
+
+Revision ID: 7a3d5f1b9c26
+Revises: c41e9f2a7b58
+Create Date: 2026-10-18 11:00:12.480731
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "7a3d5f1b9c26"
+down_revision: Union[str, None] = "c41e9f2a7b58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every trigger adds up its deltas per counter and applies them in one
+# upsert, in key order so concurrent writers do not deadlock. Setting
+# app.skip_task_counters to on for a session turns the triggers off, for
+# bulk loads that rebuild the counters afterwards.
+APPLY_DELTAS = """
+    INSERT INTO task_counters AS c (user_id, role, status, priority, count)
+    SELECT user_id, role, status, priority, sum(delta)
+    FROM ({deltas}) AS d (user_id, role, status, priority, delta)
+    GROUP BY user_id, role, status, priority
+    HAVING sum(delta) <> 0
+    ORDER BY user_id, role, status, priority
+    ON CONFLICT (user_id, role, status, priority)
+    DO UPDATE SET count = c.count + EXCLUDED.count
+"""
+
+SKIP_IF_DISABLED = """
+    IF current_setting('app.skip_task_counters', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+"""
+
+FUNCTIONS = {
+    "task_counters_tasks_inserted": APPLY_DELTAS.format(
+        deltas="""
+        SELECT responsible_person_id, 'RESPONSIBLE'::taskroleenum, status,
+               priority, 1
+        FROM new_rows
+        """
+    ),
+    # Assignees move along with the status and priority of their task
+    "task_counters_tasks_updated": APPLY_DELTAS.format(
+        deltas="""
+        SELECT o.responsible_person_id, 'RESPONSIBLE'::taskroleenum, o.status,
+               o.priority, -1
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE (o.responsible_person_id, o.status, o.priority)
+              IS DISTINCT FROM (n.responsible_person_id, n.status, n.priority)
+        UNION ALL
+        SELECT n.responsible_person_id, 'RESPONSIBLE'::taskroleenum, n.status,
+               n.priority, 1
+        FROM old_rows o JOIN new_rows n ON n.id = o.id
+        WHERE (o.responsible_person_id, o.status, o.priority)
+              IS DISTINCT FROM (n.responsible_person_id, n.status, n.priority)
+        UNION ALL
+        SELECT a.user_id, 'ASSIGNEE'::taskroleenum, o.status, o.priority, -1
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+        JOIN task_assignee a ON a.task_id = n.id
+        WHERE (o.status, o.priority) IS DISTINCT FROM (n.status, n.priority)
+        UNION ALL
+        SELECT a.user_id, 'ASSIGNEE'::taskroleenum, n.status, n.priority, 1
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+        JOIN task_assignee a ON a.task_id = n.id
+        WHERE (o.status, o.priority) IS DISTINCT FROM (n.status, n.priority)
+        """
+    ),
+    "task_counters_tasks_deleted": APPLY_DELTAS.format(
+        deltas="""
+        SELECT responsible_person_id, 'RESPONSIBLE'::taskroleenum, status,
+               priority, -1
+        FROM old_rows
+        """
+    ),
+    # Assignments look their task up, locked so a concurrent status change
+    # either sees the assignment or is seen by it. Assignments removed
+    # because their task is being deleted find no task and are left to
+    # task_counters_task_deleting.
+    "task_counters_assignees_inserted": """
+        PERFORM 1 FROM tasks
+        WHERE id IN (SELECT task_id FROM new_rows)
+        ORDER BY id FOR SHARE;
+        """
+    + APPLY_DELTAS.format(
+        deltas="""
+        SELECT n.user_id, 'ASSIGNEE'::taskroleenum, t.status, t.priority, 1
+        FROM new_rows n JOIN tasks t ON t.id = n.task_id
+        """
+    ),
+    "task_counters_assignees_deleted": """
+        PERFORM 1 FROM tasks
+        WHERE id IN (SELECT task_id FROM old_rows)
+        ORDER BY id FOR SHARE;
+        """
+    + APPLY_DELTAS.format(
+        deltas="""
+        SELECT o.user_id, 'ASSIGNEE'::taskroleenum, t.status, t.priority, -1
+        FROM old_rows o JOIN tasks t ON t.id = o.task_id
+        """
+    ),
+}
+
+# Runs per row before the delete, while the assignees of the task still
+# exist whether they are deleted first or by a cascade
+ASSIGNEES_OF_DELETED_TASK = APPLY_DELTAS.format(
+    deltas="""
+    SELECT a.user_id, 'ASSIGNEE'::taskroleenum, OLD.status, OLD.priority, -1
+    FROM task_assignee a WHERE a.task_id = OLD.id
+    """
+)
+
+# (trigger, table, event, function), all statement level with transition tables
+STATEMENT_TRIGGERS = (
+    ("task_counters_insert", "tasks", "INSERT", "task_counters_tasks_inserted"),
+    ("task_counters_update", "tasks", "UPDATE", "task_counters_tasks_updated"),
+    ("task_counters_delete", "tasks", "DELETE", "task_counters_tasks_deleted"),
+    (
+        "task_counters_insert",
+        "task_assignee",
+        "INSERT",
+        "task_counters_assignees_inserted",
+    ),
+    (
+        "task_counters_delete",
+        "task_assignee",
+        "DELETE",
+        "task_counters_assignees_deleted",
+    ),
+)
+
+TRANSITION_TABLES = {
+    "INSERT": "NEW TABLE AS new_rows",
+    "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "OLD TABLE AS old_rows",
+}
+
+BACKFILL = """
+    INSERT INTO task_counters (user_id, role, status, priority, count)
+    SELECT responsible_person_id, 'RESPONSIBLE'::taskroleenum, status, priority,
+           count(*)
+    FROM tasks
+    GROUP BY responsible_person_id, status, priority
+    UNION ALL
+    SELECT a.user_id, 'ASSIGNEE'::taskroleenum, t.status, t.priority, count(*)
+    FROM task_assignee a JOIN tasks t ON t.id = a.task_id
+    GROUP BY a.user_id, t.status, t.priority
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_counters",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "role",
+            sa.Enum("RESPONSIBLE", "ASSIGNEE", name="taskroleenum"),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="statusenum", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "priority",
+            postgresql.ENUM(name="priorityenum", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "role", "status", "priority"),
+    )
+
+    for name, body in FUNCTIONS.items():
+        op.execute(
+            f"""
+            CREATE FUNCTION {name}() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                {SKIP_IF_DISABLED}
+                {body};
+                RETURN NULL;
+            END
+            $$
+            """
+        )
+
+    op.execute(
+        f"""
+        CREATE FUNCTION task_counters_task_deleting() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF current_setting('app.skip_task_counters', true) = 'on' THEN
+                RETURN OLD;
+            END IF;
+            {ASSIGNEES_OF_DELETED_TASK};
+            RETURN OLD;
+        END
+        $$
+        """
+    )
+
+    for trigger, table, event, function in STATEMENT_TRIGGERS:
+        op.execute(
+            f"""
+            CREATE TRIGGER {trigger} AFTER {event} ON {table}
+            REFERENCING {TRANSITION_TABLES[event]}
+            FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+            """
+        )
+    op.execute(
+        """
+        CREATE TRIGGER task_counters_deleting BEFORE DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION task_counters_task_deleting()
+        """
+    )
+
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER task_counters_deleting ON tasks")
+    for trigger, table, _, _ in STATEMENT_TRIGGERS:
+        op.execute(f"DROP TRIGGER {trigger} ON {table}")
+
+    op.execute("DROP FUNCTION task_counters_task_deleting()")
+    for name in FUNCTIONS:
+        op.execute(f"DROP FUNCTION {name}()")
+
+    op.drop_table("task_counters")
+    sa.Enum(name="taskroleenum").drop(op.get_bind())
@@ -0,0 +1,29 @@
+"""Add task version
+
+Revision ID: 2e9c4a7f1d85
+Revises: 7a3d5f1b9c26
+Create Date: 2026-10-18 11:30:41.092617
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2e9c4a7f1d85"
+down_revision: Union[str, None] = "7a3d5f1b9c26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default is stored in the catalog, existing rows are not rewritten
+    op.add_column(
+        "tasks",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("tasks", "version")
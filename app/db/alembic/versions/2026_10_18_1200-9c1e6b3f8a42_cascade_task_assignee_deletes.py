@@ -0,0 +1,50 @@
+"""Cascade deletes of tasks and users to their assignments
+
+Revision ID: 9c1e6b3f8a42
+Revises: 2e9c4a7f1d85
+Create Date: 2026-10-18 12:00:07.193524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c1e6b3f8a42"
+down_revision: Union[str, None] = "2e9c4a7f1d85"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (constraint, column, referred table)
+FOREIGN_KEYS = (
+    ("task_assignee_task_id_fkey", "task_id", "tasks"),
+    ("task_assignee_user_id_fkey", "user_id", "users"),
+)
+
+
+def _replace_foreign_keys(ondelete: str | None) -> None:
+    # Added NOT VALID and validated after the swap has committed, so the
+    # tables are only locked briefly and checking existing rows blocks no
+    # writes
+    for name, column, table in FOREIGN_KEYS:
+        op.drop_constraint(name, "task_assignee", type_="foreignkey")
+        op.create_foreign_key(
+            name,
+            "task_assignee",
+            table,
+            [column],
+            ["id"],
+            ondelete=ondelete,
+            postgresql_not_valid=True,
+        )
+    with op.get_context().autocommit_block():
+        for name, _, _ in FOREIGN_KEYS:
+            op.execute(f"ALTER TABLE task_assignee VALIDATE CONSTRAINT {name}")
+
+
+def upgrade() -> None:
+    _replace_foreign_keys(ondelete="CASCADE")
+
+
+def downgrade() -> None:
+    _replace_foreign_keys(ondelete=None)
@@ -0,0 +1,100 @@
+"""Add the tasks archive, partitioned by month
+
+Revision ID: 4f8d2a6c1e93
+Revises: 9c1e6b3f8a42
+Create Date: 2026-10-18 12:30:26.517309
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "4f8d2a6c1e93"
+down_revision: Union[str, None] = "9c1e6b3f8a42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Monthly partitions are created by the archive job, indexes defined
+    # here are created on each of them
+    op.create_table(
+        "tasks_archive",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("responsible_person_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="statusenum", create_type=False),
+            nullable=False,
+        ),
+        sa.Column(
+            "priority",
+            postgresql.ENUM(name="priorityenum", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["responsible_person_id"], ["users.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id", "updated_at"),
+        postgresql_partition_by="RANGE (updated_at)",
+    )
+    op.create_index(
+        "ix_tasks_archive_created_at_id", "tasks_archive", ["created_at", "id"]
+    )
+    op.create_index(
+        "ix_tasks_archive_responsible_person_id_created_at_id",
+        "tasks_archive",
+        ["responsible_person_id", "created_at", "id"],
+    )
+
+    op.create_table(
+        "tasks_archive_assignee",
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("task_id", "updated_at", "user_id"),
+        postgresql_partition_by="RANGE (updated_at)",
+    )
+    op.create_index(
+        "ix_tasks_archive_assignee_user_id_task_id",
+        "tasks_archive_assignee",
+        ["user_id", "task_id"],
+    )
+
+
+def downgrade() -> None:
+    # Archived tasks go back where they came from. They never stopped being
+    # counted, so the counter triggers are kept out of it.
+    op.execute("SET LOCAL app.skip_task_counters = on")
+    op.execute(
+        """
+        INSERT INTO tasks (
+            id, title, description, responsible_person_id, status, priority,
+            version, created_at, updated_at
+        )
+        SELECT id, title, description, responsible_person_id, status, priority,
+               version, created_at, updated_at
+        FROM tasks_archive
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO task_assignee (task_id, user_id)
+        SELECT task_id, user_id FROM tasks_archive_assignee
+        """
+    )
+    op.execute("RESET app.skip_task_counters")
+
+    # Dropping a partitioned table drops its partitions
+    op.drop_table("tasks_archive_assignee")
+    op.drop_table("tasks_archive")
@@ -19,3 +19,8 @@ class PriorityEnum(Enum):
     MEDIUM = "Medium"
     LOW = "Low"
     LOWEST = "Lowest"
+
+
+class TaskRoleEnum(Enum):
+    RESPONSIBLE = "responsible"
+    ASSIGNEE = "assignee"
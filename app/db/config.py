@@ -1,6 +1,43 @@
-from pydantic import Field
+from typing import Any
+
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
+from app.db.pool import InstrumentedAsyncQueuePool
+
+
+class EngineProfile(BaseModel):
+    """Connection pool and driver settings applied to an engine"""
+
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    # Seconds after which a connection is replaced, -1 keeps connections forever
+    pool_recycle: int = -1
+    # Pre-ping costs a round trip per checkout, without it a dead connection
+    # fails its first statement and the pool is invalidated
+    pool_pre_ping: bool = True
+    # asyncpg prepared statement cache per connection, 0 for pgbouncer
+    # in transaction pooling mode
+    statement_cache_size: int = 100
+    echo: bool = False
+
+    def engine_options(self, name: str) -> dict[str, Any]:
+        return {
+            "poolclass": InstrumentedAsyncQueuePool,
+            "pool_logging_name": name,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+            "echo": self.echo,
+            "connect_args": {
+                "prepared_statement_cache_size": self.statement_cache_size,
+                "statement_cache_size": self.statement_cache_size,
+            },
+        }
+
 
 class DBConfig(BaseSettings):
     POSTGRES_DB: str = Field(..., env="POSTGRES_DB")
@@ -9,10 +46,47 @@ class DBConfig(BaseSettings):
     POSTGRES_HOST: str = Field(..., env="POSTGRES_HOST")
     POSTGRES_PORT: int = Field(5432, env="POSTGRES_PORT")
 
+    # Comma separated SQLAlchemy URLs of read replicas
+    POSTGRES_REPLICA_URLS: str = Field("", env="POSTGRES_REPLICA_URLS")
+    POSTGRES_REPLICA_HEALTH_CHECK_INTERVAL: float = Field(
+        5, env="POSTGRES_REPLICA_HEALTH_CHECK_INTERVAL"
+    )
+    # Seconds reads stay on the primary after the same user wrote
+    POSTGRES_READ_YOUR_WRITES_WINDOW: float = Field(
+        5, env="POSTGRES_READ_YOUR_WRITES_WINDOW"
+    )
+
+    # Engine profile, shared by the primary and every replica
+    POSTGRES_POOL_SIZE: int = Field(5, env="POSTGRES_POOL_SIZE")
+    POSTGRES_MAX_OVERFLOW: int = Field(10, env="POSTGRES_MAX_OVERFLOW")
+    POSTGRES_POOL_TIMEOUT: float = Field(30, env="POSTGRES_POOL_TIMEOUT")
+    POSTGRES_POOL_RECYCLE: int = Field(-1, env="POSTGRES_POOL_RECYCLE")
+    POSTGRES_POOL_PRE_PING: bool = Field(True, env="POSTGRES_POOL_PRE_PING")
+    POSTGRES_STATEMENT_CACHE_SIZE: int = Field(100, env="POSTGRES_STATEMENT_CACHE_SIZE")
+    POSTGRES_ECHO: bool = Field(False, env="POSTGRES_ECHO")
+
+    @property
+    def engine_profile(self) -> EngineProfile:
+        return EngineProfile(
+            pool_size=self.POSTGRES_POOL_SIZE,
+            max_overflow=self.POSTGRES_MAX_OVERFLOW,
+            pool_timeout=self.POSTGRES_POOL_TIMEOUT,
+            pool_recycle=self.POSTGRES_POOL_RECYCLE,
+            pool_pre_ping=self.POSTGRES_POOL_PRE_PING,
+            statement_cache_size=self.POSTGRES_STATEMENT_CACHE_SIZE,
+            echo=self.POSTGRES_ECHO,
+        )
+
     @property
     def full_database_url(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [
+            url.strip() for url in self.POSTGRES_REPLICA_URLS.split(",") if url.strip()
+        ]
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -1,44 +1,89 @@
+import asyncio
+import itertools
+import logging
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Sequence
 
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
-from app.db.config import DBConfig
+from app.db.config import DBConfig, EngineProfile
+from app.db.unit_of_work import WriteTrackingSession
 
 config = DBConfig()
 
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    def __init__(self, url: str, name: str, profile: EngineProfile) -> None:
+        self.name = name
+        self.engine: AsyncEngine = create_async_engine(
+            url=url,
+            isolation_level="AUTOCOMMIT",
+            **profile.engine_options(name),
+        )
+        self.sessionmaker = async_sessionmaker(
+            bind=self.engine,
+            expire_on_commit=False,
+            sync_session_class=WriteTrackingSession,
+            info={"replica": True},
+        )
+        self.healthy = True
+
+    async def check(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._ping(), timeout)
+            self.healthy = True
+        except (OSError, asyncio.TimeoutError, SQLAlchemyError):
+            self.healthy = False
+
+        return self.healthy
+
+    async def _ping(self) -> None:
+        async with self.engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
 
 class Database:
-    def __init__(self, url: str, ro_url: str = None) -> None:
+    def __init__(
+        self,
+        url: str,
+        ro_urls: Sequence[str] = (),
+        profile: EngineProfile | None = None,
+    ) -> None:
+        profile = profile or EngineProfile()
         self._async_engine = create_async_engine(
             url=url,
-            pool_pre_ping=True,
-            echo=True,
             isolation_level="READ COMMITTED",
+            **profile.engine_options("primary"),
         )
         self._async_session = async_sessionmaker(
             bind=self._async_engine,
             expire_on_commit=False,
+            sync_session_class=WriteTrackingSession,
         )
 
-        if ro_url:
-            self._read_only_async_engine = create_async_engine(
-                url=ro_url,
-                pool_pre_ping=True,
-                echo=True,
-                isolation_level="AUTOCOMMIT",
-            )
-            self._read_only_async_session = async_sessionmaker(
-                bind=self._read_only_async_engine,
-                expire_on_commit=False,
-            )
-        else:
-            self._read_only_async_engine = None
-            self._read_only_async_session = None
+        self._replicas = [
+            Replica(ro_url, f"replica-{i}", profile) for i, ro_url in enumerate(ro_urls)
+        ]
+        self._replica_counter = itertools.count()
+        self._health_check_task: asyncio.Task | None = None
 
     @asynccontextmanager
     async def get_session(self) -> AsyncGenerator[AsyncSession, Any]:
+        """Yield a session on the primary, which checks out a connection on its first statement
+
+        Writes nobody committed are committed on the way out. A session that
+        only read, or whose writes were already committed, is just closed,
+        which ends its transaction as it goes back to the pool.
+        """
         session: AsyncSession = self._async_session()
 
         try:
@@ -47,17 +92,74 @@ class Database:
             await session.rollback()
             raise
         finally:
-            await session.commit()
+            if session.sync_session.has_pending_writes:
+                await session.commit()
             await session.close()
 
     @asynccontextmanager
     async def get_read_only_session(self) -> AsyncGenerator[AsyncSession, Any]:
-        if not self._read_only_async_session:
-            raise ValueError("Read-only session is not configured.")
-        session: AsyncSession = self._read_only_async_session()
+        """Yield a session on the next healthy replica, or on the primary when there is none"""
+        replica = self._pick_replica()
+        session: AsyncSession = (
+            replica.sessionmaker() if replica else self._async_session()
+        )
         try:
             yield session
-        except SQLAlchemyError:
+        except DBAPIError as e:
+            # Take a replica that dropped its connection out of rotation until
+            # the health check sees it answering again
+            if replica and e.connection_invalidated:
+                replica.healthy = False
+                logger.warning("Read replica %s marked unhealthy", replica.name)
             raise
         finally:
             await session.close()
+
+    def _pick_replica(self) -> Replica | None:
+        for _ in range(len(self._replicas)):
+            replica = self._replicas[next(self._replica_counter) % len(self._replicas)]
+            if replica.healthy:
+                return replica
+
+        return None
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [self._async_engine, *(replica.engine for replica in self._replicas)]
+
+    def pool_stats(self) -> dict[str, dict]:
+        stats = {"primary": self._async_engine.pool.stats()}
+        for replica in self._replicas:
+            stats[replica.name] = {
+                **replica.engine.pool.stats(),
+                "healthy": replica.healthy,
+            }
+
+        return stats
+
+    def pool_wait(self) -> float:
+        """The longest time any checkout on any of the pools has been waiting so far"""
+        return max(engine.pool.current_wait() for engine in self.engines)
+
+    async def check_replicas(self, timeout: float = 2) -> None:
+        await asyncio.gather(*(replica.check(timeout) for replica in self._replicas))
+
+    def start_replica_health_checks(self, interval: float) -> None:
+        if not self._replicas or self._health_check_task is not None:
+            return
+
+        async def run() -> None:
+            while True:
+                await self.check_replicas()
+                await asyncio.sleep(interval)
+
+        self._health_check_task = asyncio.create_task(run())
+
+    async def dispose(self) -> None:
+        if self._health_check_task is not None:
+            self._health_check_task.cancel()
+            self._health_check_task = None
+
+        await self._async_engine.dispose()
+        for replica in self._replicas:
+            await replica.engine.dispose()
@@ -0,0 +1,90 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_PARAMETER = re.compile(r"\$\d+(?:::[\w ]+(?:\[\])?)?")
+_PARAMETER_LIST = re.compile(r"\?(?:, \?)+")
+
+
+def statement_shape(statement: str) -> str:
+    """Reduce a statement to its shape, so that IN lists of any length compare equal"""
+    shape = _PARAMETER.sub("?", statement)
+    return _PARAMETER_LIST.sub("?, ...", " ".join(shape.split()))
+
+
+class RequestQueryStats:
+    """Statements issued while serving a single request"""
+
+    def __init__(self, n_plus_one_threshold: int = 0) -> None:
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.slowest_time = 0.0
+        self.slowest_statement: str | None = None
+        self.shapes: Counter[str] = Counter()
+        self.repeated_shapes: set[str] = set()
+
+    def record(self, statement: str, duration: float, rows: int) -> None:
+        self.statements += 1
+        self.db_time += duration
+        self.rows += rows
+
+        shape = statement_shape(statement)
+        if duration >= self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = shape
+
+        if not self.n_plus_one_threshold:
+            return
+
+        self.shapes[shape] += 1
+        if (
+            self.shapes[shape] > self.n_plus_one_threshold
+            and shape not in self.repeated_shapes
+        ):
+            self.repeated_shapes.add(shape)
+            logger.warning(
+                "Possible N+1: statement executed more than %d times in one request: %s",
+                self.n_plus_one_threshold,
+                shape,
+            )
+
+
+current_query_stats: ContextVar[RequestQueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    started = conn.info["query_started"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started, max(cursor.rowcount, 0))
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
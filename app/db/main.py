@@ -1,11 +1,96 @@
+import time
+
+from fastapi import Request
+from jose import JWTError, jwt
+
 from app.db.config import get_db_config
 from app.db.database import Database
+from app.db.instrumentation import instrument_engine
+from app.metrics import registry
 
 db_config = get_db_config()
 
-database = Database(url=db_config.full_database_url)
+database = Database(
+    url=db_config.full_database_url,
+    ro_urls=db_config.replica_urls,
+    profile=db_config.engine_profile,
+)
+
+for engine in database.engines:
+    instrument_engine(engine)
+
+
+def _pool_connection_gauge() -> dict[tuple, float]:
+    return {
+        (pool, state): stats[state]
+        for pool, stats in database.pool_stats().items()
+        for state in ("checked_out", "idle", "overflow")
+    }
+
+
+registry.gauge(
+    "db_pool_connections",
+    "Pooled database connections by state",
+    callback=_pool_connection_gauge,
+    labelnames=("pool", "state"),
+)
+
+
+class ReadYourWritesTracker:
+    """Remembers who wrote recently so their reads can be kept off lagging replicas"""
+
+    def __init__(self, window: float, max_size: int = 100_000) -> None:
+        self.window = window
+        self.max_size = max_size
+        self._pinned_until: dict[str, float] = {}
+
+    def record_write(self, subject: str) -> None:
+        now = time.monotonic()
+        if len(self._pinned_until) >= self.max_size:
+            self._pinned_until = {
+                key: until for key, until in self._pinned_until.items() if until > now
+            }
+        self._pinned_until[subject] = now + self.window
 
+    def is_pinned(self, subject: str) -> bool:
+        until = self._pinned_until.get(subject)
+        return until is not None and until > time.monotonic()
 
-async def get_db():
+
+read_your_writes = ReadYourWritesTracker(
+    window=db_config.POSTGRES_READ_YOUR_WRITES_WINDOW
+)
+
+
+def _request_subject(request: Request) -> str | None:
+    # Only used to choose a database, so the signature is left to the auth
+    # dependencies: a forged token can at worst pin its reads to the primary
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+
+
+async def get_db(request: Request):
     async with database.get_session() as session:
         yield session
+
+    # Requests that only read, or failed before writing, leave reads where they are
+    subject = _request_subject(request)
+    if subject and session.sync_session.wrote:
+        read_your_writes.record_write(subject)
+
+
+async def get_read_db(request: Request):
+    subject = _request_subject(request)
+
+    if subject and read_your_writes.is_pinned(subject):
+        async with database.get_session() as session:
+            yield session
+    else:
+        async with database.get_read_only_session() as session:
+            yield session
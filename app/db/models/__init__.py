@@ -1,4 +1,7 @@
 from .associations import task_assignee
 from .base import TimedBaseModel
+from .outbox import OutboxMessage
 from .task import Task
+from .task_archive import ArchivedTask, task_archive_assignee
+from .task_counter import TaskCounter
 from .user import User
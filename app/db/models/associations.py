@@ -1,10 +1,22 @@
-from sqlalchemy import Column, ForeignKey, Integer, Table
+from sqlalchemy import Column, ForeignKey, Index, Integer, Table
 
 from app.db.models.base import TimedBaseModel
 
 task_assignee = Table(
     "task_assignee",
     TimedBaseModel.metadata,
-    Column("task_id", Integer, ForeignKey("tasks.id"), primary_key=True),
-    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column(
+        "task_id",
+        Integer,
+        ForeignKey("tasks.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "user_id",
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    # The primary key leads with task_id, lookups by assignee need the reverse
+    Index("ix_task_assignee_user_id_task_id", "user_id", "task_id"),
 )
@@ -0,0 +1,54 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.models.base import TimedBaseModel
+
+
+class OutboxMessage(TimedBaseModel):
+    """A notification recorded in the same transaction as the change that caused it"""
+
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        # Only undelivered rows are ever scanned by the dispatcher
+        Index(
+            "ix_outbox_messages_pending",
+            "available_at",
+            "id",
+            postgresql_where=text("sent_at IS NULL"),
+        ),
+        # Serves the per-recipient digest window check
+        Index(
+            "ix_outbox_messages_pending_recipient",
+            "recipient_id",
+            "created_at",
+            postgresql_where=text("sent_at IS NULL"),
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    topic = Column(String(64), nullable=False)
+    recipient_id = Column(
+        Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, default=func.now(), nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    def __str__(self):
+        return f"<OutboxMessage(id={self.id}, topic={self.topic}, attempts={self.attempts})>"
+
+    def __repr__(self):
+        return self.__str__()
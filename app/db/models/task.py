@@ -1,20 +1,79 @@
-from sqlalchemy import Column, Enum, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.orm import column_property, relationship
 
 from app.db.common.enums import PriorityEnum, StatusEnum
 from app.db.models.associations import task_assignee
 from app.db.models.base import TimedBaseModel
 
 
+def _weighted(document: ColumnElement, weight: str) -> ColumnElement:
+    # Constants are inlined rather than bound, so every query repeats the
+    # indexed expression exactly
+    return func.setweight(
+        func.to_tsvector(text("'english'::regconfig"), document),
+        text(f"'{weight}'"),
+    )
+
+
+def search_document(title: ColumnElement, description: ColumnElement) -> ColumnElement:
+    """The weighted tsvector of a task, as indexed by `ix_tasks_search_vector`"""
+    return _weighted(title, "A").op("||")(
+        _weighted(func.coalesce(description, text("''")), "B")
+    )
+
+
 class Task(TimedBaseModel):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id) newest first, optionally
+        # narrowed by an equality filter on the leading columns.
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index(
+            "ix_tasks_status_priority_created_at_id",
+            "status",
+            "priority",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_tasks_responsible_person_id_created_at_id",
+            "responsible_person_id",
+            "created_at",
+            "id",
+        ),
+        Index("ix_tasks_updated_at", "updated_at"),
+        Index(
+            "ix_tasks_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String(255), nullable=False, index=True)
-    description = Column(Text(), nullable=True, index=True)
+    description = Column(Text(), nullable=True)
     responsible_person_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     status = Column(Enum(StatusEnum), nullable=False, default=StatusEnum.TODO)
     priority = Column(Enum(PriorityEnum), nullable=False, default=PriorityEnum.MEDIUM)
+    # Bumped by every update, writers that read it can update only if it is unchanged
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Not stored, computed wherever it is used, which is only in WHERE/ORDER BY
+    # of search queries where the expression index serves it
+    search_vector = column_property(
+        search_document(title, description), deferred=True, raiseload=True
+    )
 
     # Relationships
     responsible_person = relationship(
@@ -24,7 +83,10 @@ class Task(TimedBaseModel):
         passive_deletes=True,
     )
     assignees = relationship(
-        "User", secondary=task_assignee, back_populates="assigned_tasks"
+        "User",
+        secondary=task_assignee,
+        back_populates="assigned_tasks",
+        passive_deletes=True,
     )
 
     def __str__(self):
@@ -32,3 +94,10 @@ class Task(TimedBaseModel):
 
     def __repr__(self):
         return self.__str__()
+
+
+Index(
+    "ix_tasks_search_vector",
+    search_document(Task.__table__.c.title, Task.__table__.c.description),
+    postgresql_using="gin",
+)
@@ -0,0 +1,91 @@
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    PrimaryKeyConstraint,
+    String,
+    Table,
+    Text,
+    and_,
+    func,
+)
+from sqlalchemy.orm import relationship
+
+from app.db.common.enums import PriorityEnum, StatusEnum
+from app.db.models.base import Base
+
+# Both archive tables are partitioned by month of the task's updated_at, the
+# partitions are created by the archive job as it needs them
+ARCHIVE_PARTITION_BY = "RANGE (updated_at)"
+
+task_archive_assignee = Table(
+    "tasks_archive_assignee",
+    Base.metadata,
+    Column("task_id", Integer, nullable=False),
+    Column(
+        "user_id",
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    ),
+    # The archived task's, so its assignees land in the same month
+    Column("updated_at", DateTime, nullable=False),
+    PrimaryKeyConstraint("task_id", "updated_at", "user_id"),
+    Index("ix_tasks_archive_assignee_user_id_task_id", "user_id", "task_id"),
+    postgresql_partition_by=ARCHIVE_PARTITION_BY,
+)
+
+
+class ArchivedTask(Base):
+    """A done task moved out of `tasks`, read-only
+
+    Has the same attributes as `Task` apart from the search vector, so it
+    can be served wherever a task is.
+    """
+
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "updated_at"),
+        Index("ix_tasks_archive_created_at_id", "created_at", "id"),
+        Index(
+            "ix_tasks_archive_responsible_person_id_created_at_id",
+            "responsible_person_id",
+            "created_at",
+            "id",
+        ),
+        {"postgresql_partition_by": ARCHIVE_PARTITION_BY},
+    )
+
+    id = Column(Integer, nullable=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text(), nullable=True)
+    responsible_person_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    status = Column(Enum(StatusEnum), nullable=False)
+    priority = Column(Enum(PriorityEnum), nullable=False)
+    version = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False, default=func.now())
+
+    # Relationships
+    assignees = relationship(
+        "User",
+        secondary=task_archive_assignee,
+        primaryjoin=lambda: and_(
+            ArchivedTask.id == task_archive_assignee.c.task_id,
+            ArchivedTask.updated_at == task_archive_assignee.c.updated_at,
+        ),
+        secondaryjoin="User.id == tasks_archive_assignee.c.user_id",
+        viewonly=True,
+    )
+
+    def __str__(self):
+        return f"<ArchivedTask(id={self.id}, title={self.title}, status={self.status}, priority={self.priority})>"
+
+    def __repr__(self):
+        return self.__str__()
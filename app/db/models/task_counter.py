@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Enum, ForeignKey, Integer
+
+from app.db.common.enums import PriorityEnum, StatusEnum, TaskRoleEnum
+from app.db.models.base import Base
+
+
+class TaskCounter(Base):
+    """Number of tasks per user, role, status and priority
+
+    Kept up to date by triggers on `tasks` and `task_assignee` in the same
+    transaction as the change, see the migration that added them. Rows that
+    drop to zero are kept rather than deleted.
+    """
+
+    __tablename__ = "task_counters"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    role = Column(Enum(TaskRoleEnum), primary_key=True)
+    status = Column(Enum(StatusEnum), primary_key=True)
+    priority = Column(Enum(PriorityEnum), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __str__(self):
+        return f"<TaskCounter(user_id={self.user_id}, role={self.role}, status={self.status}, priority={self.priority}, count={self.count})>"
+
+    def __repr__(self):
+        return self.__str__()
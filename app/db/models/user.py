@@ -24,7 +24,10 @@ class User(TimedBaseModel):
         cascade="all, delete-orphan",
     )
     assigned_tasks = relationship(
-        "Task", secondary=task_assignee, back_populates="assignees"
+        "Task",
+        secondary=task_assignee,
+        back_populates="assignees",
+        passive_deletes=True,
     )
 
     def __str__(self):
@@ -0,0 +1,75 @@
+import time
+
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from app.metrics import registry
+
+CHECKOUT_WAIT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    30.0,
+)
+
+checkout_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection, including opening a new one",
+    labelnames=("pool",),
+    buckets=CHECKOUT_WAIT_BUCKETS,
+)
+checkout_timeouts_total = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after pool_timeout",
+    labelnames=("pool",),
+)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait time and timeouts per pool
+
+    The pool is identified by the engine's `pool_logging_name`, which
+    SQLAlchemy carries over when the pool is recreated.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Start times of the checkouts still waiting, keyed by a token per checkout
+        self._waiting: dict[object, float] = {}
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        name = self._orig_logging_name or "default"
+        token = object()
+        started = self._waiting[token] = time.perf_counter()
+
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            checkout_timeouts_total.inc(pool=name)
+            raise
+        finally:
+            del self._waiting[token]
+            checkout_wait_seconds.observe(time.perf_counter() - started, pool=name)
+
+    def current_wait(self) -> float:
+        """How long the longest waiting checkout has waited so far, 0 if none is"""
+        if not self._waiting:
+            return 0.0
+        return time.perf_counter() - min(self._waiting.values())
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "timeout": self.timeout(),
+            "longest_wait": self.current_wait(),
+        }
@@ -0,0 +1,82 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+
+class WriteTrackingSession(Session):
+    """A session that knows whether its transaction has written anything
+
+    Flushes and every statement other than a SELECT count as writes, which
+    is cheap to tell and errs on the side of committing. A SELECT fed by a
+    data-modifying CTE is not noticed, so callers commit those through a
+    `UnitOfWork`. `wrote` stays set once a transaction has committed writes.
+    """
+
+    @property
+    def has_pending_writes(self) -> bool:
+        return self.info.get("pending_writes", False)
+
+    @property
+    def wrote(self) -> bool:
+        return self.info.get("wrote", False)
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _on_execute(state: ORMExecuteState) -> None:
+    if not state.statement.is_select:
+        state.session.info["pending_writes"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _on_flush(session: Session, flush_context) -> None:
+    session.info["pending_writes"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+def _on_commit(session: Session) -> None:
+    if session.info.pop("pending_writes", False):
+        session.info["wrote"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_rollback")
+def _on_rollback(session: Session) -> None:
+    session.info.pop("pending_writes", None)
+
+
+class UnitOfWork:
+    """The transaction of a service call, committed once at the end
+
+    Repositories only flush. `async with uow:` commits when the outermost
+    block exits and rolls back when it raises, so a service method calling
+    another one still commits once. Nothing is sent when the block ran no
+    statement at all.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._depth = 0
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        self._depth -= 1
+        if self._depth:
+            return
+
+        if exc_type is None:
+            await self.commit()
+        else:
+            await self.rollback()
+
+    async def commit(self) -> None:
+        if not self.session.in_transaction():
+            return
+
+        # Committed on purpose, whether or not the statements were recognised as writes
+        self.session.info["pending_writes"] = True
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
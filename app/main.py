@@ -1,15 +1,61 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from app.api.middleware.admission import AdmissionControlMiddleware
+from app.api.middleware.query_metrics import QueryMetricsMiddleware
+from app.api.v1.internal import metrics_router
+from app.api.v1.internal import router as internal_router
 from app.api.v1.task import router as task_router
 from app.api.v1.user import router as user_router
+from app.db.main import database, db_config
+from app.services.hashing import password_hasher
+from app.services.outbox import outbox_dispatcher
+from app.services.rate_limit import auth_rate_limiter, user_rate_limiter
+from app.services.task_feed import task_feed
+from app.settings.config import get_config
+
+config = get_config()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    database.start_replica_health_checks(
+        db_config.POSTGRES_REPLICA_HEALTH_CHECK_INTERVAL
+    )
+    if config.OUTBOX_DISPATCHER_ENABLED:
+        outbox_dispatcher.start()
+    if config.TASK_FEED_ENABLED:
+        task_feed.start()
+    yield
+    await task_feed.stop()
+    await outbox_dispatcher.stop()
+    password_hasher.shutdown()
+    await database.dispose()
 
 
 def create_app() -> FastAPI:
     app = FastAPI(
         title="Originals Test Task",
         docs_url="/api/docs",
+        lifespan=lifespan,
     )
     app.include_router(user_router)
     app.include_router(task_router)
+    app.include_router(internal_router)
+    app.include_router(metrics_router)
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        user_limiter=user_rate_limiter,
+        auth_limiter=auth_rate_limiter,
+        max_in_flight=config.ADMISSION_MAX_IN_FLIGHT,
+        max_pool_wait=config.ADMISSION_MAX_POOL_WAIT_SECONDS,
+        pool_wait=database.pool_wait,
+        retry_after=config.ADMISSION_RETRY_AFTER_SECONDS,
+    )
+    # Added last so it sees requests turned away by admission control too
+    app.add_middleware(
+        QueryMetricsMiddleware, n_plus_one_threshold=config.SQL_N_PLUS_ONE_THRESHOLD
+    )
 
     return app
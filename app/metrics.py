@@ -0,0 +1,181 @@
+"""In-process metrics shared by the application components.
+
+Metrics are plain counters and cumulative histograms keyed by label values.
+They are only ever touched from the event loop thread, so no locking is
+needed.
+"""
+from typing import Callable, Iterable
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Counter:
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        return self.values.get(key, 0)
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, count, sum)
+        self.values: dict[tuple, tuple[list[int], int, float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        bucket_counts, count, total = self.values.get(
+            key, ([0] * len(self.buckets), 0, 0.0)
+        )
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                bucket_counts[i] += 1
+        self.values[key] = (bucket_counts, count + 1, total + value)
+
+    def snapshot(self, **labels: str) -> dict:
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        bucket_counts, count, total = self.values.get(
+            key, ([0] * len(self.buckets), 0, 0.0)
+        )
+        return {
+            "buckets": dict(zip(self.buckets, bucket_counts)),
+            "count": count,
+            "sum": total,
+        }
+
+
+class Gauge:
+    """A gauge whose values are sampled from a callback whenever metrics are read"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[tuple, float]],
+        labelnames: Iterable[str] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+
+    @property
+    def values(self) -> dict[tuple, float]:
+        return self.callback()
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram | Gauge] = {}
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[tuple, float]],
+        labelnames: Iterable[str] = (),
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, callback, labelnames))
+
+    def metrics(self) -> list[Counter | Histogram | Gauge]:
+        return list(self._metrics.values())
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+
+        for metric in self._metrics.values():
+            kind = {Counter: "counter", Histogram: "histogram", Gauge: "gauge"}[
+                type(metric)
+            ]
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+
+            for labelvalues, value in sorted(metric.values.items()):
+                labels = list(zip(metric.labelnames, labelvalues))
+                if not isinstance(metric, Histogram):
+                    lines.append(f"{metric.name}{_labels(labels)} {value}")
+                    continue
+
+                bucket_counts, count, total = value
+                for bound, bucket_count in zip(metric.buckets, bucket_counts):
+                    bucket_labels = _labels([*labels, ("le", str(bound))])
+                    lines.append(f"{metric.name}_bucket{bucket_labels} {bucket_count}")
+                lines.append(
+                    f"{metric.name}_bucket{_labels([*labels, ('le', '+Inf')])} {count}"
+                )
+                lines.append(f"{metric.name}_sum{_labels(labels)} {total}")
+                lines.append(f"{metric.name}_count{_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+def _labels(labels: list[tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+
+    escaped = (
+        (
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,148 @@
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Any, Sequence
+
+from sqlalchemy import ColumnElement, and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.db.models.outbox import OutboxMessage
+from app.db.models.user import User
+
+
+class BaseOutboxRepository(ABC):
+    @abstractmethod
+    def add(
+        self, topic: str, payload: dict, recipient_id: int | ColumnElement[Any] | None
+    ) -> OutboxMessage:
+        ...
+
+    @abstractmethod
+    async def claim(
+        self,
+        limit: int,
+        lease_seconds: float,
+        max_attempts: int,
+        window_seconds: float = 0,
+        max_pending: int | None = None,
+    ) -> Sequence[tuple[OutboxMessage, str | None]]:
+        ...
+
+    @abstractmethod
+    async def mark_sent(self, ids: Sequence[int]) -> None:
+        ...
+
+    @abstractmethod
+    async def reschedule(
+        self, ids: Sequence[int], delay_seconds: float, error: str
+    ) -> None:
+        ...
+
+
+class OutboxRepository(BaseOutboxRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def add(
+        self, topic: str, payload: dict, recipient_id: int | ColumnElement[Any] | None
+    ) -> OutboxMessage:
+        """Stage a message in the current transaction, it is only written when the caller commits"""
+        message = OutboxMessage(topic=topic, payload=payload, recipient_id=recipient_id)
+        self.db.add(message)
+
+        return message
+
+    async def claim(
+        self,
+        limit: int,
+        lease_seconds: float,
+        max_attempts: int,
+        window_seconds: float = 0,
+        max_pending: int | None = None,
+    ) -> Sequence[tuple[OutboxMessage, str | None]]:
+        """Lease up to `limit` due messages to the caller, paired with the recipient's email
+
+        Rows locked by another dispatcher are skipped rather than waited on,
+        and a claimed row is pushed `lease_seconds` into the future so it is
+        picked up again if this dispatcher dies before reporting back.
+
+        Messages are held back per recipient until the oldest of them is
+        `window_seconds` old, or until the recipient has `max_pending` of
+        them, and are then claimed together so they can be sent as one.
+        """
+        pending = and_(
+            OutboxMessage.sent_at.is_(None),
+            OutboxMessage.available_at <= func.now(),
+            OutboxMessage.attempts < max_attempts,
+        )
+        settled = func.min(OutboxMessage.created_at) <= func.now() - timedelta(
+            seconds=window_seconds
+        )
+        if max_pending is not None:
+            settled = or_(settled, func.count() >= max_pending)
+        due_recipients = (
+            select(OutboxMessage.recipient_id)
+            .where(pending)
+            .group_by(OutboxMessage.recipient_id)
+            .having(settled)
+        )
+        due = (
+            select(OutboxMessage.id)
+            .where(
+                pending,
+                or_(
+                    # Nobody to wait for, these are dropped by the dispatcher
+                    OutboxMessage.recipient_id.is_(None),
+                    OutboxMessage.recipient_id.in_(due_recipients.scalar_subquery()),
+                ),
+            )
+            .order_by(OutboxMessage.recipient_id, OutboxMessage.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = (
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=OutboxMessage.attempts + 1,
+                available_at=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(*OutboxMessage.__table__.c)
+            .cte("claimed")
+        )
+        message = aliased(OutboxMessage, claimed)
+        stmt = (
+            select(message, User.email)
+            .outerjoin(User, User.id == message.recipient_id)
+            .order_by(message.id)
+        )
+        messages = (await self.db.execute(stmt)).tuples().all()
+        await self.db.commit()
+
+        return messages
+
+    async def mark_sent(self, ids: Sequence[int]) -> None:
+        if not ids:
+            return
+
+        await self.db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(ids))
+            .values(sent_at=func.now(), last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+    async def reschedule(
+        self, ids: Sequence[int], delay_seconds: float, error: str
+    ) -> None:
+        await self.db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(ids))
+            .values(
+                available_at=func.now() + timedelta(seconds=delay_seconds),
+                last_error=error,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
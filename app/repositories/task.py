@@ -1,11 +1,169 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Boolean,
+    Column,
+    ColumnElement,
+    CompoundSelect,
+    FromClause,
+    Integer,
+    MetaData,
+    Row,
+    Select,
+    String,
+    Table,
+    Text,
+    case,
+    cast,
+    column,
+    delete,
+    except_,
+    exists,
+    func,
+    insert,
+    literal,
+    null,
+    or_,
+    select,
+    text,
+    true,
+    tuple_,
+    union,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, ENUM, array_agg
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
 from app.db.common.enums import PriorityEnum, StatusEnum
+from app.db.models.associations import task_assignee
 from app.db.models.task import Task
+from app.db.models.task_archive import ArchivedTask, task_archive_assignee
+from app.db.models.user import User
+from app.settings.config import get_config
+
+config = get_config()
+
+
+def apply_task_filters(
+    stmt: Select,
+    status: StatusEnum | None = None,
+    priority: PriorityEnum | None = None,
+    responsible_person_id: int | None = None,
+    assignee_id: int | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    updated_after: datetime | None = None,
+    updated_before: datetime | None = None,
+    model: type[Task] | type[ArchivedTask] = Task,
+    assignees: Table = task_assignee,
+) -> Select:
+    """Narrow `stmt` down to matching tasks, or archived tasks given their model and assignees"""
+    if status is not None:
+        stmt = stmt.where(model.status == status)
+    if priority is not None:
+        stmt = stmt.where(model.priority == priority)
+    if responsible_person_id is not None:
+        stmt = stmt.where(model.responsible_person_id == responsible_person_id)
+    if assignee_id is not None:
+        stmt = stmt.where(
+            exists().where(
+                assignees.c.task_id == model.id,
+                assignees.c.user_id == assignee_id,
+            )
+        )
+    if created_after is not None:
+        stmt = stmt.where(model.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(model.created_at < created_before)
+    if updated_after is not None:
+        stmt = stmt.where(model.updated_at >= updated_after)
+    if updated_before is not None:
+        stmt = stmt.where(model.updated_at < updated_before)
+
+    return stmt
+
+
+# Channel that task writes NOTIFY, see app/services/task_feed.py
+TASK_CHANGES_CHANNEL = "task_changes"
+
+
+def task_change_event(
+    op: str,
+    tasks: FromClause,
+    user_ids: Sequence[int] | None = None,
+    assignee_ids: Select | CompoundSelect | None = None,
+) -> ColumnElement[str]:
+    """One compact JSON event per row of `tasks`, for pg_notify
+
+    Built from the row as the statement sees it. A statement cannot see its
+    own changes to assignees, so it passes the `assignee_ids` a task ends up
+    with. NOTIFY only delivers on commit, and not at all if the transaction
+    rolls back.
+    """
+    if assignee_ids is None:
+        assignee_ids = select(task_assignee.c.user_id).where(
+            task_assignee.c.task_id == tasks.c.id
+        )
+    assignee_ids = func.array(
+        assignee_ids.order_by(assignee_ids.selected_columns[0]).scalar_subquery()
+    )
+    return cast(
+        func.json_build_object(
+            "op",
+            literal(op, Text),
+            "task_id",
+            tasks.c.id,
+            "responsible_person_id",
+            tasks.c.responsible_person_id,
+            "status",
+            tasks.c.status,
+            "priority",
+            tasks.c.priority,
+            "assignee_ids",
+            assignee_ids,
+            "user_ids",
+            literal(list(user_ids), ARRAY(Integer)) if user_ids is not None else null(),
+            "updated_at",
+            tasks.c.updated_at,
+        ),
+        Text,
+    )
+
+
+# Imported rows are copied here first, and get their task id as they arrive
+# so assignees can be attached to the right task in the same merge
+task_import_staging = Table(
+    "task_import_staging",
+    MetaData(),
+    Column("row_number", Integer, nullable=False),
+    Column(
+        "task_id",
+        Integer,
+        server_default=text("nextval(pg_get_serial_sequence('tasks', 'id'))"),
+    ),
+    Column("title", String(255), nullable=False),
+    Column("description", Text),
+    Column("status", ENUM(name="statusenum", create_type=False), nullable=False),
+    Column("priority", ENUM(name="priorityenum", create_type=False), nullable=False),
+    Column("assignee_ids", ARRAY(Integer), nullable=False),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+IMPORT_COLUMNS = (
+    "row_number",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "assignee_ids",
+)
 
 
 class BaseTaskRepository(ABC):
@@ -21,25 +179,103 @@ class BaseTaskRepository(ABC):
         ...
 
     @abstractmethod
-    async def get_by_id(self, task_id: int) -> Task:
+    async def create_many(self, tasks: Sequence[dict]) -> Sequence[Task]:
         ...
 
     @abstractmethod
-    async def update(self, task_id: int, **kwargs) -> Task:
+    async def import_many(
+        self,
+        responsible_person_id: int,
+        batches: AsyncIterator[Sequence[tuple]],
+    ) -> tuple[int, list[int]]:
         ...
 
     @abstractmethod
-    async def update(self, task_id: int) -> Task:
+    async def get_by_id(self, task_id: int) -> Task | ArchivedTask:
+        ...
+
+    @abstractmethod
+    async def list(
+        self, limit: int, after: tuple[datetime, int] | None = None, **filters
+    ) -> list[Task | ArchivedTask]:
+        ...
+
+    @abstractmethod
+    async def search(
+        self, query: str, limit: int, after: tuple[float, int] | None = None
+    ) -> Sequence[tuple[Task, float]]:
+        ...
+
+    @abstractmethod
+    def export(self, fetch_size: int, **filters) -> AsyncIterator[Sequence[Row]]:
+        ...
+
+    @abstractmethod
+    async def get_version(self, task_id: int) -> int | None:
+        ...
+
+    @abstractmethod
+    async def update(
+        self, task_id: int, expected_version: int | None = None, **kwargs
+    ) -> tuple[Task | None, int | None]:
+        ...
+
+    @abstractmethod
+    async def update_many(self, updates: Sequence[dict]) -> Sequence[Task]:
         ...
 
     @abstractmethod
     async def delete(self, task_id: int) -> bool:
         ...
 
+    @abstractmethod
+    async def delete_many(self, limit: int, **filters) -> Sequence[int]:
+        ...
+
+    @abstractmethod
+    async def add_assignees(
+        self, task_ids: Sequence[int], user_ids: Sequence[int]
+    ) -> None:
+        ...
+
+    @abstractmethod
+    async def remove_assignees(
+        self, task_ids: Sequence[int], user_ids: Sequence[int]
+    ) -> None:
+        ...
+
+    @abstractmethod
+    async def get_assignee_ids(
+        self, task_ids: Sequence[int]
+    ) -> dict[int, Sequence[int]]:
+        ...
+
 
 class TaskRepository(BaseTaskRepository):
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self, db: AsyncSession, publish_changes: bool = config.TASK_FEED_ENABLED
+    ):
         self.db = db
+        # Nobody listens while the feed is disabled
+        self.publish_changes = publish_changes
+
+    @staticmethod
+    def _notify(
+        op: str,
+        tasks: FromClause,
+        user_ids: Sequence[int] | None = None,
+        assignee_ids: Select | CompoundSelect | None = None,
+    ) -> ColumnElement:
+        """Queue a change event for the current row of `tasks`, sent when the transaction commits
+
+        Selected by the write statement itself, so publishing costs no extra
+        round trip. `user_ids` names the users an assignment change was
+        about, since unassigned ones are no longer in the task's assignee ids.
+        """
+        return func.pg_notify(
+            TASK_CHANGES_CHANNEL,
+            task_change_event(op, tasks, user_ids, assignee_ids),
+        )
 
     async def create(
         self,
@@ -49,43 +285,475 @@ class TaskRepository(BaseTaskRepository):
         status: StatusEnum,
         priority: PriorityEnum,
     ) -> Task:
-        new_task = Task(
-            title=title,
-            description=description,
-            responsible_person_id=responsible_person_id,
-            status=status,
-            priority=priority,
+        [new_task] = await self.create_many(
+            [
+                {
+                    "title": title,
+                    "description": description,
+                    "responsible_person_id": responsible_person_id,
+                    "status": status,
+                    "priority": priority,
+                }
+            ]
         )
-        self.db.add(new_task)
-        await self.db.commit()
-        await self.db.refresh(new_task)
-
         return new_task
 
-    async def get_by_id(self, task_id: int) -> Task:
+    async def create_many(self, tasks: Sequence[dict]) -> Sequence[Task]:
+        """Insert all tasks with a single multi-row INSERT ... RETURNING, publishing their events"""
+        if not tasks:
+            return []
+
+        inserted = (
+            insert(Task)
+            .values(list(tasks))
+            .returning(*Task.__table__.columns)
+            .cte("inserted")
+        )
+        stmt = select(aliased(Task, inserted)).order_by(inserted.c.id)
+        if self.publish_changes:
+            stmt = stmt.add_columns(self._notify("created", inserted))
+
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def import_many(
+        self,
+        responsible_person_id: int,
+        batches: AsyncIterator[Sequence[tuple]],
+    ) -> tuple[int, list[int]]:
+        """COPY batches of rows into a staging table, then merge them in one statement
+
+        Each row is `(row_number, title, description, status name, priority
+        name, assignee ids)`. Rows naming a user that does not exist are left
+        out. Returns the number of tasks created and the row numbers left out.
+        No change events are published, an import would flood the feed.
+        """
+        connection = await self.db.connection()
+        await connection.run_sync(task_import_staging.create)
+        raw_connection = await connection.get_raw_connection()
+
+        async for rows in batches:
+            await raw_connection.driver_connection.copy_records_to_table(
+                task_import_staging.name, records=rows, columns=IMPORT_COLUMNS
+            )
+
+        unknown_assignees = await self.db.scalars(
+            text(
+                """
+                DELETE FROM task_import_staging s
+                WHERE EXISTS (
+                    SELECT 1 FROM unnest(s.assignee_ids) AS a(user_id)
+                    WHERE NOT EXISTS (SELECT 1 FROM users u WHERE u.id = a.user_id)
+                )
+                RETURNING s.row_number
+                """
+            )
+        )
+        rejected = sorted(unknown_assignees.all())
+
+        imported = await self.db.scalar(
+            text(
+                """
+                WITH new_tasks AS (
+                    INSERT INTO tasks (
+                        id, title, description, responsible_person_id,
+                        status, priority, created_at, updated_at
+                    )
+                    SELECT task_id, title, description, :responsible_person_id,
+                           status, priority, now(), now()
+                    FROM task_import_staging
+                    ORDER BY row_number
+                    RETURNING id
+                ), new_assignees AS (
+                    INSERT INTO task_assignee (task_id, user_id)
+                    SELECT DISTINCT s.task_id, a.user_id
+                    FROM task_import_staging s
+                    CROSS JOIN LATERAL unnest(s.assignee_ids) AS a(user_id)
+                )
+                SELECT count(*) FROM new_tasks
+                """
+            ),
+            {"responsible_person_id": responsible_person_id},
+        )
+
+        return imported, rejected
+
+    async def get_by_id(self, task_id: int) -> Task | ArchivedTask:
+        """Fetch a task with its assignees, from the archive if it has been moved there"""
+        for model in (Task, ArchivedTask):
+            # The task cache is filled from this, so a task the session
+            # already holds is refreshed rather than returned as it was
+            stmt = (
+                select(model)
+                .options(selectinload(model.assignees))
+                .where(model.id == task_id)
+                .execution_options(populate_existing=True)
+            )
+            result = await self.db.execute(stmt)
+            task = result.scalars().first()
+            if task:
+                return task
+
+        return None
+
+    async def _list_page(
+        self,
+        model: type[Task] | type[ArchivedTask],
+        assignees: Table,
+        limit: int,
+        after: tuple[datetime, int] | None,
+        **filters,
+    ) -> Sequence[Task | ArchivedTask]:
+        stmt = apply_task_filters(
+            select(model), model=model, assignees=assignees, **filters
+        )
+
+        if after is not None:
+            stmt = stmt.where(tuple_(model.created_at, model.id) < after)
+
+        stmt = stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def list(
+        self, limit: int, after: tuple[datetime, int] | None = None, **filters
+    ) -> list[Task | ArchivedTask]:
+        """Return up to `limit` tasks, newest first, strictly after the keyset position `after`
+
+        Archived tasks are merged in, unless the status filter rules them
+        out. Both sides read at most `limit` rows along their
+        `(created_at, id)` indexes, one per archive partition.
+        """
+        tasks = list(
+            await self._list_page(Task, task_assignee, limit, after, **filters)
+        )
+
+        if filters.get("status", StatusEnum.DONE) is StatusEnum.DONE:
+            tasks += await self._list_page(
+                ArchivedTask, task_archive_assignee, limit, after, **filters
+            )
+            tasks.sort(key=lambda task: (task.created_at, task.id), reverse=True)
+
+        return tasks[:limit]
+
+    @staticmethod
+    def _export_rows(
+        model: type[Task] | type[ArchivedTask], assignees: Table, **filters
+    ) -> Select:
+        correlation = [assignees.c.task_id == model.id]
+        if "updated_at" in assignees.c:
+            # Archived assignees are partitioned along with their task
+            correlation.append(assignees.c.updated_at == model.updated_at)
+        assignee_ids = (
+            select(array_agg(assignees.c.user_id)).where(*correlation).scalar_subquery()
+        )
+        return apply_task_filters(
+            select(
+                model.id,
+                model.title,
+                model.description,
+                model.status,
+                model.priority,
+                model.responsible_person_id,
+                model.created_at,
+                model.updated_at,
+                assignee_ids.label("assignee_ids"),
+            ),
+            model=model,
+            assignees=assignees,
+            **filters,
+        )
+
+    async def export(self, fetch_size: int, **filters) -> AsyncIterator[Sequence[Row]]:
+        """Stream matching tasks with their assignee ids, `fetch_size` rows at a time
+
+        Rows come from a server-side cursor as plain columns rather than ORM
+        objects, so nothing accumulates in the session however many there are.
+        Archived tasks are included like in `list`, merged in by id.
+        """
+        stmt = self._export_rows(Task, task_assignee, **filters)
+        if filters.get("status", StatusEnum.DONE) is StatusEnum.DONE:
+            stmt = union_all(
+                stmt,
+                self._export_rows(ArchivedTask, task_archive_assignee, **filters),
+            )
+        stmt = stmt.order_by(stmt.selected_columns.id)
+
+        result = await self.db.stream(stmt.execution_options(yield_per=fetch_size))
+        async for rows in result.partitions():
+            yield rows
+
+    async def search(
+        self, query: str, limit: int, after: tuple[float, int] | None = None
+    ) -> Sequence[tuple[Task, float]]:
+        """Rank tasks by full-text relevance, falling back to fuzzy title similarity
+
+        Both predicates are served by GIN indexes (`ix_tasks_search_vector` and
+        `ix_tasks_title_trgm`) and combined with a bitmap OR.
+        """
+        ts_query = func.websearch_to_tsquery("english", query)
+        rank = func.greatest(
+            func.ts_rank_cd(Task.search_vector, ts_query),
+            func.similarity(Task.title, query),
+        )
+        stmt = select(Task, rank.label("rank")).where(
+            or_(
+                Task.search_vector.bool_op("@@")(ts_query),
+                Task.title.bool_op("%")(query),
+            )
+        )
+
+        if after is not None:
+            stmt = stmt.where(tuple_(rank, Task.id) < after)
+
+        stmt = stmt.order_by(rank.desc(), Task.id.desc()).limit(limit)
+        result = await self.db.execute(stmt)
+        return [(task, rank) for task, rank in result.all()]
+
+    async def get_version(self, task_id: int) -> int | None:
+        """Fetch only the row version, without loading the task
+
+        The archive is only looked up when the task is not in `tasks`, as
+        COALESCE stops at the first value that is not null.
+        """
+        return await self.db.scalar(
+            select(
+                func.coalesce(
+                    select(Task.version).where(Task.id == task_id).scalar_subquery(),
+                    select(ArchivedTask.version)
+                    .where(ArchivedTask.id == task_id)
+                    .scalar_subquery(),
+                )
+            )
+        )
+
+    async def update(
+        self, task_id: int, expected_version: int | None = None, **kwargs
+    ) -> tuple[Task | None, int | None]:
+        """Update a task in one statement, returning it and the version it had before
+
+        The task comes back as None when nothing was updated: with a version
+        of None too if the task does not exist, or with its latest committed
+        version if that is not `expected_version`.
+        """
+        if not kwargs:
+            task = await self.get_by_id(task_id=task_id)
+            if task is None or expected_version in (None, task.version):
+                return task, task and task.version
+            return None, task.version
+
+        conditions = [Task.id == task_id]
+        if expected_version is not None:
+            conditions.append(Task.version == expected_version)
+
+        # Read from the same snapshot the UPDATE starts from, so a missing
+        # task and a version conflict are told apart without another query
+        current = select(Task.version).where(Task.id == task_id).cte("current")
+        updated = (
+            update(Task)
+            .where(*conditions)
+            .values(**kwargs, version=Task.version + 1)
+            .returning(*Task.__table__.columns)
+            .cte("updated")
+        )
+        updated_task = aliased(Task, updated)
         stmt = (
-            select(Task).options(selectinload(Task.assignees)).where(Task.id == task_id)
+            select(updated_task, current.c.version)
+            .select_from(current)
+            .outerjoin(updated, true())
+            .execution_options(populate_existing=True)
+        )
+        if self.publish_changes:
+            # Only when the row was updated, the outer join leaves NULLs otherwise
+            stmt = stmt.add_columns(
+                case((updated.c.id.is_not(None), self._notify("updated", updated)))
+            )
+
+        row = (await self.db.execute(stmt)).one_or_none()
+        if row is None:
+            return None, None
+
+        task, version, *_ = row
+        if task is None:
+            # A writer that committed after the snapshot was taken makes the
+            # UPDATE re-check the row it left, which the snapshot cannot see
+            version = await self.db.scalar(
+                select(Task.version).where(Task.id == task_id)
+            )
+        return task, version
+
+    async def update_many(self, updates: Sequence[dict]) -> Sequence[Task]:
+        """Apply partial updates with a single UPDATE ... FROM (VALUES ...) RETURNING
+
+        Each update is a dict with an `id` and any subset of the editable
+        fields. Tasks that do not exist are simply absent from the result.
+        """
+        if not updates:
+            return []
+
+        changes = values(
+            column("id", Integer),
+            column("title", String),
+            column("set_description", Boolean),
+            column("description", Text),
+            column("status", Task.status.type),
+            column("priority", Task.priority.type),
+            name="changes",
+        ).data(
+            [
+                (
+                    item["id"],
+                    item.get("title"),
+                    "description" in item,
+                    item.get("description"),
+                    item.get("status"),
+                    item.get("priority"),
+                )
+                for item in updates
+            ]
+        )
+        # Non-nullable columns treat NULL as "unchanged", description needs an
+        # explicit flag since clearing it is a legitimate update. The casts
+        # keep the enum columns typed when every row of a batch leaves them NULL.
+        updated = (
+            update(Task)
+            .where(Task.id == changes.c.id)
+            .values(
+                title=func.coalesce(changes.c.title, Task.title),
+                description=case(
+                    (changes.c.set_description, changes.c.description),
+                    else_=Task.description,
+                ),
+                status=func.coalesce(
+                    cast(changes.c.status, Task.status.type), Task.status
+                ),
+                priority=func.coalesce(
+                    cast(changes.c.priority, Task.priority.type), Task.priority
+                ),
+                version=Task.version + 1,
+            )
+            .returning(*Task.__table__.columns)
+            .cte("updated")
         )
+        stmt = select(aliased(Task, updated)).execution_options(populate_existing=True)
+        if self.publish_changes:
+            stmt = stmt.add_columns(self._notify("updated", updated))
+
         result = await self.db.execute(stmt)
-        return result.scalars().first()
+        return result.scalars().all()
 
-    async def update(self, task_id: int, **kwargs) -> Task:
-        task = await self.get_by_id(task_id=task_id)
+    async def _delete_where(self, *conditions: ColumnElement[bool]) -> Sequence[int]:
+        """Delete matching tasks with one DELETE ... RETURNING, publishing their events
 
-        if task:
-            for key, value in kwargs.items():
-                setattr(task, key, value)
-            await self.db.commit()
-            await self.db.refresh(task)
+        Assignees go with their task through the cascading foreign key. The
+        events are built in the same statement, whose snapshot still has the
+        deleted rows and their assignees.
+        """
+        deleted = (
+            delete(Task)
+            .where(*conditions)
+            .returning(*Task.__table__.columns)
+            .cte("deleted")
+        )
+        stmt = select(deleted.c.id)
+        if self.publish_changes:
+            stmt = stmt.add_columns(self._notify("deleted", deleted))
 
-        return task
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
 
     async def delete(self, task_id: int) -> bool:
-        task = await self.get_by_id(task_id=task_id)
+        return bool(await self._delete_where(Task.id == task_id))
+
+    async def delete_many(self, limit: int, **filters) -> Sequence[int]:
+        """Delete up to `limit` tasks matching the filters, returning their ids
+
+        Tasks locked by other transactions are skipped rather than waited
+        for, so a batch only ever locks rows it is about to delete.
+        """
+        batch = (
+            apply_task_filters(select(Task.id), **filters)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return await self._delete_where(Task.id.in_(batch.scalar_subquery()))
+
+    async def add_assignees(
+        self, task_ids: Sequence[int], user_ids: Sequence[int]
+    ) -> None:
+        """Assign every user to every task with one INSERT ... SELECT ... ON CONFLICT DO NOTHING
+
+        Ids that do not match an existing task or user are skipped by the
+        join instead of failing the statement on a foreign key violation.
+        """
+        pairs = (
+            select(Task.id, User.id)
+            .join_from(Task, User, true())
+            .where(Task.id.in_(task_ids), User.id.in_(user_ids))
+        )
+        stmt = (
+            pg_insert(task_assignee)
+            .from_select(["task_id", "user_id"], pairs)
+            .on_conflict_do_nothing()
+        )
+        if not self.publish_changes:
+            await self.db.execute(stmt)
+            return
+
+        inserted = stmt.returning(task_assignee.c.task_id, task_assignee.c.user_id).cte(
+            "inserted"
+        )
+        tasks = Task.__table__
+        assignee_ids = union(
+            select(task_assignee.c.user_id).where(
+                task_assignee.c.task_id == tasks.c.id
+            ),
+            select(inserted.c.user_id).where(inserted.c.task_id == tasks.c.id),
+        )
+        await self.db.execute(
+            select(self._notify("assigned", tasks, user_ids, assignee_ids)).where(
+                tasks.c.id.in_(task_ids)
+            )
+        )
+
+    async def remove_assignees(
+        self, task_ids: Sequence[int], user_ids: Sequence[int]
+    ) -> None:
+        stmt = delete(task_assignee).where(
+            task_assignee.c.task_id.in_(task_ids),
+            task_assignee.c.user_id.in_(user_ids),
+        )
+        if not self.publish_changes:
+            await self.db.execute(stmt)
+            return
+
+        removed = stmt.returning(task_assignee.c.task_id, task_assignee.c.user_id).cte(
+            "removed"
+        )
+        tasks = Task.__table__
+        assignee_ids = except_(
+            select(task_assignee.c.user_id).where(
+                task_assignee.c.task_id == tasks.c.id
+            ),
+            select(removed.c.user_id).where(removed.c.task_id == tasks.c.id),
+        )
+        await self.db.execute(
+            select(self._notify("unassigned", tasks, user_ids, assignee_ids)).where(
+                tasks.c.id.in_(task_ids)
+            )
+        )
 
-        if task:
-            self.db.delete(task)
-            self.db.commit()
-            return True
+    async def get_assignee_ids(
+        self, task_ids: Sequence[int]
+    ) -> dict[int, Sequence[int]]:
+        """Map each existing task id to its assignee ids, tasks that do not exist are left out"""
+        assignee_ids = func.array_remove(array_agg(task_assignee.c.user_id), None)
+        stmt = (
+            select(Task.id, assignee_ids)
+            .outerjoin(task_assignee, task_assignee.c.task_id == Task.id)
+            .where(Task.id.in_(task_ids))
+            .group_by(Task.id)
+        )
+        result = await self.db.execute(stmt)
 
-        return False
+        return {task_id: sorted(user_ids) for task_id, user_ids in result.all()}
@@ -0,0 +1,216 @@
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from typing import Sequence
+
+from sqlalchemy import delete, func, literal, select, text, tuple_, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.common.enums import StatusEnum, TaskRoleEnum
+from app.db.models.task import Task
+from app.db.models.task_archive import ArchivedTask, task_archive_assignee
+from app.db.models.task_counter import TaskCounter
+from app.repositories.task import apply_task_filters
+from app.repositories.task_counter import COUNTER_KEY
+
+ARCHIVE_TABLES = (ArchivedTask.__tablename__, task_archive_assignee.name)
+
+# Moves one batch of done tasks and their assignees in a single statement.
+# Assignee rows are read from the statement's snapshot and removed by the
+# cascading foreign key. Tasks locked by a writer are skipped, they are
+# picked up by a later batch.
+ARCHIVE_BATCH = text(
+    """
+    WITH batch AS (
+        SELECT id FROM tasks
+        WHERE status = 'DONE' AND updated_at < :cutoff
+        ORDER BY updated_at, id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ), moved AS (
+        DELETE FROM tasks t USING batch b
+        WHERE t.id = b.id
+        RETURNING t.id, t.title, t.description, t.responsible_person_id,
+                  t.status, t.priority, t.version, t.created_at, t.updated_at
+    ), archived AS (
+        INSERT INTO tasks_archive (
+            id, title, description, responsible_person_id, status, priority,
+            version, created_at, updated_at, archived_at
+        )
+        SELECT id, title, description, responsible_person_id, status, priority,
+               version, created_at, updated_at, now()
+        FROM moved
+    ), archived_assignees AS (
+        INSERT INTO tasks_archive_assignee (task_id, user_id, updated_at)
+        SELECT a.task_id, a.user_id, m.updated_at
+        FROM task_assignee a JOIN moved m ON m.id = a.task_id
+    )
+    SELECT count(*) FROM moved
+    """
+)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+class BaseTaskArchiveRepository(ABC):
+    @abstractmethod
+    async def get_cutoff(self, age: timedelta) -> datetime:
+        ...
+
+    @abstractmethod
+    async def ensure_partitions(self, cutoff: datetime) -> Sequence[str]:
+        ...
+
+    @abstractmethod
+    async def archive_batch(self, cutoff: datetime, limit: int) -> int:
+        ...
+
+    @abstractmethod
+    async def delete_many(self, limit: int, **filters) -> Sequence[int]:
+        ...
+
+
+class TaskArchiveRepository(BaseTaskArchiveRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_cutoff(self, age: timedelta) -> datetime:
+        """The moment `age` ago by the database clock, which task timestamps come from"""
+        return await self.db.scalar(select(func.localtimestamp() - age))
+
+    async def ensure_partitions(self, cutoff: datetime) -> Sequence[str]:
+        """Create the monthly partitions tasks done before `cutoff` will go to
+
+        Returns the names of the partitions created. Existing ones are left
+        alone without taking any lock on the archive.
+        """
+        oldest = await self.db.scalar(
+            select(func.min(Task.updated_at)).where(
+                Task.status == StatusEnum.DONE, Task.updated_at < cutoff
+            )
+        )
+        if oldest is None:
+            return []
+
+        existing = set(
+            await self.db.scalars(
+                text(
+                    """
+                    SELECT c.relname FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    JOIN pg_class p ON p.oid = i.inhparent
+                    WHERE p.relname = ANY(:tables)
+                    """
+                ),
+                {"tables": list(ARCHIVE_TABLES)},
+            )
+        )
+
+        created = []
+        month = date(oldest.year, oldest.month, 1)
+        while month <= cutoff.date():
+            for table in ARCHIVE_TABLES:
+                name = f"{table}_y{month:%Y}m{month:%m}"
+                if name in existing:
+                    continue
+                await self.db.execute(
+                    text(
+                        f"CREATE TABLE {name} PARTITION OF {table} "
+                        f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+                    )
+                )
+                created.append(name)
+            month = _next_month(month)
+        await self.db.commit()
+
+        return created
+
+    async def archive_batch(self, cutoff: datetime, limit: int) -> int:
+        """Move up to `limit` tasks done before `cutoff` to the archive, returning how many
+
+        The moved tasks still count towards task_counters, so the counter
+        triggers are turned off for the transaction.
+        """
+        await self.db.execute(text("SET LOCAL app.skip_task_counters = on"))
+        archived = await self.db.scalar(
+            ARCHIVE_BATCH, {"cutoff": cutoff, "limit": limit}
+        )
+        await self.db.commit()
+
+        return archived
+
+    async def delete_many(self, limit: int, **filters) -> Sequence[int]:
+        """Delete up to `limit` archived tasks matching the filters, returning their ids
+
+        Their assignees go in the same statement, which also takes them off
+        task_counters as the archive has no counter triggers. An updated_at
+        range only scans the partitions it overlaps.
+        """
+        batch = (
+            apply_task_filters(
+                select(ArchivedTask.id, ArchivedTask.updated_at),
+                model=ArchivedTask,
+                assignees=task_archive_assignee,
+                **filters,
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        deleted = (
+            delete(ArchivedTask)
+            .where(tuple_(ArchivedTask.id, ArchivedTask.updated_at).in_(batch))
+            .returning(
+                ArchivedTask.id,
+                ArchivedTask.updated_at,
+                ArchivedTask.responsible_person_id,
+                ArchivedTask.status,
+                ArchivedTask.priority,
+            )
+            .cte("deleted")
+        )
+        deleted_assignees = (
+            delete(task_archive_assignee)
+            .where(
+                task_archive_assignee.c.task_id == deleted.c.id,
+                task_archive_assignee.c.updated_at == deleted.c.updated_at,
+            )
+            .returning(
+                task_archive_assignee.c.user_id, deleted.c.status, deleted.c.priority
+            )
+            .cte("deleted_assignees")
+        )
+
+        role = TaskCounter.role.type
+        counts = union_all(
+            select(
+                deleted.c.responsible_person_id.label("user_id"),
+                literal(TaskRoleEnum.RESPONSIBLE, role).label("role"),
+                deleted.c.status,
+                deleted.c.priority,
+                func.count().label("count"),
+            ).group_by(
+                deleted.c.responsible_person_id, deleted.c.status, deleted.c.priority
+            ),
+            select(
+                deleted_assignees.c.user_id,
+                literal(TaskRoleEnum.ASSIGNEE, role),
+                deleted_assignees.c.status,
+                deleted_assignees.c.priority,
+                func.count(),
+            ).group_by(
+                deleted_assignees.c.user_id,
+                deleted_assignees.c.status,
+                deleted_assignees.c.priority,
+            ),
+        ).cte("counts")
+        # Nothing selects from it, add_cte has it run all the same
+        decremented = (
+            update(TaskCounter)
+            .where(*(getattr(TaskCounter, key) == counts.c[key] for key in COUNTER_KEY))
+            .values(count=TaskCounter.count - counts.c.count)
+            .cte("decremented")
+        )
+
+        result = await self.db.scalars(select(deleted.c.id).add_cte(decremented))
+        return result.all()
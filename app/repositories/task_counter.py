@@ -0,0 +1,140 @@
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+from sqlalchemy import Row, Select, Table, and_, func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.common.enums import TaskRoleEnum
+from app.db.models.associations import task_assignee
+from app.db.models.task import Task
+from app.db.models.task_archive import ArchivedTask, task_archive_assignee
+from app.db.models.task_counter import TaskCounter
+
+COUNTER_KEY = ("user_id", "role", "status", "priority")
+
+
+def _counts(model: type[Task] | type[ArchivedTask], assignees: Table) -> list[Select]:
+    role = TaskCounter.role.type
+    responsible = select(
+        model.responsible_person_id.label("user_id"),
+        literal(TaskRoleEnum.RESPONSIBLE, role).label("role"),
+        model.status,
+        model.priority,
+        func.count().label("count"),
+    ).group_by(model.responsible_person_id, model.status, model.priority)
+    assigned = (
+        select(
+            assignees.c.user_id,
+            literal(TaskRoleEnum.ASSIGNEE, role).label("role"),
+            model.status,
+            model.priority,
+            func.count().label("count"),
+        )
+        .join(model, model.id == assignees.c.task_id)
+        .group_by(assignees.c.user_id, model.status, model.priority)
+    )
+    return [responsible, assigned]
+
+
+def _mismatches() -> Select:
+    """Counters that disagree with counts taken from the base tables
+
+    Archived tasks are counted along with the others.
+    """
+    counts = union_all(
+        *_counts(Task, task_assignee),
+        *_counts(ArchivedTask, task_archive_assignee),
+    ).subquery()
+    actual = (
+        select(
+            *(counts.c[key] for key in COUNTER_KEY),
+            func.sum(counts.c.count).label("count"),
+        )
+        .group_by(*(counts.c[key] for key in COUNTER_KEY))
+        .cte("actual")
+    )
+
+    stored_count = func.coalesce(TaskCounter.count, 0)
+    actual_count = func.coalesce(actual.c.count, 0)
+    return (
+        select(
+            *(
+                func.coalesce(getattr(TaskCounter, key), actual.c[key]).label(key)
+                for key in COUNTER_KEY
+            ),
+            stored_count.label("stored"),
+            actual_count.label("actual"),
+        )
+        .select_from(TaskCounter)
+        .join(
+            actual,
+            and_(*(getattr(TaskCounter, key) == actual.c[key] for key in COUNTER_KEY)),
+            full=True,
+        )
+        .where(stored_count != actual_count)
+    )
+
+
+class BaseTaskCounterRepository(ABC):
+    @abstractmethod
+    async def get_for_user(self, user_id: int) -> Sequence[TaskCounter]:
+        ...
+
+    @abstractmethod
+    async def find_mismatches(self, limit: int | None = None) -> Sequence[Row]:
+        ...
+
+    @abstractmethod
+    async def repair(self) -> int:
+        ...
+
+
+class TaskCounterRepository(BaseTaskCounterRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_for_user(self, user_id: int) -> Sequence[TaskCounter]:
+        """Non-zero counters of a user, a primary key range scan of at most 30 rows"""
+        result = await self.db.scalars(
+            select(TaskCounter).where(
+                TaskCounter.user_id == user_id, TaskCounter.count > 0
+            )
+        )
+        return result.all()
+
+    async def find_mismatches(self, limit: int | None = None) -> Sequence[Row]:
+        """Counters that are off, as `(user_id, role, status, priority, stored, actual)`
+
+        A single statement reads one snapshot, and the triggers keep the
+        counters in step within every transaction, so this is exact while
+        writes go on.
+        """
+        result = await self.db.execute(_mismatches().limit(limit))
+        return result.all()
+
+    async def repair(self) -> int:
+        """Overwrite every counter that is off with the actual count, returning how many were
+
+        Writes to tasks and assignees wait until the transaction commits, so
+        no change can slip in between counting and writing.
+        """
+        await self.db.execute(
+            text(
+                "LOCK TABLE tasks, task_assignee, tasks_archive, "
+                "tasks_archive_assignee IN SHARE MODE"
+            )
+        )
+        mismatches = _mismatches().subquery()
+        stmt = pg_insert(TaskCounter).from_select(
+            [*COUNTER_KEY, "count"],
+            select(*(mismatches.c[key] for key in COUNTER_KEY), mismatches.c.actual),
+        )
+        result = await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=COUNTER_KEY, set_={"count": stmt.excluded["count"]}
+            )
+        )
+        await self.db.commit()
+
+        return result.rowcount
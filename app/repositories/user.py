@@ -1,9 +1,94 @@
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Sequence
 
-from sqlalchemy import select
+from sqlalchemy import event, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
 
 from app.db.models.user import User
+from app.settings.config import get_config
+
+config = get_config()
+
+
+class UserCache:
+    """In-process TTL cache of detached `User` instances, addressable by id and username"""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._by_id: OrderedDict[int, tuple[User, float]] = OrderedDict()
+        self._ids_by_username: dict[str, int] = {}
+
+    def get_by_id(self, id: int) -> User | None:
+        entry = self._by_id.get(id)
+        if entry is None:
+            return None
+
+        user, expires_at = entry
+        if expires_at <= time.monotonic():
+            self.invalidate(user_id=id)
+            return None
+
+        self._by_id.move_to_end(id)
+        return user
+
+    def get_by_username(self, username: str) -> User | None:
+        id = self._ids_by_username.get(username)
+        return self.get_by_id(id) if id is not None else None
+
+    def put(self, user: User) -> None:
+        self.invalidate(user_id=user.id)
+        self._by_id[user.id] = (user, time.monotonic() + self.ttl)
+        self._ids_by_username[user.username] = user.id
+
+        while len(self._by_id) > self.max_size:
+            _, (evicted, _) = self._by_id.popitem(last=False)
+            self._ids_by_username.pop(evicted.username, None)
+
+    def invalidate(
+        self, user_id: int | None = None, username: str | None = None
+    ) -> None:
+        if user_id is None and username is not None:
+            user_id = self._ids_by_username.get(username)
+        if username is not None:
+            self._ids_by_username.pop(username, None)
+
+        entry = self._by_id.pop(user_id, None) if user_id is not None else None
+        if entry is not None:
+            self._ids_by_username.pop(entry[0].username, None)
+
+    def clear(self) -> None:
+        self._by_id.clear()
+        self._ids_by_username.clear()
+
+
+user_cache = UserCache(
+    ttl=config.USER_CACHE_TTL_SECONDS, max_size=config.USER_CACHE_SIZE
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_user(mapper, connection, target: User) -> None:
+    # Evicted only once the change is committed, so a concurrent reader
+    # cannot re-cache the old row between our flush and commit
+    usernames = {target.username, *inspect(target).attrs.username.history.deleted}
+    pending = object_session(target).info.setdefault("changed_users", set())
+    pending.update((target.id, username) for username in usernames)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for user_id, username in session.info.pop("changed_users", ()):
+        user_cache.invalidate(user_id=user_id, username=username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("changed_users", None)
 
 
 class BaseUserRepository(ABC):
@@ -21,6 +106,14 @@ class BaseUserRepository(ABC):
     async def get_by_username(self, username: str) -> User:
         ...
 
+    @abstractmethod
+    async def get_existing_ids(self, ids: Sequence[int]) -> set[int]:
+        ...
+
+    @abstractmethod
+    def invalidate(self, user: User) -> None:
+        ...
+
 
 class UserRepository(BaseUserRepository):
     def __init__(self, db: AsyncSession):
@@ -31,19 +124,55 @@ class UserRepository(BaseUserRepository):
     ) -> User | None:
         new_user = User(username=username, email=email, password=hashed_password)
         self.db.add(new_user)
-        await self.db.commit()
-        await self.db.refresh(new_user)
+        # Generated columns come back with the INSERT through RETURNING
+        await self.db.flush()
 
         return new_user
 
     async def get_by_id(self, id: str) -> User:
+        cached = user_cache.get_by_id(int(id))
+        if cached is not None:
+            return await self._attach(cached)
+
         stmt = select(User).where(User.id == id)
         result = await self.db.execute(stmt)
 
-        return result.scalar_one_or_none()
+        return await self._cache(result.scalar_one_or_none())
 
     async def get_by_username(self, username: str) -> User:
+        cached = user_cache.get_by_username(username)
+        if cached is not None:
+            return await self._attach(cached)
+
         stmt = select(User).where(User.username == username)
         result = await self.db.execute(stmt)
 
-        return result.scalar_one_or_none()
+        return await self._cache(result.scalar_one_or_none())
+
+    async def get_existing_ids(self, ids: Sequence[int]) -> set[int]:
+        """The ids among `ids` that belong to a user, read from the table rather than the cache"""
+        result = await self.db.scalars(select(User.id).where(User.id.in_(ids)))
+        return set(result)
+
+    def invalidate(self, user: User) -> None:
+        user_cache.invalidate(user_id=user.id, username=user.username)
+
+    async def _attach(self, cached: User) -> User:
+        # merge(load=False) copies the cached state into this session without a query
+        return await self.db.merge(cached, load=False)
+
+    async def _cache(self, user: User | None) -> User | None:
+        if user is not None:
+            user_cache.put(self._detached_copy(user))
+
+        return user
+
+    @staticmethod
+    def _detached_copy(user: User) -> User:
+        # The cache keeps its own instance that is never bound to a session,
+        # every hit merges a session-local copy of it
+        copy = User(
+            **{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        )
+        make_transient_to_detached(copy)
+        return copy
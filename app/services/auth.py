@@ -6,10 +6,13 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.db.common.enums import RoleEnum
+from app.services.token_cache import TokenCache
 from app.settings.config import get_config
 
 config = get_config()
 
+token_cache = TokenCache(max_size=config.TOKEN_CACHE_SIZE)
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
@@ -51,8 +54,20 @@ def create_refresh_token(data: dict):
     return encoded_jwt
 
 
+def verify_access_token(token: str) -> dict | None:
+    """Decode a token, or take it from the cache of tokens verified before"""
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_access_token(token)
+        if payload:
+            token_cache.put(token, payload)
+
+    return payload
+
+
 def get_current_user(token: str = Depends(oauth2_scheme)):
-    payload = decode_access_token(token)
+    payload = verify_access_token(token)
+
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,16 +1,114 @@
+import asyncio
+import smtplib
 from abc import ABC, abstractmethod
+from email.message import EmailMessage
 
 from app.db.common.enums import StatusEnum
+from app.settings.config import get_config
+
+config = get_config()
+
+
+class BaseEmailTransport(ABC):
+    @abstractmethod
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        ...
+
+
+class ConsoleEmailTransport(BaseEmailTransport):
+    """Prints messages instead of delivering them, for local development"""
+
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        print(f"Email sent to {recipient}: {subject}\n{body}")
+
+
+class SMTPEmailTransport(BaseEmailTransport):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        timeout: float = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body)
+
+        # smtplib blocks, keep it off the event loop
+        await asyncio.to_thread(self._send, message)
+
+    def _send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(message)
+
+
+def get_email_transport() -> BaseEmailTransport:
+    if config.EMAIL_TRANSPORT == "smtp":
+        return SMTPEmailTransport(
+            host=config.SMTP_HOST,
+            port=config.SMTP_PORT,
+            sender=config.SMTP_SENDER,
+            username=config.SMTP_USERNAME,
+            password=config.SMTP_PASSWORD,
+            use_tls=config.SMTP_USE_TLS,
+        )
+
+    return ConsoleEmailTransport()
 
 
 class BaseEmailService(ABC):
     @abstractmethod
-    async def send_email(self, task_id: int, status: StatusEnum) -> str:
+    async def send_email(
+        self, recipient: str, task_id: int, status: StatusEnum
+    ) -> None:
+        ...
+
+    @abstractmethod
+    async def send_digest(
+        self, recipient: str, changes: list[tuple[int, StatusEnum]]
+    ) -> None:
         ...
 
 
 class EmailService(BaseEmailService):
-    async def send_email(self, task_id: int, status: StatusEnum) -> str:
-        print(
-            f"Email sent to responsible person: Task {task_id} status changed to {status}"
+    def __init__(self, transport: BaseEmailTransport | None = None):
+        self.transport = transport or get_email_transport()
+
+    async def send_email(
+        self, recipient: str, task_id: int, status: StatusEnum
+    ) -> None:
+        await self.transport.send(
+            recipient,
+            subject=f"Task {task_id} status changed",
+            body=f"Task {task_id} status changed to {status.value}",
+        )
+
+    async def send_digest(
+        self, recipient: str, changes: list[tuple[int, StatusEnum]]
+    ) -> None:
+        lines = "\n".join(
+            f"Task {task_id}: {status.value}" for task_id, status in changes
+        )
+        await self.transport.send(
+            recipient,
+            subject=f"{len(changes)} tasks changed status",
+            body=f"The status of the following tasks changed:\n{lines}",
         )
@@ -0,0 +1,4 @@
+class HashingUnavailableError(Exception):
+    """Raised when the password hashing pool is saturated and the request is shed."""
+
+    pass
@@ -2,3 +2,10 @@ class TaskNotFoundException(Exception):
     def __init__(self, message: str):
         self.message = message
         super().__init__(self.message)
+
+
+class TaskVersionConflictException(Exception):
+    def __init__(self, message: str, current_version: int):
+        self.message = message
+        self.current_version = current_version
+        super().__init__(self.message)
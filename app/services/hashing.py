@@ -0,0 +1,121 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from app.metrics import registry
+from app.services.auth import get_hashed_password, verify_password
+from app.services.exceptions.hashing import HashingUnavailableError
+from app.settings.config import get_config
+
+config = get_config()
+
+queue_wait_seconds = registry.histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a hashing job waited for a free worker process",
+    labelnames=("operation",),
+)
+hash_duration_seconds = registry.histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying a password inside a worker process",
+    labelnames=("operation",),
+)
+rejected_total = registry.counter(
+    "password_hash_rejected_total",
+    "Hashing jobs shed because the pool was saturated",
+    labelnames=("operation",),
+)
+
+
+def _timed(fn: Callable, *args: Any) -> tuple[Any, float, float]:
+    """Run in the worker process, reporting when the job started and how long it ran"""
+    started_at = time.time()
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, started_at, time.perf_counter() - started
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class PasswordHasher:
+    """Runs bcrypt in a process pool so hashing never blocks the event loop
+
+    At most `max_pending` jobs may be running or queued at once. Further jobs
+    wait up to `acquire_timeout` seconds for a slot and are then rejected
+    with `HashingUnavailableError` instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int, acquire_timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.acquire_timeout = acquire_timeout
+        self._slots = asyncio.Semaphore(max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_hashed_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            "verify", verify_password, plain_password, hashed_password
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily so worker processes are forked from the serving process
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _acquire(self, operation: str) -> None:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+
+        try:
+            if self.acquire_timeout <= 0:
+                raise asyncio.TimeoutError
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            rejected_total.inc(operation=operation)
+            raise HashingUnavailableError("Password hashing is saturated")
+
+    async def _run(self, operation: str, fn: Callable, *args: Any) -> Any:
+        await self._acquire(operation)
+
+        try:
+            loop = asyncio.get_running_loop()
+            submitted_at = time.time()
+            result, started_at, duration = await loop.run_in_executor(
+                self._get_executor(), _timed, fn, *args
+            )
+        except BrokenProcessPool:
+            # A worker died, start over with a fresh pool on the next job
+            self.shutdown()
+            raise HashingUnavailableError("Password hashing pool is unavailable")
+        finally:
+            self._slots.release()
+
+        queue_wait_seconds.observe(
+            max(started_at - submitted_at, 0), operation=operation
+        )
+        hash_duration_seconds.observe(duration, operation=operation)
+
+        return result
+
+
+password_hasher = PasswordHasher(
+    workers=config.PASSWORD_HASH_WORKERS or available_cpus(),
+    max_pending=config.PASSWORD_HASH_MAX_PENDING,
+    acquire_timeout=config.PASSWORD_HASH_ACQUIRE_TIMEOUT,
+)
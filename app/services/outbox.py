@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable
+
+from app.db.common.enums import StatusEnum
+from app.db.database import Database
+from app.db.main import database
+from app.db.models.outbox import OutboxMessage
+from app.metrics import registry
+from app.repositories.outbox import OutboxRepository
+from app.services.email import BaseEmailService, EmailService
+from app.settings.config import get_config
+
+config = get_config()
+
+logger = logging.getLogger(__name__)
+
+TASK_STATUS_CHANGED = "task.status_changed"
+
+outbox_deliveries = registry.counter(
+    "outbox_deliveries_total",
+    "Outbox delivery attempts by topic and result",
+    labelnames=("topic", "result"),
+)
+
+
+notification_digest_size = registry.histogram(
+    "notification_digest_size",
+    "Outbox messages coalesced into one notification",
+    labelnames=("topic",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+
+Handler = Callable[[str, list[OutboxMessage]], Awaitable[None]]
+
+
+class OutboxDispatcher:
+    """Background loop that delivers committed outbox messages
+
+    Messages for the same recipient and topic are coalesced into a single
+    notification: they wait in the outbox table for up to `digest_window`
+    seconds, or until `digest_max_pending` of them pile up, and are then
+    claimed and sent together. Memory use is bounded by `batch_size`.
+
+    Delivery is at least once: a message whose lease runs out before it is
+    reported sent, for example because the process died mid-batch, is
+    claimed again by whichever dispatcher polls next.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        email_service: BaseEmailService,
+        batch_size: int = 100,
+        poll_interval: float = 1,
+        lease_seconds: float = 60,
+        max_attempts: int = 10,
+        backoff_base: float = 2,
+        backoff_max: float = 600,
+        digest_window: float = 0,
+        digest_max_pending: int | None = None,
+        drain_timeout: float = 10,
+    ):
+        self.database = database
+        self.email_service = email_service
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.digest_window = digest_window
+        self.digest_max_pending = digest_max_pending
+        self.drain_timeout = drain_timeout
+        self._handlers: dict[str, Handler] = {
+            TASK_STATUS_CHANGED: self._send_status_changes,
+        }
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Let the batch in flight finish, then flush whatever is still buffered"""
+        if self._task is None:
+            return
+
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+        try:
+            await asyncio.wait_for(self.drain(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Outbox drain timed out, the rest is left for the next run")
+        except Exception:
+            logger.exception("Outbox drain failed")
+
+    async def drain(self) -> None:
+        """Deliver everything that is due, without waiting for digest windows to close"""
+        while await self.dispatch_batch(window=0) >= self.batch_size:
+            pass
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                dispatched = await self.dispatch_batch()
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+                dispatched = 0
+
+            # A full batch suggests a backlog, so poll again straight away
+            if dispatched < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def dispatch_batch(self, window: float | None = None) -> int:
+        """Claim and deliver one batch, returning the number of messages claimed"""
+        async with self.database.get_session() as session:
+            repository = OutboxRepository(session)
+            claimed = await repository.claim(
+                self.batch_size,
+                self.lease_seconds,
+                self.max_attempts,
+                window_seconds=self.digest_window if window is None else window,
+                max_pending=self.digest_max_pending,
+            )
+            if not claimed:
+                return 0
+
+            groups: dict[tuple[str | None, str], list[OutboxMessage]] = {}
+            for message, email in claimed:
+                groups.setdefault((email, message.topic), []).append(message)
+
+            # No connection is held while the transport is busy, the claim
+            # has already committed
+            results = await asyncio.gather(
+                *(
+                    self._deliver(email, topic, messages)
+                    for (email, topic), messages in groups.items()
+                ),
+                return_exceptions=True,
+            )
+
+            sent = []
+            for ((_, topic), messages), result in zip(groups.items(), results):
+                ids = [message.id for message in messages]
+                if not isinstance(result, Exception):
+                    sent.extend(ids)
+                    outbox_deliveries.inc(len(ids), topic=topic, result="sent")
+                    continue
+
+                outbox_deliveries.inc(len(ids), topic=topic, result="failed")
+                attempts = max(message.attempts for message in messages)
+                if attempts >= self.max_attempts:
+                    logger.error(
+                        "Giving up on outbox messages %s after %s attempts: %r",
+                        ids,
+                        attempts,
+                        result,
+                    )
+                else:
+                    logger.warning(
+                        "Outbox messages %s failed, retrying: %r", ids, result
+                    )
+                await repository.reschedule(ids, self._backoff(attempts), repr(result))
+
+            await repository.mark_sent(sent)
+
+        return len(claimed)
+
+    def _backoff(self, attempts: int) -> float:
+        # Full jitter keeps retries from a shared outage from arriving together
+        delay = min(self.backoff_base**attempts, self.backoff_max)
+        return random.uniform(delay / 2, delay)
+
+    async def _deliver(
+        self, email: str | None, topic: str, messages: list[OutboxMessage]
+    ) -> None:
+        if email is None:
+            # The recipient was deleted since the messages were written
+            logger.info("Dropping %s outbox messages without recipient", len(messages))
+            return
+
+        handler = self._handlers.get(topic)
+        if handler is None:
+            raise ValueError(f"No handler for outbox topic {topic!r}")
+
+        notification_digest_size.observe(len(messages), topic=topic)
+        await handler(email, messages)
+
+    async def _send_status_changes(
+        self, email: str, messages: list[OutboxMessage]
+    ) -> None:
+        # Messages arrive in write order, so the last one per task is its
+        # current status
+        changes = {
+            message.payload["task_id"]: StatusEnum[message.payload["status"]]
+            for message in messages
+        }
+
+        if len(changes) == 1:
+            [(task_id, status)] = changes.items()
+            await self.email_service.send_email(
+                recipient=email, task_id=task_id, status=status
+            )
+        else:
+            await self.email_service.send_digest(
+                recipient=email, changes=list(changes.items())
+            )
+
+
+outbox_dispatcher = OutboxDispatcher(
+    database=database,
+    email_service=EmailService(),
+    batch_size=config.OUTBOX_BATCH_SIZE,
+    poll_interval=config.OUTBOX_POLL_INTERVAL,
+    lease_seconds=config.OUTBOX_LEASE_SECONDS,
+    max_attempts=config.OUTBOX_MAX_ATTEMPTS,
+    backoff_base=config.OUTBOX_BACKOFF_BASE,
+    backoff_max=config.OUTBOX_BACKOFF_MAX,
+    digest_window=config.NOTIFICATION_DIGEST_WINDOW,
+    digest_max_pending=config.NOTIFICATION_DIGEST_MAX_PENDING,
+    drain_timeout=config.OUTBOX_DRAIN_TIMEOUT,
+)
@@ -0,0 +1,159 @@
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.metrics import registry
+from app.settings.config import get_config
+
+config = get_config()
+
+logger = logging.getLogger(__name__)
+
+store_errors_total = registry.counter(
+    "rate_limit_store_errors_total",
+    "Rate limit checks let through because the shared store was unreachable",
+)
+
+
+class BaseRateLimitStore(ABC):
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket at `key`, returning 0 or the seconds until one is available
+
+        The bucket holds up to `burst` tokens and refills at `rate` tokens
+        per second. A bucket that was never used starts full.
+        """
+        ...
+
+
+class MemoryRateLimitStore(BaseRateLimitStore):
+    """Per-process buckets, the least recently used are forgotten beyond `max_keys`
+
+    A forgotten bucket comes back full, which is how it would be after
+    having been idle anyway.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated_at) * rate)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return wait
+
+
+# Refills and takes in one atomic step on the server's clock, so every
+# process sharing a bucket agrees on it. Buckets expire once they would be
+# full again. The wait is returned as a string, Lua numbers are truncated to
+# integers in replies.
+TAKE_TOKEN = """
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitStore(BaseRateLimitStore):
+    """Buckets shared by every process on a Redis-compatible server with Lua scripting"""
+
+    def __init__(self, client: Redis):
+        # Runs by hash, loading the script first on a server that lacks it
+        self._take = client.register_script(TAKE_TOKEN)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        return float(await self._take(keys=[key], args=[rate, burst]))
+
+
+class TokenBucketLimiter:
+    """Allows `burst` requests at once per key, then `rate` per second
+
+    Checks fail open: while the store is unreachable every request is let
+    through, since refusing all of them would be worse than not limiting.
+    """
+
+    def __init__(self, store: BaseRateLimitStore, name: str, rate: float, burst: int):
+        self.store = store
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+
+    async def check(self, key: str) -> int:
+        """Take a token for `key`, returning 0 or the whole seconds to wait for one"""
+        try:
+            wait = await self.store.take(
+                f"rate_limit:{self.name}:{key}", self.rate, self.burst
+            )
+        except RedisError:
+            store_errors_total.inc()
+            logger.warning("Rate limit store unavailable", exc_info=True)
+            return 0
+
+        return math.ceil(wait)
+
+
+def _rate_limit_store() -> BaseRateLimitStore | None:
+    if config.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitStore(
+            Redis.from_url(config.REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+        )
+    if config.RATE_LIMIT_BACKEND == "memory":
+        return MemoryRateLimitStore(max_keys=config.RATE_LIMIT_MAX_KEYS)
+
+    return None
+
+
+rate_limit_store = _rate_limit_store()
+
+user_rate_limiter = (
+    TokenBucketLimiter(
+        rate_limit_store,
+        "user",
+        rate=config.RATE_LIMIT_USER_RATE,
+        burst=config.RATE_LIMIT_USER_BURST,
+    )
+    if rate_limit_store
+    else None
+)
+auth_rate_limiter = (
+    TokenBucketLimiter(
+        rate_limit_store,
+        "auth_ip",
+        rate=config.RATE_LIMIT_AUTH_IP_RATE,
+        burst=config.RATE_LIMIT_AUTH_IP_BURST,
+    )
+    if rate_limit_store
+    else None
+)
@@ -1,15 +1,32 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Sequence
 
 from fastapi import Depends
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.common.enums import PriorityEnum, StatusEnum
-from app.db.main import get_db
+from app.db.common.enums import PriorityEnum, StatusEnum, TaskRoleEnum
+from app.db.main import database, get_db, get_read_db
 from app.db.models.task import Task
+from app.db.unit_of_work import UnitOfWork
+from app.repositories.outbox import OutboxRepository
 from app.repositories.task import TaskRepository
+from app.repositories.task_archive import TaskArchiveRepository
+from app.repositories.task_counter import TaskCounterRepository
 from app.repositories.user import UserRepository
-from app.services.email import EmailService
-from app.services.exceptions.task import TaskNotFoundException
+from app.services.exceptions.task import (
+    TaskNotFoundException,
+    TaskVersionConflictException,
+)
+from app.services.exceptions.user import UserNotFoundError
+from app.services.outbox import TASK_STATUS_CHANGED
+from app.services.pagination import (
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
+from app.services.task_cache import CachedTask, task_cache
 
 
 class BaseTaskService(ABC):
@@ -25,11 +42,49 @@ class BaseTaskService(ABC):
         ...
 
     @abstractmethod
-    async def get_task_by_id(self, task_id: int) -> Task:
+    async def create_tasks(
+        self, responsible_person_id: int, tasks: list[dict]
+    ) -> list[Task]:
         ...
 
     @abstractmethod
-    async def update_task(self, task_id: int, **kwargs) -> Task:
+    async def import_tasks(
+        self, responsible_person_id: int, batches: AsyncIterator[Sequence[tuple]]
+    ) -> tuple[int, list[int]]:
+        ...
+
+    @abstractmethod
+    async def get_task_by_id(self, task_id: int) -> CachedTask:
+        ...
+
+    @abstractmethod
+    async def get_task_version(self, task_id: int) -> int:
+        ...
+
+    @abstractmethod
+    async def get_task_stats(self, user_id: int) -> dict[TaskRoleEnum, list[dict]]:
+        ...
+
+    @abstractmethod
+    async def list_tasks(
+        self, limit: int, cursor: str | None = None, **filters
+    ) -> tuple[list[Task], str | None]:
+        ...
+
+    @abstractmethod
+    async def search_tasks(
+        self, query: str, limit: int, cursor: str | None = None
+    ) -> tuple[list[tuple[Task, float]], str | None]:
+        ...
+
+    @abstractmethod
+    async def update_task(
+        self, task_id: int, expected_version: int | None = None, **kwargs
+    ) -> Task:
+        ...
+
+    @abstractmethod
+    async def update_tasks(self, updates: list[dict]) -> tuple[list[Task], list[int]]:
         ...
 
     @abstractmethod
@@ -37,7 +92,23 @@ class BaseTaskService(ABC):
         ...
 
     @abstractmethod
-    async def assign_task(self, task_id: int, user_id: int) -> Task:
+    async def purge_tasks(self, batch_size: int, **filters) -> int:
+        ...
+
+    @abstractmethod
+    async def assign_task(self, task_id: int, user_id: int) -> CachedTask:
+        ...
+
+    @abstractmethod
+    async def assign_users(
+        self, task_ids: list[int], user_ids: list[int]
+    ) -> tuple[dict[int, list[int]], list[int], list[int]]:
+        ...
+
+    @abstractmethod
+    async def unassign_users(
+        self, task_ids: list[int], user_ids: list[int]
+    ) -> tuple[dict[int, list[int]], list[int], list[int]]:
         ...
 
     @abstractmethod
@@ -48,8 +119,12 @@ class BaseTaskService(ABC):
 class TaskService(BaseTaskService):
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.uow = UnitOfWork(db)
         self.task_repository = TaskRepository(db)
-        self.email_service = EmailService()
+        self.task_counter_repository = TaskCounterRepository(db)
+        self.task_archive_repository = TaskArchiveRepository(db)
+        self.outbox_repository = OutboxRepository(db)
+        self.task_cache = task_cache
         self.user_repository = UserRepository(db)
 
     async def create_task(
@@ -60,53 +135,243 @@ class TaskService(BaseTaskService):
         status: StatusEnum,
         priority: PriorityEnum,
     ) -> Task:
-        new_task = await self.task_repository.create(
-            title, description, responsible_person_id, status, priority
-        )
+        async with self.uow:
+            new_task = await self.task_repository.create(
+                title, description, responsible_person_id, status, priority
+            )
         return new_task
 
-    async def get_task_by_id(self, task_id: int) -> Task:
-        task = await self.task_repository.get_by_id(task_id=task_id)
+    async def create_tasks(
+        self, responsible_person_id: int, tasks: list[dict]
+    ) -> list[Task]:
+        async with self.uow:
+            created = await self.task_repository.create_many(
+                [
+                    {**task, "responsible_person_id": responsible_person_id}
+                    for task in tasks
+                ]
+            )
+        return list(created)
+
+    async def import_tasks(
+        self, responsible_person_id: int, batches: AsyncIterator[Sequence[tuple]]
+    ) -> tuple[int, list[int]]:
+        # The upload can fail halfway, which rolls back whatever was already copied
+        async with self.uow:
+            return await self.task_repository.import_many(
+                responsible_person_id, batches
+            )
+
+    async def get_task_by_id(self, task_id: int) -> CachedTask:
+        async def load() -> CachedTask | None:
+            if self.task_cache.enabled and self.db.info.get("replica"):
+                # A lagging replica could put back a task that was just
+                # invalidated, to be served for the whole TTL
+                async with database.get_session() as session:
+                    task = await TaskRepository(session).get_by_id(task_id=task_id)
+                    return CachedTask.from_task(task) if task else None
+
+            task = await self.task_repository.get_by_id(task_id=task_id)
+            return CachedTask.from_task(task) if task else None
+
+        task = await self.task_cache.get_or_load(task_id, load)
 
         if not task:
             raise TaskNotFoundException(f"Task with id {task_id} not found")
 
         return task
 
-    async def update_task(self, task_id: int, **kwargs) -> Task:
-        task = await self.task_repository.update(task_id, **kwargs)
+    async def get_task_version(self, task_id: int) -> int:
+        version = await self.task_repository.get_version(task_id=task_id)
 
-        if not task:
+        if version is None:
             raise TaskNotFoundException(f"Task with id {task_id} not found")
 
+        return version
+
+    async def get_task_stats(self, user_id: int) -> dict[TaskRoleEnum, list[dict]]:
+        counters = await self.task_counter_repository.get_for_user(user_id)
+
+        # No counters is either a user without tasks or no user at all
+        if not counters and not await self.user_repository.get_by_id(user_id):
+            raise UserNotFoundError(f"User with id {user_id} not found")
+
+        stats = {role: [] for role in TaskRoleEnum}
+        for counter in counters:
+            stats[counter.role].append(
+                {
+                    "status": counter.status,
+                    "priority": counter.priority,
+                    "count": counter.count,
+                }
+            )
+
+        return stats
+
+    async def list_tasks(
+        self, limit: int, cursor: str | None = None, **filters
+    ) -> tuple[list[Task], str | None]:
+        after = decode_cursor(cursor) if cursor else None
+        # Fetch one extra row to learn whether another page exists
+        tasks = await self.task_repository.list(limit + 1, after=after, **filters)
+
+        if len(tasks) <= limit:
+            return tasks, None
+
+        tasks = tasks[:limit]
+        last = tasks[-1]
+        return tasks, encode_cursor(last.created_at, last.id)
+
+    async def search_tasks(
+        self, query: str, limit: int, cursor: str | None = None
+    ) -> tuple[list[tuple[Task, float]], str | None]:
+        after = decode_rank_cursor(cursor) if cursor else None
+        hits = await self.task_repository.search(query, limit + 1, after=after)
+
+        if len(hits) <= limit:
+            return hits, None
+
+        hits = hits[:limit]
+        last_task, last_rank = hits[-1]
+        return hits, encode_rank_cursor(last_rank, last_task.id)
+
+    async def update_task(
+        self, task_id: int, expected_version: int | None = None, **kwargs
+    ) -> Task:
+        async with self.uow:
+            task = await self._update_task(task_id, expected_version, **kwargs)
+
+        await self.task_cache.invalidate(task_id)
+        return task
+
+    async def _update_task(
+        self, task_id: int, expected_version: int | None = None, **kwargs
+    ) -> Task:
+        task, version = await self.task_repository.update(
+            task_id, expected_version=expected_version, **kwargs
+        )
+
+        if version is None:
+            raise TaskNotFoundException(f"Task with id {task_id} not found")
+        if task is None:
+            raise TaskVersionConflictException(
+                f"Task with id {task_id} is at version {version}, "
+                f"not {expected_version}",
+                current_version=version,
+            )
+
         return task
 
+    async def update_tasks(self, updates: list[dict]) -> tuple[list[Task], list[int]]:
+        """Apply a batch of partial updates, returning the updated tasks and the ids that were not found"""
+        async with self.uow:
+            updated = list(await self.task_repository.update_many(updates))
+        found_ids = {task.id for task in updated}
+        await self.task_cache.invalidate(*found_ids)
+        missing_ids = [item["id"] for item in updates if item["id"] not in found_ids]
+
+        return updated, missing_ids
+
     async def delete_task(self, task_id: int) -> bool:
-        deleted = await self.task_repository.delete(task_id)
+        async with self.uow:
+            deleted = await self.task_repository.delete(task_id)
 
         if not deleted:
             raise TaskNotFoundException(f"Task with id {task_id} not found")
 
+        await self.task_cache.invalidate(task_id)
         return True
 
-    async def assign_task(self, task_id: int, user_id: int) -> Task:
-        task = await self.task_repository.get_by_id(task_id=task_id)
+    async def purge_tasks(self, batch_size: int, **filters) -> int:
+        """Delete every task matching the filters, returning how many were
+
+        Archived tasks are only ever done, so they are purged unless the
+        filters ask for another status. Each batch commits on its own, so locks are held for one batch at a
+        time. Tasks skipped because they were locked are left for a later run.
+        """
+        repositories = [self.task_repository]
+        if filters.get("status", StatusEnum.DONE) is StatusEnum.DONE:
+            repositories.append(self.task_archive_repository)
 
-        await self.db.refresh(task, ["assignees"])
+        purged = 0
+        for repository in repositories:
+            while True:
+                async with self.uow:
+                    task_ids = await repository.delete_many(batch_size, **filters)
+                await self.task_cache.invalidate(*task_ids)
+                purged += len(task_ids)
 
-        user = await self.user_repository.get_by_id(id=user_id)
-        task.assignees.append(user)
+                if len(task_ids) < batch_size:
+                    break
 
-        return await self.task_repository.update(
-            task_id=task_id, assignees=task.assignees
+        return purged
+
+    async def assign_task(self, task_id: int, user_id: int) -> CachedTask:
+        _, missing_task_ids, missing_user_ids = await self.assign_users(
+            [task_id], [user_id]
         )
 
+        if missing_task_ids:
+            raise TaskNotFoundException(f"Task with id {task_id} not found")
+        if missing_user_ids:
+            raise UserNotFoundError(f"User with id {user_id} not found")
+
+        return await self.get_task_by_id(task_id=task_id)
+
+    async def assign_users(
+        self, task_ids: list[int], user_ids: list[int]
+    ) -> tuple[dict[int, list[int]], list[int], list[int]]:
+        """Assign every user to every task, returning the assignees and the task and user ids that were skipped"""
+        async with self.uow:
+            await self.task_repository.add_assignees(task_ids, user_ids)
+        await self.task_cache.invalidate(*task_ids)
+
+        return await self._assignment_result(task_ids, user_ids)
+
+    async def unassign_users(
+        self, task_ids: list[int], user_ids: list[int]
+    ) -> tuple[dict[int, list[int]], list[int], list[int]]:
+        """Unassign every user from every task, returning the assignees and the task and user ids that were skipped"""
+        async with self.uow:
+            await self.task_repository.remove_assignees(task_ids, user_ids)
+        await self.task_cache.invalidate(*task_ids)
+
+        return await self._assignment_result(task_ids, user_ids)
+
+    async def _assignment_result(
+        self, task_ids: list[int], user_ids: list[int]
+    ) -> tuple[dict[int, list[int]], list[int], list[int]]:
+        # The statements skip users that do not exist, and tasks that do not
+        # exist or were archived
+        assignees = await self.task_repository.get_assignee_ids(task_ids)
+        user_ids_found = await self.user_repository.get_existing_ids(user_ids)
+        missing_task_ids = [id for id in dict.fromkeys(task_ids) if id not in assignees]
+        missing_user_ids = [
+            id for id in dict.fromkeys(user_ids) if id not in user_ids_found
+        ]
+
+        return assignees, missing_task_ids, missing_user_ids
+
     async def change_task_status(self, task_id: int, new_status: StatusEnum) -> Task:
-        task = await self.update_task(task_id=task_id, status=new_status)
-        await self.email_service.send_email(task_id=task.id, status=task.status)
+        async with self.uow:
+            # Staged before the update so it commits with it, the dispatcher
+            # delivers it once the transaction is visible
+            self.outbox_repository.add(
+                topic=TASK_STATUS_CHANGED,
+                payload={"task_id": task_id, "status": new_status.name},
+                recipient_id=select(Task.responsible_person_id)
+                .where(Task.id == task_id)
+                .scalar_subquery(),
+            )
+            task = await self._update_task(task_id=task_id, status=new_status)
 
+        await self.task_cache.invalidate(task_id)
         return task
 
 
 def get_task_service(db: AsyncSession = Depends(get_db)):
     return TaskService(db)
+
+
+def get_read_task_service(db: AsyncSession = Depends(get_read_db)):
+    return TaskService(db)
@@ -0,0 +1,277 @@
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.db.common.enums import PriorityEnum, StatusEnum
+from app.db.models.task import Task
+from app.metrics import registry
+from app.settings.config import get_config
+
+config = get_config()
+
+logger = logging.getLogger(__name__)
+
+lookups_total = registry.counter(
+    "task_cache_lookups_total",
+    "Task cache lookups by result",
+    labelnames=("result",),
+)
+
+
+def _hit_ratio() -> dict[tuple, float]:
+    hits, misses = lookups_total.get(result="hit"), lookups_total.get(result="miss")
+    return {(): hits / (hits + misses) if hits + misses else 0.0}
+
+
+registry.gauge(
+    "task_cache_hit_ratio",
+    "Share of task cache lookups served from the cache",
+    callback=_hit_ratio,
+)
+
+
+@dataclass(frozen=True)
+class CachedTask:
+    """A read-only snapshot of a task and its assignee ids"""
+
+    id: int
+    title: str
+    description: str | None
+    status: StatusEnum
+    priority: PriorityEnum
+    responsible_person_id: int
+    assignee_ids: tuple[int, ...]
+    version: int
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_task(cls, task: Task) -> "CachedTask":
+        return cls(
+            id=task.id,
+            title=task.title,
+            description=task.description,
+            status=task.status,
+            priority=task.priority,
+            responsible_person_id=task.responsible_person_id,
+            assignee_ids=tuple(sorted(user.id for user in task.assignees)),
+            version=task.version,
+            created_at=task.created_at,
+            updated_at=task.updated_at,
+        )
+
+    def dumps(self) -> bytes:
+        data = asdict(self)
+        data.update(
+            status=self.status.name,
+            priority=self.priority.name,
+            created_at=self.created_at.isoformat(),
+            updated_at=self.updated_at.isoformat(),
+        )
+        return json.dumps(data).encode()
+
+    @classmethod
+    def loads(cls, value: bytes) -> "CachedTask":
+        data = json.loads(value)
+        data.update(
+            status=StatusEnum[data["status"]],
+            priority=PriorityEnum[data["priority"]],
+            assignee_ids=tuple(data["assignee_ids"]),
+            created_at=datetime.fromisoformat(data["created_at"]),
+            updated_at=datetime.fromisoformat(data["updated_at"]),
+        )
+        return cls(**data)
+
+
+class BaseCacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+
+class MemoryCacheBackend(BaseCacheBackend):
+    """In-process LRU with per-entry expiry"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+
+class RedisCacheBackend(BaseCacheBackend):
+    """Shared cache on a Redis-compatible server, eviction is left to its maxmemory policy"""
+
+    def __init__(self, client: Redis):
+        self.client = client
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*keys)
+
+
+class TaskCache:
+    """Read-through cache of tasks by id
+
+    Concurrent misses for the same task share one load. A task invalidated
+    while it is being loaded is not stored, so the load cannot put back the
+    state it raced with. Other processes can still race this way, which the
+    TTL bounds.
+    """
+
+    def __init__(self, backend: BaseCacheBackend | None, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        # key -> (shared load, whether it was invalidated since it started)
+        self._loads: dict[str, tuple[asyncio.Future, list[bool]]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def _key(task_id: int) -> str:
+        return f"task:{task_id}"
+
+    async def get_or_load(
+        self, task_id: int, load: Callable[[], Awaitable[CachedTask | None]]
+    ) -> CachedTask | None:
+        if self.backend is None:
+            return await load()
+
+        key = self._key(task_id)
+        try:
+            value = await self.backend.get(key)
+        except RedisError:
+            logger.warning("Task cache unavailable, reading through", exc_info=True)
+            return await load()
+
+        try:
+            cached = CachedTask.loads(value) if value is not None else None
+        except (KeyError, TypeError):
+            # Written by a release that stored different fields
+            cached = None
+        if cached is not None:
+            lookups_total.inc(result="hit")
+            return cached
+
+        lookups_total.inc(result="miss")
+        if key in self._loads:
+            future = self._loads[key][0]
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The request that started the load went away, not this one
+                if not future.cancelled():
+                    raise
+                return await load()
+
+        future = asyncio.get_running_loop().create_future()
+        invalidated = [False]
+        self._loads[key] = (future, invalidated)
+        try:
+            task = await load()
+            if task is not None and not invalidated[0]:
+                await self._store(key, task)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the error retrieved, there may be no one waiting for it
+            future.exception()
+            raise
+        else:
+            future.set_result(task)
+            return task
+        finally:
+            del self._loads[key]
+
+    async def _store(self, key: str, task: CachedTask) -> None:
+        try:
+            await self.backend.set(key, task.dumps(), self.ttl)
+        except RedisError:
+            logger.warning("Could not store task in cache", exc_info=True)
+
+    async def invalidate(self, *task_ids: int) -> None:
+        if self.backend is None or not task_ids:
+            return
+
+        keys = [self._key(task_id) for task_id in task_ids]
+        for key in keys:
+            if key in self._loads:
+                self._loads[key][1][0] = True
+
+        try:
+            await self.backend.delete(*keys)
+        except RedisError:
+            logger.warning(
+                "Could not invalidate tasks %s, they expire within %ss",
+                task_ids,
+                self.ttl,
+                exc_info=True,
+            )
+
+
+def _task_cache_backend() -> BaseCacheBackend | None:
+    if config.TASK_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(
+            Redis.from_url(config.REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+        )
+    if config.TASK_CACHE_BACKEND == "memory":
+        if config.WEB_CONCURRENCY > 1:
+            raise RuntimeError(
+                "TASK_CACHE_BACKEND=memory cannot invalidate tasks across "
+                f"{config.WEB_CONCURRENCY} workers, use redis or none"
+            )
+        return MemoryCacheBackend(max_size=config.TASK_CACHE_SIZE)
+
+    return None
+
+
+task_cache = TaskCache(_task_cache_backend(), ttl=config.TASK_CACHE_TTL_SECONDS)
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+import logging
+import zlib
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row
+
+from app.db.main import database
+from app.repositories.task import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "responsible_person_id",
+    "assignee_ids",
+    "created_at",
+    "updated_at",
+)
+
+
+def _record(row: Row) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "status": row.status.value,
+        "priority": row.priority.value,
+        "responsible_person_id": row.responsible_person_id,
+        "assignee_ids": sorted(row.assignee_ids or ()),
+        "created_at": row.created_at.isoformat(),
+        "updated_at": row.updated_at.isoformat(),
+    }
+
+
+def _ndjson(rows: Sequence[Row]) -> str:
+    return "".join(json.dumps(_record(row)) + "\n" for row in rows)
+
+
+def _csv(rows: Sequence[Row]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    for row in rows:
+        record = _record(row)
+        record["assignee_ids"] = " ".join(map(str, record["assignee_ids"]))
+        writer.writerow(record)
+
+    return buffer.getvalue()
+
+
+ENCODERS = {"ndjson": _ndjson, "csv": _csv}
+
+
+async def stream_task_export(
+    format: str, gzip: bool, fetch_size: int, **filters
+) -> AsyncIterator[bytes]:
+    """Yield the encoded export chunk by chunk, one chunk per fetched batch
+
+    The export opens its own session because it is consumed by the response
+    after request dependencies have already been closed. It reads from a
+    single REPEATABLE READ snapshot, so every row is exported as it was when
+    the export started, however long the download takes.
+    """
+    encode = ENCODERS[format]
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+
+    def emit(text: str) -> bytes:
+        data = text.encode()
+        return compressor.compress(data) if compressor else data
+
+    if format == "csv":
+        yield emit(",".join(EXPORT_FIELDS) + "\r\n")
+
+    async with database.get_read_only_session() as session:
+        await session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+        repository = TaskRepository(session)
+        try:
+            async for rows in repository.export(fetch_size, **filters):
+                chunk = emit(encode(rows))
+                if chunk:
+                    yield chunk
+        except Exception:
+            # Headers are already sent, all that is left is to cut the body short
+            logger.exception("Task export failed")
+            raise
+
+    if compressor:
+        yield compressor.flush()
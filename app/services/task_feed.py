@@ -0,0 +1,223 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import asyncpg
+
+from app.db.common.enums import PriorityEnum, StatusEnum
+from app.db.main import db_config
+from app.metrics import registry
+from app.repositories.task import TASK_CHANGES_CHANNEL
+from app.settings.config import get_config
+
+config = get_config()
+
+logger = logging.getLogger(__name__)
+
+feed_events_total = registry.counter(
+    "task_feed_events_total", "Task change events received from Postgres"
+)
+feed_dropped_total = registry.counter(
+    "task_feed_dropped_subscribers_total",
+    "Subscribers disconnected for falling behind the task feed",
+)
+
+# Sent instead of a task event after the listener reconnects, events may
+# have been missed in between
+RESYNC_EVENT = {"op": "resync"}
+
+
+@dataclass(frozen=True)
+class TaskFeedFilter:
+    """Which events a subscriber wants, every filter given has to match"""
+
+    task_ids: frozenset[int] = frozenset()
+    responsible_person_id: int | None = None
+    assignee_id: int | None = None
+
+    def matches(self, event: dict) -> bool:
+        if "task_id" not in event:
+            return True
+        if self.task_ids and event["task_id"] not in self.task_ids:
+            return False
+        if (
+            self.responsible_person_id is not None
+            and event["responsible_person_id"] != self.responsible_person_id
+        ):
+            return False
+        if self.assignee_id is not None:
+            # An unassigned user still hears about it through user_ids
+            users = (event["assignee_ids"] or []) + (event["user_ids"] or [])
+            if self.assignee_id not in users:
+                return False
+
+        return True
+
+
+@dataclass(eq=False)
+class Subscription:
+    filter: TaskFeedFilter
+    queue: asyncio.Queue
+
+    async def get(self) -> str | None:
+        """The next encoded event, or None once the subscriber has been dropped"""
+        return await self.queue.get()
+
+
+class TaskFeed:
+    """Fans task change notifications out to subscribers in this process
+
+    Each process holds a single LISTEN connection outside the pool, which is
+    reopened with a `resync` event for everyone if it is lost. Events are
+    decoded and encoded once and put on every matching subscriber's queue
+    without waiting. A subscriber whose queue is full is dropped rather than
+    slowing down the others.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        queue_size: int = 100,
+        reconnect_interval: float = 5,
+        health_check_interval: float = 30,
+    ):
+        self.dsn = dsn
+        self.queue_size = queue_size
+        self.reconnect_interval = reconnect_interval
+        self.health_check_interval = health_check_interval
+        self.subscriptions: set[Subscription] = set()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        for subscription in list(self.subscriptions):
+            self._drop(subscription)
+
+    def subscribe(self, filter: TaskFeedFilter) -> Subscription:
+        subscription = Subscription(filter, asyncio.Queue(self.queue_size))
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def publish(self, event: dict) -> None:
+        data = json.dumps(event)
+        for subscription in list(self.subscriptions):
+            if not subscription.filter.matches(event):
+                continue
+            try:
+                subscription.queue.put_nowait(data)
+            except asyncio.QueueFull:
+                feed_dropped_total.inc()
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+        # Skip whatever it has not read yet, it has to resync anyway
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str):
+        feed_events_total.inc()
+        try:
+            event = json.loads(payload)
+            # Same representation as the REST API
+            event["status"] = StatusEnum[event["status"]].value
+            event["priority"] = PriorityEnum[event["priority"]].value
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed task change %r", payload)
+            return
+
+        self.publish(event)
+
+    async def _run(self) -> None:
+        connected_before = False
+
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError):
+                logger.warning(
+                    "Task feed could not connect, retrying in %ss",
+                    self.reconnect_interval,
+                    exc_info=True,
+                )
+                await asyncio.sleep(self.reconnect_interval)
+                continue
+
+            try:
+                await connection.add_listener(
+                    TASK_CHANGES_CHANNEL, self._on_notification
+                )
+                if connected_before:
+                    self.publish(RESYNC_EVENT)
+                connected_before = True
+                await self._watch(connection)
+            except (OSError, asyncpg.PostgresError, asyncio.TimeoutError):
+                logger.warning("Task feed connection lost, reconnecting", exc_info=True)
+            finally:
+                connection.terminate()
+
+    async def _watch(self, connection: asyncpg.Connection) -> None:
+        """Return once the connection is gone, checking on it now and then"""
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+
+        while not lost.is_set():
+            try:
+                await asyncio.wait_for(lost.wait(), self.health_check_interval)
+            except asyncio.TimeoutError:
+                # A dead peer can go unnoticed on an idle connection
+                await connection.execute("SELECT 1", timeout=self.reconnect_interval)
+
+
+async def stream_task_events(
+    feed: TaskFeed, filter: TaskFeedFilter, heartbeat: float
+) -> AsyncIterator[str]:
+    """Server-sent events for one subscriber, until it disconnects or is dropped
+
+    A comment is sent whenever nothing else was for `heartbeat` seconds, so
+    proxies keep the connection open and a gone client is noticed.
+    """
+    subscription = feed.subscribe(filter)
+    try:
+        while True:
+            try:
+                data = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if data is None:
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            yield f"event: task\ndata: {data}\n\n"
+    finally:
+        feed.unsubscribe(subscription)
+
+
+task_feed = TaskFeed(
+    dsn=db_config.full_database_url.replace("+asyncpg", "", 1),
+    queue_size=config.TASK_FEED_QUEUE_SIZE,
+)
@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+from typing import BinaryIO
+
+
+class TaskImportReader:
+    """Reads an uploaded CSV or NDJSON file a batch of records at a time
+
+    Only the current batch is held in memory. Records are numbered from 1
+    in file order, not counting the CSV header, so that rejected ones can be
+    reported back by position. Blocking, meant to run in a worker thread.
+    """
+
+    def __init__(self, file: BinaryIO, format: str):
+        self.format = format
+        self._text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        self._rows = csv.DictReader(self._text) if format == "csv" else self._text
+        self.row_number = 0
+
+    def read_batch(self, size: int) -> tuple[list[tuple[int, dict]], list[dict]]:
+        """Return up to `size` parsed records and the records that could not be parsed"""
+        records, errors = [], []
+
+        while len(records) + len(errors) < size:
+            try:
+                row = next(self._rows)
+            except StopIteration:
+                break
+            except csv.Error as e:
+                self.row_number += 1
+                errors.append({"row": self.row_number, "detail": str(e)})
+                continue
+
+            if self.format == "csv":
+                # Columns beyond the header end up under None, and CSV has no
+                # null, so empty cells count as not given
+                row = {
+                    key: value
+                    for key, value in row.items()
+                    if key is not None and value != ""
+                }
+            else:
+                if not row.strip():
+                    continue
+                try:
+                    row = json.loads(row)
+                except ValueError as e:
+                    self.row_number += 1
+                    errors.append(
+                        {"row": self.row_number, "detail": f"Invalid JSON: {e}"}
+                    )
+                    continue
+
+            self.row_number += 1
+            if not isinstance(row, dict):
+                errors.append({"row": self.row_number, "detail": "Expected an object"})
+                continue
+            records.append((self.row_number, row))
+
+        return records, errors
@@ -0,0 +1,68 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from app.metrics import registry
+
+lookups_total = registry.counter(
+    "token_cache_lookups_total",
+    "Verified token cache lookups by result",
+    labelnames=("result",),
+)
+
+
+class TokenCache:
+    """Bounded LRU of verified JWT payloads keyed by the token's SHA-256 digest
+
+    An entry never outlives the `exp` claim of its token, so a cache hit is
+    exactly as valid as re-verifying the signature would be.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+
+    @property
+    def hits(self) -> int:
+        return int(lookups_total.get(result="hit"))
+
+    @property
+    def misses(self) -> int:
+        return int(lookups_total.get(result="miss"))
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            lookups_total.inc(result="miss")
+            return None
+
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            lookups_total.inc(result="miss")
+            return None
+
+        self._entries.move_to_end(key)
+        lookups_total.inc(result="hit")
+        return dict(payload)
+
+    def put(self, token: str, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)) or expires_at <= time.time():
+            return
+
+        key = self._key(token)
+        self._entries[key] = (dict(payload), expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
@@ -6,13 +6,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.main import get_db
 from app.db.models.user import User
+from app.db.unit_of_work import UnitOfWork
 from app.repositories.user import UserRepository
-from app.services.auth import get_hashed_password, verify_password
 from app.services.exceptions.user import (
     InvalidCredentialsError,
     UserAlreadyExistsError,
     UserNotFoundError,
 )
+from app.services.hashing import password_hasher
 
 
 class BaseUserService(ABC):
@@ -31,17 +32,19 @@ class BaseUserService(ABC):
 
 class UserService(BaseUserService):
     def __init__(self, db: AsyncSession):
+        self.uow = UnitOfWork(db)
         self.user_repository = UserRepository(db)
 
     async def register_user(self, username: str, email: str, password: str) -> User:
         if not username or not email or not password:
             raise ValueError("Username, email, and password are required")
 
-        hashed_password = get_hashed_password(password)
+        hashed_password = await password_hasher.hash(password)
         try:
-            new_user = await self.user_repository.create(
-                username=username, email=email, hashed_password=hashed_password
-            )
+            async with self.uow:
+                new_user = await self.user_repository.create(
+                    username=username, email=email, hashed_password=hashed_password
+                )
             return new_user
         except IntegrityError:
             raise UserAlreadyExistsError(
@@ -57,7 +60,7 @@ class UserService(BaseUserService):
         if not user:
             raise UserNotFoundError("User not found")
 
-        if not verify_password(password, user.password):
+        if not await password_hasher.verify(password, user.password):
             raise InvalidCredentialsError("Invalid password")
 
         return user
@@ -7,6 +7,104 @@ class Config(BaseSettings):
     SECRET_KEY: str = Field(None, env="SECRET_KEY")
     ALGORITHM: str = Field(None, env="ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(None, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    TOKEN_CACHE_SIZE: int = Field(10000, env="TOKEN_CACHE_SIZE")
+
+    # Users
+    USER_CACHE_TTL_SECONDS: float = Field(60, env="USER_CACHE_TTL_SECONDS")
+    USER_CACHE_SIZE: int = Field(10000, env="USER_CACHE_SIZE")
+
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int | None = Field(None, env="PASSWORD_HASH_WORKERS")
+    PASSWORD_HASH_MAX_PENDING: int = Field(64, env="PASSWORD_HASH_MAX_PENDING")
+    PASSWORD_HASH_ACQUIRE_TIMEOUT: float = Field(
+        0.05, env="PASSWORD_HASH_ACQUIRE_TIMEOUT"
+    )
+
+    # Observability
+    # Warn when one request runs the same statement shape more than this
+    # many times, 0 disables the check
+    SQL_N_PLUS_ONE_THRESHOLD: int = Field(0, env="SQL_N_PLUS_ONE_THRESHOLD")
+
+    # Tasks
+    TASK_BULK_MAX_SIZE: int = Field(500, env="TASK_BULK_MAX_SIZE")
+    # "redis" to share it through REDIS_URL, "memory" for a per-process LRU,
+    # anything else disables the cache. Writes only invalidate the cache of
+    # the process that made them, so "memory" is refused with more than one
+    # worker (WEB_CONCURRENCY, which uvicorn and gunicorn read too).
+    TASK_CACHE_BACKEND: str = Field("none", env="TASK_CACHE_BACKEND")
+    TASK_CACHE_TTL_SECONDS: float = Field(30, env="TASK_CACHE_TTL_SECONDS")
+    TASK_CACHE_SIZE: int = Field(10000, env="TASK_CACHE_SIZE")
+    WEB_CONCURRENCY: int = Field(1, env="WEB_CONCURRENCY")
+    # Rows fetched per round trip by the export cursor
+    TASK_EXPORT_FETCH_SIZE: int = Field(1000, env="TASK_EXPORT_FETCH_SIZE")
+    # Rows validated and copied at a time by the import, and how many rejected
+    # rows the import report lists before it only counts them
+    TASK_IMPORT_BATCH_SIZE: int = Field(5000, env="TASK_IMPORT_BATCH_SIZE")
+    TASK_IMPORT_MAX_REJECTED: int = Field(1000, env="TASK_IMPORT_MAX_REJECTED")
+    # Tasks deleted per statement by the bulk purge
+    TASK_PURGE_BATCH_SIZE: int = Field(1000, env="TASK_PURGE_BATCH_SIZE")
+    # Archive job: done tasks untouched for this many days are moved, this many
+    # per transaction, pausing in between to leave I/O for regular traffic
+    TASK_ARCHIVE_AFTER_DAYS: int = Field(90, env="TASK_ARCHIVE_AFTER_DAYS")
+    TASK_ARCHIVE_BATCH_SIZE: int = Field(1000, env="TASK_ARCHIVE_BATCH_SIZE")
+    TASK_ARCHIVE_PAUSE_SECONDS: float = Field(0.5, env="TASK_ARCHIVE_PAUSE_SECONDS")
+    # Change feed: events buffered per subscriber before it is dropped as too
+    # slow, and seconds between keepalives on an idle stream. Disabling it also
+    # stops task writes from publishing changes, so set it alike everywhere.
+    TASK_FEED_ENABLED: bool = Field(True, env="TASK_FEED_ENABLED")
+    TASK_FEED_QUEUE_SIZE: int = Field(100, env="TASK_FEED_QUEUE_SIZE")
+    TASK_FEED_HEARTBEAT_SECONDS: float = Field(15, env="TASK_FEED_HEARTBEAT_SECONDS")
+
+    # Rate limiting: "memory" keeps buckets per process, "redis" shares them
+    # through REDIS_URL, anything else disables it. Each client can send BURST
+    # requests at once, then RATE per second: authenticated users by their
+    # token's subject, and login and registration by client IP.
+    RATE_LIMIT_BACKEND: str = Field("memory", env="RATE_LIMIT_BACKEND")
+    RATE_LIMIT_MAX_KEYS: int = Field(100000, env="RATE_LIMIT_MAX_KEYS")
+    RATE_LIMIT_USER_RATE: float = Field(10, env="RATE_LIMIT_USER_RATE")
+    RATE_LIMIT_USER_BURST: int = Field(50, env="RATE_LIMIT_USER_BURST")
+    RATE_LIMIT_AUTH_IP_RATE: float = Field(0.2, env="RATE_LIMIT_AUTH_IP_RATE")
+    RATE_LIMIT_AUTH_IP_BURST: int = Field(10, env="RATE_LIMIT_AUTH_IP_BURST")
+
+    # Admission control: requests beyond MAX_IN_FLIGHT at once, or arriving
+    # while a database checkout has already waited MAX_POOL_WAIT, are turned
+    # away with a 503. 0 disables either check.
+    ADMISSION_MAX_IN_FLIGHT: int = Field(200, env="ADMISSION_MAX_IN_FLIGHT")
+    ADMISSION_MAX_POOL_WAIT_SECONDS: float = Field(
+        1, env="ADMISSION_MAX_POOL_WAIT_SECONDS"
+    )
+    ADMISSION_RETRY_AFTER_SECONDS: int = Field(1, env="ADMISSION_RETRY_AFTER_SECONDS")
+
+    # Redis
+    REDIS_URL: str = Field("redis://localhost:6379/0", env="REDIS_URL")
+
+    # Email
+    # "console" prints messages, "smtp" delivers them through SMTP_HOST
+    EMAIL_TRANSPORT: str = Field("console", env="EMAIL_TRANSPORT")
+    SMTP_HOST: str = Field("localhost", env="SMTP_HOST")
+    SMTP_PORT: int = Field(25, env="SMTP_PORT")
+    SMTP_SENDER: str = Field("noreply@localhost", env="SMTP_SENDER")
+    SMTP_USERNAME: str | None = Field(None, env="SMTP_USERNAME")
+    SMTP_PASSWORD: str | None = Field(None, env="SMTP_PASSWORD")
+    SMTP_USE_TLS: bool = Field(False, env="SMTP_USE_TLS")
+
+    # Outbox
+    OUTBOX_DISPATCHER_ENABLED: bool = Field(True, env="OUTBOX_DISPATCHER_ENABLED")
+    OUTBOX_BATCH_SIZE: int = Field(100, env="OUTBOX_BATCH_SIZE")
+    OUTBOX_POLL_INTERVAL: float = Field(1, env="OUTBOX_POLL_INTERVAL")
+    OUTBOX_LEASE_SECONDS: float = Field(60, env="OUTBOX_LEASE_SECONDS")
+    OUTBOX_MAX_ATTEMPTS: int = Field(10, env="OUTBOX_MAX_ATTEMPTS")
+    OUTBOX_BACKOFF_BASE: float = Field(2, env="OUTBOX_BACKOFF_BASE")
+    OUTBOX_BACKOFF_MAX: float = Field(600, env="OUTBOX_BACKOFF_MAX")
+    OUTBOX_DRAIN_TIMEOUT: float = Field(10, env="OUTBOX_DRAIN_TIMEOUT")
+
+    # Notifications
+    # Status changes for one recipient are held this many seconds and sent
+    # as a single digest, or sooner once MAX_PENDING of them are waiting
+    NOTIFICATION_DIGEST_WINDOW: float = Field(60, env="NOTIFICATION_DIGEST_WINDOW")
+    NOTIFICATION_DIGEST_MAX_PENDING: int = Field(
+        100, env="NOTIFICATION_DIGEST_MAX_PENDING"
+    )
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,476 @@
+"""Closed-loop load generator for the task API.
+
+Each of `--concurrency` virtual users picks an operation from a weighted
+mix, sends it and immediately picks the next one, for `--duration`
+seconds after a `--warmup` period whose samples are discarded.
+
+By default the app is built with `create_app()` and driven in-process
+through httpx's ASGI transport, against the database configured in the
+environment. Client and server then share one event loop, so to find the
+ceiling of a single worker point `--base-url` at `uvicorn --workers 1`
+instead.
+
+Rate limits are turned off for the in-process app unless `--rate-limits` is
+given: every virtual user comes from the same address and sends far more
+than a person would, so most requests would be answered 429. Start a server
+driven through `--base-url` with `RATE_LIMIT_BACKEND=none` for the same
+reason.
+
+    python -m benchmarks.load_test --concurrency 50 --duration 60
+
+Results are printed and written as JSON to `--output` so runs can be
+compared over time.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import re
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from app.db.common.enums import PriorityEnum, RoleEnum, StatusEnum
+from app.services.auth import create_access_token
+
+API = "/api/v1"
+PASSWORD = "load-test-password"
+
+DEFAULT_MIX = "register=1,login=2,create=15,get=40,list=15,update=10,assign=7,status=10"
+
+METRIC_LINE = re.compile(r'^(\w+)\{method="([^"]*)",route="([^"]*)"\} (\S+)$')
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.measuring = False
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.failures: dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, status: int | None, elapsed: float) -> None:
+        if not self.measuring:
+            return
+
+        if status is None:
+            self.failures[route] += 1
+            return
+
+        self.latencies[route].append(elapsed)
+        self.statuses[route][status] += 1
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace) -> None:
+        self.client = client
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.recorder = Recorder()
+        self.run_id = uuid.uuid4().hex[:8]
+        self.registered = 0
+        self.users: list[dict] = []
+        self.task_ids: list[int] = []
+        self.operations = {
+            "register": self.register,
+            "login": self.login,
+            "create": self.create,
+            "get": self.get,
+            "list": self.list_tasks,
+            "update": self.update,
+            "assign": self.assign,
+            "status": self.status,
+        }
+        self.mix = parse_mix(args.mix, self.operations)
+
+    async def request(self, route: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(route, None, time.perf_counter() - started)
+            return None
+
+        self.recorder.record(route, response.status_code, time.perf_counter() - started)
+        return response
+
+    def headers(self, user: dict) -> dict:
+        return {"Authorization": f"Bearer {user['token']}"}
+
+    def next_username(self) -> str:
+        self.registered += 1
+        return f"lt-{self.run_id}-{self.registered}"
+
+    async def setup(self) -> None:
+        """Register the user pool and give it some tasks to work on"""
+        usernames = [self.next_username() for _ in range(self.args.users)]
+        responses = await asyncio.gather(
+            *(
+                self.client.post(
+                    f"{API}/register",
+                    json={
+                        "username": username,
+                        "email": f"{username}@example.com",
+                        "password": PASSWORD,
+                    },
+                )
+                for username in usernames
+            )
+        )
+        for response in responses:
+            response.raise_for_status()
+            user = response.json()
+            # The API cannot promote users, so the pool acts as managers with
+            # tokens minted from the app's own secret
+            user["token"] = create_access_token(
+                data={
+                    "sub": user["username"],
+                    "user_id": user["id"],
+                    "role": RoleEnum.MANAGER.value,
+                }
+            )
+            self.users.append(user)
+
+        response = await self.client.post(
+            f"{API}/tasks/bulk",
+            json=[self.task_payload() for _ in range(self.args.tasks)],
+            headers=self.headers(self.users[0]),
+        )
+        response.raise_for_status()
+        self.task_ids.extend(task["id"] for task in response.json()["items"])
+
+    def task_payload(self) -> dict:
+        return {
+            "title": f"Load test task {self.random.randrange(1_000_000)}",
+            "description": "Created by the load test harness",
+            "status": self.random.choice(list(StatusEnum)).value,
+            "priority": self.random.choice(list(PriorityEnum)).value,
+        }
+
+    async def register(self, user: dict) -> None:
+        username = self.next_username()
+        await self.request(
+            "POST /register",
+            "POST",
+            f"{API}/register",
+            json={
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": PASSWORD,
+            },
+        )
+
+    async def login(self, user: dict) -> None:
+        await self.request(
+            "POST /login",
+            "POST",
+            f"{API}/login",
+            data={"username": user["username"], "password": PASSWORD},
+        )
+
+    async def create(self, user: dict) -> None:
+        # POST /tasks does not return the id, the bulk endpoint does, so new
+        # tasks join the pool that reads and updates pick from
+        response = await self.request(
+            "POST /tasks/bulk",
+            "POST",
+            f"{API}/tasks/bulk",
+            json=[self.task_payload()],
+            headers=self.headers(user),
+        )
+        if response is not None and response.status_code == 200:
+            self.task_ids.extend(task["id"] for task in response.json()["items"])
+
+    async def get(self, user: dict) -> None:
+        await self.request(
+            "GET /tasks/{task_id}",
+            "GET",
+            f"{API}/tasks/{self.random.choice(self.task_ids)}",
+            headers=self.headers(user),
+        )
+
+    async def list_tasks(self, user: dict) -> None:
+        await self.request(
+            "GET /tasks",
+            "GET",
+            f"{API}/tasks",
+            params={"limit": 20},
+            headers=self.headers(user),
+        )
+
+    async def update(self, user: dict) -> None:
+        await self.request(
+            "PUT /tasks/{task_id}",
+            "PUT",
+            f"{API}/tasks/{self.random.choice(self.task_ids)}",
+            json=self.task_payload(),
+            headers=self.headers(user),
+        )
+
+    async def assign(self, user: dict) -> None:
+        assignee = self.random.choice(self.users)
+        await self.request(
+            "POST /tasks/{task_id}/assign/{user_id}",
+            "POST",
+            f"{API}/tasks/{self.random.choice(self.task_ids)}/assign/{assignee['id']}",
+            headers=self.headers(user),
+        )
+
+    async def status(self, user: dict) -> None:
+        await self.request(
+            "PUT /tasks/{task_id}/status",
+            "PUT",
+            f"{API}/tasks/{self.random.choice(self.task_ids)}/status",
+            params={"new_status": self.random.choice(list(StatusEnum)).value},
+            headers=self.headers(user),
+        )
+
+    async def virtual_user(self, deadline: float) -> None:
+        names, weights = zip(*self.mix.items())
+        while time.monotonic() < deadline:
+            user = self.random.choice(self.users)
+            [name] = self.random.choices(names, weights)
+            await self.operations[name](user)
+            if self.args.think_time:
+                await asyncio.sleep(self.random.expovariate(1 / self.args.think_time))
+
+    async def scrape_db_metrics(self) -> dict[tuple[str, str], dict[str, float]]:
+        response = await self.client.get("/metrics")
+        response.raise_for_status()
+
+        metrics: dict[tuple[str, str], dict[str, float]] = defaultdict(dict)
+        for line in response.text.splitlines():
+            match = METRIC_LINE.match(line)
+            if match:
+                name, method, route, value = match.groups()
+                metrics[(method, route)][name] = float(value)
+
+        return metrics
+
+    async def run(self) -> dict:
+        await self.setup()
+
+        started = time.monotonic()
+        measure_from = started + self.args.warmup
+        deadline = measure_from + self.args.duration
+        workers = [
+            asyncio.create_task(self.virtual_user(deadline))
+            for _ in range(self.args.concurrency)
+        ]
+
+        await asyncio.sleep(max(0.0, measure_from - time.monotonic()))
+        before = await self.scrape_db_metrics()
+        self.recorder.measuring = True
+        measured_from = time.monotonic()
+
+        await asyncio.gather(*workers)
+        self.recorder.measuring = False
+        elapsed = time.monotonic() - measured_from
+        after = await self.scrape_db_metrics()
+
+        return self.report(elapsed, db_metrics_delta(before, after))
+
+    def report(self, elapsed: float, db: dict[str, dict[str, float]]) -> dict:
+        routes = {}
+        for route in sorted(set(self.recorder.latencies) | set(self.recorder.failures)):
+            latencies = sorted(self.recorder.latencies[route])
+            statuses = dict(self.recorder.statuses[route])
+            routes[route] = {
+                "requests": len(latencies),
+                "throughput": len(latencies) / elapsed,
+                "errors": sum(n for code, n in statuses.items() if code >= 400),
+                "transport_failures": self.recorder.failures[route],
+                "statuses": {str(code): n for code, n in sorted(statuses.items())},
+                "latency_ms": {
+                    "mean": 1000 * sum(latencies) / len(latencies) if latencies else 0,
+                    "p50": 1000 * percentile(latencies, 50),
+                    "p95": 1000 * percentile(latencies, 95),
+                    "p99": 1000 * percentile(latencies, 99),
+                    "max": 1000 * latencies[-1] if latencies else 0,
+                },
+                **db.get(route, {}),
+            }
+
+        total = sum(route["requests"] for route in routes.values())
+        return {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "target": self.args.base_url or "in-process",
+            "config": {
+                "concurrency": self.args.concurrency,
+                "duration": self.args.duration,
+                "warmup": self.args.warmup,
+                "think_time": self.args.think_time,
+                "mix": self.mix,
+                "users": self.args.users,
+                "tasks": self.args.tasks,
+                "seed": self.args.seed,
+            },
+            "elapsed": elapsed,
+            "requests": total,
+            "throughput": total / elapsed,
+            "routes": routes,
+        }
+
+
+def parse_mix(mix: str, operations: dict) -> dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in operations:
+            raise SystemExit(
+                f"Unknown operation {name!r}, expected one of {', '.join(operations)}"
+            )
+        weights[name] = float(weight or 1)
+
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not values:
+        return 0.0
+
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+def db_metrics_delta(before: dict, after: dict) -> dict[str, dict[str, float]]:
+    """Per-route SQL statements and DB time during the measured window"""
+    delta = {}
+    for (method, route), values in after.items():
+        previous = before.get((method, route), {})
+
+        def diff(name: str) -> float:
+            return values.get(name, 0) - previous.get(name, 0)
+
+        requests = diff("db_statements_per_request_count")
+        if requests <= 0:
+            continue
+
+        # Server routes are mounted under the API prefix, client labels are not
+        label = f"{method} {route.removeprefix(API)}"
+        delta[label] = {
+            "db_statements_per_request": diff("db_statements_per_request_sum")
+            / requests,
+            "db_time_ms_per_request": 1000 * diff("db_time_seconds_total") / requests,
+        }
+
+    return delta
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: dict) -> None:
+    print(
+        f"{results['requests']} requests in {results['elapsed']:.1f}s, "
+        f"{results['throughput']:.1f} req/s at concurrency "
+        f"{results['config']['concurrency']}"
+    )
+    header = (
+        f"{'route':<40} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'errors':>7} {'stmts':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+    for route, stats in results["routes"].items():
+        latency = stats["latency_ms"]
+        statements = stats.get("db_statements_per_request")
+        print(
+            f"{route:<40} {stats['throughput']:>8.1f} {latency['p50']:>8.1f} "
+            f"{latency['p95']:>8.1f} {latency['p99']:>8.1f} {stats['errors']:>7} "
+            f"{statements if statements is not None else float('nan'):>6.1f}"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with AsyncExitStack() as stack:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        if args.base_url:
+            client = httpx.AsyncClient(
+                base_url=args.base_url, limits=limits, timeout=args.timeout
+            )
+        else:
+            if not args.rate_limits:
+                # Read when the app is imported
+                os.environ["RATE_LIMIT_BACKEND"] = "none"
+            from app.main import create_app
+
+            app = create_app()
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://load-test",
+                limits=limits,
+                timeout=args.timeout,
+            )
+        await stack.enter_async_context(client)
+
+        results = await LoadTest(client, args).run()
+
+    print_report(results)
+
+    output = Path(
+        args.output
+        or f"benchmarks/results/{datetime.now():%Y%m%d-%H%M%S}"
+        f"-{results['git_revision'] or 'unknown'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="seconds measured")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds discarded")
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=0,
+        help="mean pause between a virtual user's requests, in seconds",
+    )
+    parser.add_argument(
+        "--mix",
+        default=DEFAULT_MIX,
+        help="comma separated operation=weight pairs (default: %(default)s)",
+    )
+    parser.add_argument("--users", type=int, default=20, help="user pool size")
+    parser.add_argument(
+        "--tasks", type=int, default=200, help="tasks created before the run"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--base-url", help="drive a running server instead")
+    parser.add_argument(
+        "--rate-limits",
+        action="store_true",
+        help="keep the in-process app's rate limits on",
+    )
+    parser.add_argument("--output", help="JSON results path")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
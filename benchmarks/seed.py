@@ -0,0 +1,393 @@
+"""Bulk seeder for users, tasks and task assignees.
+
+Rows are generated in fixed-size chunks in a process pool and streamed into
+Postgres with COPY over several connections at once. Every chunk draws from
+its own RNG derived from `--seed`, so a given seed produces the same data no
+matter how many processes or connections are used.
+
+    python -m benchmarks.seed --users 100000 --tasks 10000000 --seed 42
+
+Ids continue from the current maximum of each table and the sequences are
+moved past them afterwards, so run it against a database nothing else is
+writing to. Every seeded user has the password given by `--password`.
+Task counters are not maintained row by row during the load, they are
+rebuilt once at the end.
+"""
+import argparse
+import asyncio
+import bisect
+import functools
+import itertools
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import asyncpg
+
+from app.db.config import get_db_config
+from app.db.main import database
+from app.repositories.task_counter import TaskCounterRepository
+from app.services.auth import get_hashed_password
+from app.services.hashing import available_cpus
+
+USER_COLUMNS = (
+    "id",
+    "username",
+    "email",
+    "password",
+    "role",
+    "created_at",
+    "updated_at",
+)
+TASK_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "responsible_person_id",
+    "status",
+    "priority",
+    "created_at",
+    "updated_at",
+)
+ASSIGNEE_COLUMNS = ("task_id", "user_id")
+
+# Enum labels as stored by Postgres, with their share of rows
+ROLES = {"USER": 0.90, "MANAGER": 0.09, "ADMIN": 0.01}
+STATUSES = {"DONE": 0.55, "TODO": 0.30, "IN_PROGRESS": 0.15}
+PRIORITIES = {
+    "MEDIUM": 0.45,
+    "HIGH": 0.20,
+    "LOW": 0.20,
+    "LOWEST": 0.10,
+    "HIGHEST": 0.05,
+}
+# Number of assignees per task
+ASSIGNEE_COUNTS = {0: 0.30, 1: 0.45, 2: 0.15, 3: 0.07, 4: 0.02, 6: 0.01}
+
+# fmt: off
+VERBS = (
+    "Fix", "Implement", "Review", "Update", "Refactor", "Document", "Test",
+    "Deploy", "Investigate", "Migrate", "Design", "Remove",
+)
+NOUNS = (
+    "login flow", "billing page", "search index", "export job", "API client",
+    "dashboard", "onboarding emails", "audit log", "rate limiter", "caching",
+    "mobile layout", "payment webhook", "report builder", "user settings",
+)
+WORDS = (
+    "the", "customer", "reported", "that", "when", "after", "deploy", "page",
+    "request", "fails", "slow", "should", "handle", "error", "data", "team",
+    "needs", "before", "release", "check", "logs", "users", "missing", "update",
+)
+# fmt: on
+
+
+def _cumulative(weights: dict) -> tuple[list, list[float]]:
+    return list(weights), list(itertools.accumulate(weights.values()))
+
+
+@functools.lru_cache(maxsize=None)
+def _zipf_cum_weights(n: int, exponent: float) -> list[float]:
+    """Cumulative weights that make a few users own most of the tasks"""
+    return list(
+        itertools.accumulate(1 / (rank**exponent) for rank in range(1, n + 1))
+    )
+
+
+def _chunk_rng(seed: int, table: str, chunk: int) -> random.Random:
+    return random.Random(f"{seed}:{table}:{chunk}")
+
+
+def generate_users(
+    seed: int,
+    chunk: int,
+    start: int,
+    count: int,
+    first_id: int,
+    prefix: str,
+    password_hash: str,
+    end: datetime,
+) -> list[tuple]:
+    rng = _chunk_rng(seed, "users", chunk)
+    roles, role_weights = _cumulative(ROLES)
+    rows = []
+
+    for number in range(start, start + count):
+        created_at = end - timedelta(seconds=rng.randrange(2 * 365 * 86400))
+        rows.append(
+            (
+                first_id + number,
+                f"{prefix}{number}",
+                f"{prefix}{number}@example.com",
+                password_hash,
+                rng.choices(roles, cum_weights=role_weights)[0],
+                created_at,
+                created_at,
+            )
+        )
+
+    return rows
+
+
+def generate_tasks(
+    seed: int,
+    chunk: int,
+    start: int,
+    count: int,
+    first_id: int,
+    total: int,
+    first_user_id: int,
+    users: int,
+    exponent: float,
+    days: int,
+    end: datetime,
+) -> tuple[list[tuple], list[tuple]]:
+    rng = _chunk_rng(seed, "tasks", chunk)
+    statuses, status_weights = _cumulative(STATUSES)
+    priorities, priority_weights = _cumulative(PRIORITIES)
+    assignee_counts, assignee_weights = _cumulative(ASSIGNEE_COUNTS)
+    user_weights = _zipf_cum_weights(users, exponent)
+    user_total = user_weights[-1]
+
+    def pick_user() -> int:
+        return first_user_id + bisect.bisect(user_weights, rng.random() * user_total)
+
+    span = days * 86400
+    begin = end - timedelta(seconds=span)
+    tasks, assignees = [], []
+
+    for number in range(start, start + count):
+        id = first_id + number
+        # Ids and creation times grow together, like they do in production
+        created_at = begin + timedelta(
+            seconds=number / total * span + rng.random() * 60
+        )
+        status = rng.choices(statuses, cum_weights=status_weights)[0]
+        # Finished work has usually been touched for a while after creation
+        touched = rng.expovariate(1 / (7 * 86400 if status == "DONE" else 86400))
+        updated_at = created_at + timedelta(seconds=touched)
+        description = (
+            " ".join(rng.choices(WORDS, k=rng.randrange(8, 40))).capitalize()
+            if rng.random() < 0.7
+            else None
+        )
+        tasks.append(
+            (
+                id,
+                f"{rng.choice(VERBS)} {rng.choice(NOUNS)} #{id}",
+                description,
+                pick_user(),
+                status,
+                rng.choices(priorities, cum_weights=priority_weights)[0],
+                created_at,
+                updated_at,
+            )
+        )
+
+        wanted = rng.choices(assignee_counts, cum_weights=assignee_weights)[0]
+        assigned = {pick_user() for _ in range(min(wanted, users))}
+        assignees.extend((id, user_id) for user_id in sorted(assigned))
+
+    return tasks, assignees
+
+
+class Seeder:
+    def __init__(self, args: argparse.Namespace, dsn: str) -> None:
+        self.args = args
+        self.dsn = dsn
+        self.executor = ProcessPoolExecutor(max_workers=args.processes)
+        self.copied: dict[str, int] = {"users": 0, "tasks": 0, "task_assignee": 0}
+
+    async def run(self) -> None:
+        pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.args.jobs,
+            max_size=self.args.jobs,
+            server_settings={"app.skip_task_counters": "on"},
+        )
+        try:
+            async with pool.acquire() as connection:
+                first_user_id = await self.next_id(connection, "users")
+                first_task_id = await self.next_id(connection, "tasks")
+                dropped = (
+                    await self.drop_indexes(connection)
+                    if self.args.drop_indexes
+                    else []
+                )
+
+            started = time.monotonic()
+            await self.seed_users(pool, first_user_id)
+            await self.seed_tasks(pool, first_task_id, first_user_id)
+            elapsed = time.monotonic() - started
+            print(
+                f"Copied {self.copied['users']} users, {self.copied['tasks']} tasks "
+                f"and {self.copied['task_assignee']} assignees in {elapsed:.1f}s"
+            )
+
+            async with pool.acquire() as connection:
+                for definition in dropped:
+                    print(f"Rebuilding: {definition}")
+                    await connection.execute(definition)
+                for table in ("users", "tasks"):
+                    await connection.execute(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT max(id) FROM {table}))"
+                    )
+                    await connection.execute(f"ANALYZE {table}")
+                await connection.execute("ANALYZE task_assignee")
+
+            async with database.get_session() as session:
+                repaired = await TaskCounterRepository(session).repair()
+            print(f"Rebuilt {repaired} task counters")
+        finally:
+            await pool.close()
+            await database.dispose()
+            self.executor.shutdown()
+
+    async def next_id(self, connection: asyncpg.Connection, table: str) -> int:
+        return await connection.fetchval(
+            f"SELECT coalesce(max(id), 0) + 1 FROM {table}"
+        )
+
+    async def drop_indexes(self, connection: asyncpg.Connection) -> list[str]:
+        """Drop secondary indexes on the seeded task tables, returning their definitions"""
+        rows = await connection.fetch(
+            """
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            WHERE i.schemaname = current_schema()
+              AND i.tablename IN ('tasks', 'task_assignee')
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname
+              )
+            """
+        )
+        for row in rows:
+            # Printed first so a failed run can be repaired by hand
+            print(f"Dropping: {row['indexdef']}")
+            await connection.execute(f'DROP INDEX "{row["indexname"]}"')
+
+        return [row["indexdef"] for row in rows]
+
+    async def load_chunks(self, total: int, load) -> None:
+        """Call `load(chunk, start, count)` for every chunk, a few chunks at a time
+
+        One chunk can be generating in each process while another is being
+        copied on each connection, without holding more than that in memory.
+        """
+        size = self.args.chunk_size
+        chunks = iter(range((total + size - 1) // size))
+
+        async def worker() -> None:
+            for chunk in chunks:
+                start = chunk * size
+                await load(chunk, start, min(size, total - start))
+
+        await asyncio.gather(
+            *(worker() for _ in range(self.args.processes + self.args.jobs))
+        )
+
+    async def seed_users(self, pool: asyncpg.Pool, first_id: int) -> None:
+        password_hash = get_hashed_password(self.args.password)
+
+        async def load(chunk: int, start: int, count: int) -> None:
+            rows = await self.generate(
+                generate_users,
+                self.args.seed,
+                chunk,
+                start,
+                count,
+                first_id,
+                self.args.prefix,
+                password_hash,
+                self.args.end_date,
+            )
+            await self.copy(pool, "users", rows, USER_COLUMNS)
+
+        await self.load_chunks(self.args.users, load)
+
+    async def seed_tasks(
+        self, pool: asyncpg.Pool, first_id: int, first_user_id: int
+    ) -> None:
+        async def load(chunk: int, start: int, count: int) -> None:
+            tasks, assignees = await self.generate(
+                generate_tasks,
+                self.args.seed,
+                chunk,
+                start,
+                count,
+                first_id,
+                self.args.tasks,
+                first_user_id,
+                self.args.users,
+                self.args.zipf_exponent,
+                self.args.days,
+                self.args.end_date,
+            )
+            await self.copy(pool, "tasks", tasks, TASK_COLUMNS)
+            await self.copy(pool, "task_assignee", assignees, ASSIGNEE_COLUMNS)
+
+        await self.load_chunks(self.args.tasks, load)
+
+    async def generate(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, fn, *args
+        )
+
+    async def copy(
+        self, pool: asyncpg.Pool, table: str, rows: list[tuple], columns: tuple
+    ) -> None:
+        if not rows:
+            return
+
+        async with pool.acquire() as connection:
+            await connection.copy_records_to_table(table, records=rows, columns=columns)
+        self.copied[table] += len(rows)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--prefix",
+        default="seed-user-",
+        help="username prefix, change it to seed the same database again",
+    )
+    parser.add_argument("--password", default="password")
+    parser.add_argument(
+        "--end-date",
+        type=datetime.fromisoformat,
+        default=datetime(2026, 1, 1),
+        help="latest creation time, fixed so a seed always gives the same rows",
+    )
+    parser.add_argument(
+        "--days", type=int, default=365, help="how far back task creation goes"
+    )
+    parser.add_argument(
+        "--zipf-exponent",
+        type=float,
+        default=1.1,
+        help="skew of tasks per user, higher gives more to the busiest users",
+    )
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--processes", type=int, default=available_cpus())
+    parser.add_argument("--jobs", type=int, default=4, help="COPY connections")
+    parser.add_argument(
+        "--drop-indexes",
+        action="store_true",
+        help="drop secondary task indexes while loading and rebuild them after",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    dsn = get_db_config().full_database_url.replace("+asyncpg", "", 1)
+    asyncio.run(Seeder(args, dsn).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+# Settings are read when the app modules are imported, the database named
+# here is never connected to: tests that need one use TEST_DATABASE_URL
+for name, value in {
+    "POSTGRES_DB": "tasks_test",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_HOST": "localhost",
+    "SECRET_KEY": "test-secret-key",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+    "TASK_CACHE_BACKEND": "none",
+    "RATE_LIMIT_BACKEND": "none",
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest  # noqa: E402
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from redis.asyncio import Redis  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+from app.db.common.enums import RoleEnum  # noqa: E402
+from app.db.main import get_db, get_read_db  # noqa: E402
+from app.db.models.user import User  # noqa: E402
+from app.db.unit_of_work import WriteTrackingSession  # noqa: E402
+from app.main import create_app  # noqa: E402
+from app.services.auth import create_access_token  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def database_url() -> str:
+    """A Postgres database migrated to head, tests using it are skipped without one"""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    alembic_config = Config(str(ROOT / "alembic.ini"))
+    alembic_config.set_main_option("script_location", str(ROOT / "app/db/alembic"))
+    alembic_config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    command.upgrade(alembic_config, "head")
+
+    return url
+
+
+@pytest.fixture
+async def db(database_url: str) -> AsyncIterator[AsyncSession]:
+    """A session whose commits only release savepoints, everything is rolled back after the test"""
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+            sync_session_class=WriteTrackingSession,
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+    await engine.dispose()
+
+
+class SessionDatabase:
+    """Stands in for `app.db.main.database`, handing out the test's session"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @asynccontextmanager
+    async def get_session(self) -> AsyncIterator[AsyncSession]:
+        yield self.session
+
+    get_read_only_session = get_session
+
+
+@pytest.fixture
+def session_database(db: AsyncSession) -> SessionDatabase:
+    return SessionDatabase(db)
+
+
+@pytest.fixture
+async def redis_client() -> AsyncIterator[Redis]:
+    """A client of the Redis database at TEST_REDIS_URL, which is flushed around each test"""
+    url = os.environ.get("TEST_REDIS_URL")
+    if not url:
+        pytest.skip("TEST_REDIS_URL is not set")
+
+    client = Redis.from_url(url)
+    await client.flushdb()
+    try:
+        yield client
+    finally:
+        await client.flushdb()
+        await client.aclose()
+
+
+@pytest.fixture
+async def users(db: AsyncSession) -> list[int]:
+    """Ids of three users"""
+    result = await db.scalars(
+        insert(User)
+        .values(
+            [
+                {"username": name, "email": f"{name}@example.com", "password": "x"}
+                for name in ("alice", "bob", "carol")
+            ]
+        )
+        .returning(User.id)
+    )
+    return list(result)
+
+
+@pytest.fixture
+async def client(db: AsyncSession) -> AsyncIterator[AsyncClient]:
+    """An API client whose requests all run in the test's session"""
+
+    async def session() -> AsyncIterator[AsyncSession]:
+        yield db
+
+    app = create_app()
+    app.dependency_overrides[get_db] = session
+    app.dependency_overrides[get_read_db] = session
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def auth() -> Callable[..., dict[str, str]]:
+    """Build the headers authenticating as a user id with a role"""
+
+    def auth(user_id: int, role: RoleEnum = RoleEnum.USER) -> dict[str, str]:
+        token = create_access_token(
+            {"sub": f"user-{user_id}", "user_id": user_id, "role": role.value}
+        )
+        return {"Authorization": f"Bearer {token}"}
+
+    return auth
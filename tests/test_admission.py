@@ -0,0 +1,84 @@
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.api.middleware.admission import AdmissionControlMiddleware
+from app.services.auth import create_access_token
+from app.services.rate_limit import MemoryRateLimitStore, TokenBucketLimiter
+
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+
+def client(**options) -> tuple[TestClient, AdmissionControlMiddleware]:
+    paths = ["/api/v1/tasks", "/api/v1/login", "/api/v1/tasks/stream", "/metrics"]
+    app = Starlette(routes=[Route(path, ok, methods=["GET", "POST"]) for path in paths])
+    middleware = AdmissionControlMiddleware(app, **options)
+    return TestClient(middleware), middleware
+
+
+def limiter(name: str, burst: int) -> TokenBucketLimiter:
+    return TokenBucketLimiter(MemoryRateLimitStore(100), name, rate=0.5, burst=burst)
+
+
+def bearer(subject: str) -> dict[str, str]:
+    token = create_access_token({"sub": subject, "user_id": 1, "role": "user"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_user_rate_limit():
+    test_client, _ = client(user_limiter=limiter("user", burst=1))
+
+    assert test_client.get("/api/v1/tasks", headers=bearer("alice")).status_code == 200
+    response = test_client.get("/api/v1/tasks", headers=bearer("alice"))
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+    assert test_client.get("/api/v1/tasks", headers=bearer("bob")).status_code == 200
+    # Anonymous and invalid tokens are left to the routes
+    assert test_client.get("/api/v1/tasks").status_code == 200
+    headers = {"Authorization": "Bearer invalid"}
+    assert test_client.get("/api/v1/tasks", headers=headers).status_code == 200
+
+
+def test_auth_rate_limit_per_client_ip():
+    test_client, _ = client(auth_limiter=limiter("auth_ip", burst=2))
+
+    codes = [test_client.post("/api/v1/login").status_code for _ in range(3)]
+    assert codes == [200, 200, 429]
+    assert test_client.get("/api/v1/tasks").status_code == 200
+
+
+def test_sheds_load_while_too_many_in_flight():
+    test_client, middleware = client(max_in_flight=2, retry_after=3)
+
+    middleware.in_flight = 2
+    response = test_client.get("/api/v1/tasks")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+
+    middleware.in_flight = 1
+    assert test_client.get("/api/v1/tasks").status_code == 200
+    assert middleware.in_flight == 1
+
+
+def test_sheds_load_while_pool_checkouts_wait():
+    pool_wait = 0.0
+    test_client, _ = client(max_pool_wait=1, pool_wait=lambda: pool_wait)
+
+    assert test_client.get("/api/v1/tasks").status_code == 200
+    pool_wait = 1.5
+    assert test_client.get("/api/v1/tasks").status_code == 503
+
+
+def test_exempt_paths():
+    test_client, middleware = client(
+        max_in_flight=1, user_limiter=limiter("user", burst=1)
+    )
+    middleware.in_flight = 1
+
+    for path in ("/api/v1/tasks/stream", "/metrics"):
+        responses = [test_client.get(path, headers=bearer("alice")) for _ in range(2)]
+        assert [response.status_code for response in responses] == [200, 200]
@@ -0,0 +1,62 @@
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.db.common.enums import RoleEnum
+from app.db.config import EngineProfile
+from app.db.pool import checkout_timeouts_total, checkout_wait_seconds
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def engine(database_url) -> AsyncIterator[AsyncEngine]:
+    """An engine with a single pooled connection"""
+    profile = EngineProfile(pool_size=1, max_overflow=0, pool_timeout=0.2)
+    engine = create_async_engine(database_url, **profile.engine_options("test-pool"))
+    yield engine
+    await engine.dispose()
+
+
+async def test_stats_follow_checkouts(engine):
+    waits = checkout_wait_seconds.snapshot(pool="test-pool")["count"]
+
+    async with engine.connect():
+        stats = engine.pool.stats()
+        assert (stats["checked_out"], stats["idle"]) == (1, 0)
+
+    stats = engine.pool.stats()
+    assert (stats["size"], stats["checked_out"], stats["idle"]) == (1, 0, 1)
+    assert stats["overflow"] == 0 and stats["longest_wait"] == 0
+    assert checkout_wait_seconds.snapshot(pool="test-pool")["count"] == waits + 1
+
+
+async def test_waiting_checkouts_and_timeouts_are_recorded(engine):
+    timeouts = checkout_timeouts_total.get(pool="test-pool")
+
+    async with engine.connect():
+        waiting = asyncio.create_task(engine.connect().start())
+        await asyncio.sleep(0.05)
+        assert engine.pool.current_wait() >= 0.05
+
+        with pytest.raises(TimeoutError):
+            await waiting
+
+    assert engine.pool.current_wait() == 0
+    assert checkout_timeouts_total.get(pool="test-pool") == timeouts + 1
+
+
+async def test_pool_stats_endpoint(client, auth, users):
+    path = "/api/v1/internal/db/pool"
+
+    response = await client.get(path, headers=auth(users[0]))
+    assert response.status_code == 403
+
+    response = await client.get(path, headers=auth(users[0], RoleEnum.ADMIN))
+    assert response.status_code == 200
+    primary = response.json()["primary"]
+    assert {"size", "checked_out", "idle", "checkout_timeouts"} <= primary.keys()
+    assert primary["checkout_wait_seconds"].keys() == {"buckets", "count", "sum"}
@@ -0,0 +1,57 @@
+import asyncio
+from typing import Iterator
+
+import pytest
+
+import app.services.user
+from app.services.exceptions.hashing import HashingUnavailableError
+from app.services.hashing import PasswordHasher, rejected_total
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def hasher() -> Iterator[PasswordHasher]:
+    hasher = PasswordHasher(workers=1, max_pending=1, acquire_timeout=0)
+    yield hasher
+    hasher.shutdown()
+
+
+async def test_hash_and_verify_run_in_the_pool(hasher):
+    hashed = await hasher.hash("secret")
+
+    assert await hasher.verify("secret", hashed)
+    assert not await hasher.verify("wrong", hashed)
+
+
+async def test_jobs_beyond_max_pending_are_rejected(hasher):
+    rejected = rejected_total.get(operation="verify")
+    running = asyncio.create_task(hasher.hash("secret"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HashingUnavailableError):
+        await hasher.verify("secret", "not-a-hash")
+    assert rejected_total.get(operation="verify") == rejected + 1
+
+    # The slot is free again once the running job is done
+    assert await hasher.verify("secret", await running)
+
+
+async def test_jobs_wait_for_a_slot_up_to_the_timeout(hasher):
+    hasher.acquire_timeout = 30
+
+    one, two = await asyncio.gather(hasher.hash("one"), hasher.hash("two"))
+    assert await hasher.verify("one", one)
+    assert await hasher.verify("two", two)
+
+
+async def test_saturated_hashing_answers_503(client, monkeypatch):
+    saturated = PasswordHasher(workers=1, max_pending=0, acquire_timeout=0)
+    monkeypatch.setattr(app.services.user, "password_hasher", saturated)
+
+    response = await client.post(
+        "/api/v1/register",
+        json={"username": "dave", "email": "dave@example.com", "password": "secret"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,207 @@
+import random
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.db.models.outbox import OutboxMessage
+from app.repositories.outbox import OutboxRepository
+from app.services.email import BaseEmailTransport, EmailService
+from app.services.outbox import TASK_STATUS_CHANGED, OutboxDispatcher
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingTransport(BaseEmailTransport):
+    def __init__(self):
+        self.sent: list[tuple[str, str]] = []
+        self.bodies: list[str] = []
+        self.failures = 0
+
+    async def send(self, recipient: str, subject: str, body: str) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("SMTP server unavailable")
+        self.sent.append((recipient, subject))
+        self.bodies.append(body)
+
+
+@pytest.fixture
+def transport() -> RecordingTransport:
+    return RecordingTransport()
+
+
+@pytest.fixture
+def dispatcher(session_database, transport) -> OutboxDispatcher:
+    return OutboxDispatcher(
+        session_database, EmailService(transport), lease_seconds=60, max_attempts=3
+    )
+
+
+async def add_messages(
+    db, recipient_id: int | None, *statuses: str, task_ids: list[int] | None = None
+) -> list[int]:
+    outbox = OutboxRepository(db)
+    messages = [
+        outbox.add(
+            TASK_STATUS_CHANGED,
+            {"task_id": task_id, "status": status},
+            recipient_id=recipient_id,
+        )
+        for task_id, status in zip(task_ids or range(1, len(statuses) + 1), statuses)
+    ]
+    await db.commit()
+    return [message.id for message in messages]
+
+
+async def expire_leases(db) -> None:
+    """Move every lease and retry delay into the past, now() being fixed in a transaction"""
+    await db.execute(
+        update(OutboxMessage).values(
+            available_at=OutboxMessage.available_at - timedelta(days=1)
+        )
+    )
+    # Each dispatch runs in a fresh session outside the tests
+    db.expire_all()
+
+
+async def outbox_rows(db) -> list[tuple]:
+    rows = await db.execute(
+        select(
+            OutboxMessage.id,
+            OutboxMessage.attempts,
+            OutboxMessage.sent_at.is_not(None),
+            OutboxMessage.last_error,
+        ).order_by(OutboxMessage.id)
+    )
+    return [tuple(row) for row in rows]
+
+
+async def test_claimed_messages_are_leased(db, users):
+    first, second = await add_messages(db, users[0], "DONE", "TODO")
+    outbox = OutboxRepository(db)
+
+    claimed = await outbox.claim(10, lease_seconds=60, max_attempts=3)
+    assert [(message.id, email) for message, email in claimed] == [
+        (first, "alice@example.com"),
+        (second, "alice@example.com"),
+    ]
+    assert await outbox.claim(10, lease_seconds=60, max_attempts=3) == []
+
+    # A dispatcher that never reported back loses its lease
+    await expire_leases(db)
+    claimed = await outbox.claim(1, lease_seconds=60, max_attempts=3)
+    assert [(message.id, message.attempts) for message, _ in claimed] == [(first, 2)]
+
+
+async def test_sent_messages_are_not_claimed_again(db, users, dispatcher, transport):
+    [message_id] = await add_messages(db, users[0], "DONE")
+
+    assert await dispatcher.dispatch_batch() == 1
+    assert transport.sent == [("alice@example.com", "Task 1 status changed")]
+    assert await outbox_rows(db) == [(message_id, 1, True, None)]
+
+    await expire_leases(db)
+    assert await dispatcher.dispatch_batch() == 0
+
+
+async def test_failed_deliveries_are_retried_until_max_attempts(
+    db, users, dispatcher, transport
+):
+    [message_id] = await add_messages(db, users[0], "DONE")
+    transport.failures = 3
+
+    assert await dispatcher.dispatch_batch() == 1
+    [(_, attempts, sent, error)] = await outbox_rows(db)
+    assert (attempts, sent) == (1, False)
+    assert "SMTP server unavailable" in error
+
+    # Not due again until the backoff has passed
+    assert await dispatcher.dispatch_batch() == 0
+    for _ in range(2):
+        await expire_leases(db)
+        assert await dispatcher.dispatch_batch() == 1
+
+    await expire_leases(db)
+    assert await dispatcher.dispatch_batch() == 0
+    assert [row[:3] for row in await outbox_rows(db)] == [(message_id, 3, False)]
+    assert transport.sent == []
+
+
+async def test_messages_without_recipient_are_dropped(db, dispatcher, transport):
+    [message_id] = await add_messages(db, None, "DONE")
+
+    assert await dispatcher.dispatch_batch() == 1
+    assert transport.sent == []
+    assert await outbox_rows(db) == [(message_id, 1, True, None)]
+
+
+def test_backoff_is_exponential_with_jitter_and_capped():
+    dispatcher = OutboxDispatcher(
+        database=None, email_service=EmailService(), backoff_base=2, backoff_max=60
+    )
+    random.seed(0)
+
+    for attempts, delay in [(1, 2), (3, 8), (5, 32), (6, 60), (10, 60)]:
+        backoffs = [dispatcher._backoff(attempts) for _ in range(100)]
+        assert delay / 2 <= min(backoffs) < max(backoffs) <= delay
+
+
+async def close_digest_windows(db, recipient_id: int) -> None:
+    await db.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.recipient_id == recipient_id)
+        .values(created_at=OutboxMessage.created_at - timedelta(hours=1))
+    )
+
+
+async def test_messages_are_coalesced_per_recipient(db, users, dispatcher, transport):
+    alice, bob, _ = users
+    dispatcher.digest_window = 60
+    await add_messages(db, alice, "TODO", "IN_PROGRESS", "DONE", task_ids=[1, 2, 1])
+    await add_messages(db, bob, "DONE")
+
+    # Both windows are still open
+    assert await dispatcher.dispatch_batch() == 0
+
+    await close_digest_windows(db, alice)
+    assert await dispatcher.dispatch_batch() == 3
+    assert transport.sent == [("alice@example.com", "2 tasks changed status")]
+    # The last change per task wins
+    assert transport.bodies[0].splitlines()[1:] == [
+        "Task 1: Done",
+        "Task 2: In progress",
+    ]
+
+    await close_digest_windows(db, bob)
+    assert await dispatcher.dispatch_batch() == 1
+    assert transport.sent[1] == ("bob@example.com", "Task 1 status changed")
+
+
+async def test_digests_are_sent_early_once_max_pending_pile_up(
+    db, users, dispatcher, transport
+):
+    dispatcher.digest_window = 3600
+    dispatcher.digest_max_pending = 3
+    await add_messages(db, users[0], "DONE", "DONE")
+    assert await dispatcher.dispatch_batch() == 0
+
+    await add_messages(db, users[0], "DONE", task_ids=[3])
+    assert await dispatcher.dispatch_batch() == 3
+    assert transport.sent == [("alice@example.com", "3 tasks changed status")]
+
+
+async def test_drain_does_not_wait_for_digest_windows(db, users, dispatcher, transport):
+    dispatcher.digest_window = 3600
+    dispatcher.batch_size = 2
+    await add_messages(db, users[0], "DONE", "DONE", "DONE")
+    await add_messages(db, users[1], "TODO")
+
+    await dispatcher.drain()
+
+    assert sorted(transport.sent) == [
+        ("alice@example.com", "2 tasks changed status"),
+        ("alice@example.com", "Task 3 status changed"),
+        ("bob@example.com", "Task 1 status changed"),
+    ]
+    assert all(sent for _, _, sent, _ in await outbox_rows(db))
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+
+from app.db.common.enums import PriorityEnum, StatusEnum
+from app.repositories.task import TaskRepository
+from app.services.exceptions.pagination import InvalidCursorError
+from app.services.pagination import (
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
+from app.services.task import TaskService
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 18, 9, 30, 15, 123456)
+
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    assert decode_rank_cursor(encode_rank_cursor(0.25, 42)) == (0.25, 42)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "not a cursor", encode_rank_cursor(0.25, 42), "WyJ4IiwxXQ", "W10"],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.anyio
+async def test_pages_follow_the_keyset(db, users):
+    # Created in one transaction, so every task has the same created_at and
+    # only the id keeps pages apart
+    tasks = await TaskRepository(db).create_many(
+        [
+            {
+                "title": f"task {i}",
+                "responsible_person_id": users[0],
+                "status": StatusEnum.TODO,
+                "priority": PriorityEnum.LOW,
+            }
+            for i in range(5)
+        ]
+    )
+    service = TaskService(db)
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = await service.list_tasks(
+            2, cursor, responsible_person_id=users[0]
+        )
+        pages.append([task.id for task in page])
+        if cursor is None:
+            break
+
+    ids = sorted((task.id for task in tasks), reverse=True)
+    assert pages == [ids[:2], ids[2:4], ids[4:]]
@@ -0,0 +1,123 @@
+import logging
+from typing import AsyncIterator
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.api.middleware.query_metrics import (
+    QueryMetricsMiddleware,
+    db_statements_per_request,
+    requests_total,
+)
+from app.db.instrumentation import RequestQueryStats, instrument_engine, statement_shape
+from app.metrics import MetricsRegistry
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def engine(database_url) -> AsyncIterator[AsyncEngine]:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    instrument_engine(engine)
+    yield engine
+    await engine.dispose()
+
+
+def test_statement_shapes_ignore_parameters():
+    assert statement_shape("SELECT *\n  FROM tasks WHERE id = $1::INTEGER") == (
+        "SELECT * FROM tasks WHERE id = ?"
+    )
+    assert statement_shape("WHERE id IN ($1::INTEGER, $2::INTEGER)") == statement_shape(
+        "WHERE id IN ($1::INTEGER, $2::INTEGER, $3::INTEGER)"
+    )
+
+
+def test_repeated_statements_are_reported_once(caplog):
+    stats = RequestQueryStats(n_plus_one_threshold=2)
+
+    with caplog.at_level(logging.WARNING, logger="app.db.instrumentation"):
+        for id in range(5):
+            stats.record(f"SELECT * FROM users WHERE id = ${id + 1}", 0.001, 1)
+        stats.record("SELECT * FROM tasks", 0.002, 3)
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "Possible N+1: statement executed more than 2 times in one request: "
+        "SELECT * FROM users WHERE id = ?"
+    ]
+    assert (stats.statements, stats.rows) == (6, 8)
+    assert stats.slowest_statement == "SELECT * FROM tasks"
+
+
+def test_n_plus_one_detection_can_be_disabled(caplog):
+    stats = RequestQueryStats()
+
+    with caplog.at_level(logging.WARNING, logger="app.db.instrumentation"):
+        for _ in range(100):
+            stats.record("SELECT 1", 0, 1)
+
+    assert caplog.records == []
+
+
+def test_prometheus_rendering():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs run", labelnames=("queue",)).inc(queue='a"b')
+    registry.histogram("job_seconds", "Job duration", buckets=(1, 5)).observe(2)
+    registry.gauge("workers", "Busy workers", callback=lambda: {(): 3})
+
+    assert registry.render_prometheus().splitlines() == [
+        "# HELP jobs_total Jobs run",
+        "# TYPE jobs_total counter",
+        'jobs_total{queue="a\\"b"} 1',
+        "# HELP job_seconds Job duration",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{le="1"} 0',
+        'job_seconds_bucket{le="5"} 1',
+        'job_seconds_bucket{le="+Inf"} 1',
+        "job_seconds_sum 2.0",
+        "job_seconds_count 1",
+        "# HELP workers Busy workers",
+        "# TYPE workers gauge",
+        "workers 3",
+    ]
+    with pytest.raises(ValueError):
+        registry.counter("jobs_total", "Jobs run again")
+
+
+async def test_requests_are_attributed_to_their_route(engine, caplog):
+    app = FastAPI()
+
+    @app.get("/things/{thing_id}")
+    async def get_thing(thing_id: int):
+        async with engine.connect() as connection:
+            for _ in range(3):
+                await connection.execute(text("SELECT 1"))
+        return {}
+
+    labels = {"method": "GET", "route": "/things/{thing_id}"}
+    served = requests_total.get(**labels)
+    statements = db_statements_per_request.snapshot(**labels)["sum"]
+    transport = ASGITransport(app=QueryMetricsMiddleware(app, n_plus_one_threshold=2))
+
+    with caplog.at_level(logging.WARNING, logger="app.db.instrumentation"):
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/things/1")).status_code == 200
+            assert (await client.get("/things/2")).status_code == 200
+
+    assert requests_total.get(**labels) == served + 2
+    assert db_statements_per_request.snapshot(**labels)["sum"] == statements + 6
+    assert [record.getMessage() for record in caplog.records] == [
+        "Possible N+1: statement executed more than 2 times in one request: SELECT 1"
+    ] * 2
+
+
+async def test_metrics_endpoint(client):
+    await client.get("/api/v1/tasks")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/api/v1/tasks"}' in response.text
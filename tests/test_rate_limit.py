@@ -0,0 +1,79 @@
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.services import rate_limit
+from app.services.rate_limit import (
+    BaseRateLimitStore,
+    MemoryRateLimitStore,
+    TokenBucketLimiter,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+async def test_bucket_starts_full_and_refills(clock):
+    store = MemoryRateLimitStore(max_keys=10)
+
+    assert [await store.take("key", 2, 3) for _ in range(4)] == [0, 0, 0, 0.5]
+
+    clock.now += 0.25
+    assert await store.take("key", 2, 3) == pytest.approx(0.25)
+    clock.now += 0.5
+    assert await store.take("key", 2, 3) == 0
+
+
+async def test_bucket_refills_up_to_burst(clock):
+    store = MemoryRateLimitStore(max_keys=10)
+    for _ in range(3):
+        await store.take("key", 1, 3)
+
+    clock.now += 60
+    assert [await store.take("key", 1, 3) for _ in range(4)] == [0, 0, 0, 1]
+
+
+async def test_least_recently_used_buckets_are_forgotten(clock):
+    store = MemoryRateLimitStore(max_keys=2)
+    await store.take("a", 1, 1)
+    await store.take("b", 1, 1)
+    await store.take("a", 1, 1)
+    await store.take("c", 1, 1)
+
+    # "b" comes back full, "a" is still empty
+    assert await store.take("b", 1, 1) == 0
+    assert await store.take("c", 1, 1) == 1
+
+
+async def test_limiter_rounds_the_wait_up(clock):
+    limiter = TokenBucketLimiter(MemoryRateLimitStore(10), "user", rate=0.4, burst=1)
+
+    assert await limiter.check("alice") == 0
+    assert await limiter.check("alice") == 3
+    assert await limiter.check("bob") == 0
+
+
+class UnreachableStore(BaseRateLimitStore):
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        raise ConnectionError("Connection refused")
+
+
+async def test_limiter_fails_open():
+    limiter = TokenBucketLimiter(UnreachableStore(), "user", rate=1, burst=1)
+    errors = rate_limit.store_errors_total.get()
+
+    assert [await limiter.check("alice") for _ in range(3)] == [0, 0, 0]
+    assert rate_limit.store_errors_total.get() == errors + 3
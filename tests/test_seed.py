@@ -0,0 +1,82 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from app.db.common.enums import PriorityEnum, RoleEnum, StatusEnum
+from benchmarks.seed import (
+    ASSIGNEE_COUNTS,
+    PRIORITIES,
+    ROLES,
+    STATUSES,
+    generate_tasks,
+    generate_users,
+)
+
+END = datetime(2026, 1, 1)
+
+
+def tasks(seed: int = 0, chunk: int = 0, start: int = 0, count: int = 2000):
+    return generate_tasks(
+        seed,
+        chunk,
+        start,
+        count,
+        first_id=1001,
+        total=10_000,
+        first_user_id=11,
+        users=100,
+        exponent=1.1,
+        days=30,
+        end=END,
+    )
+
+
+def test_labels_match_the_database_enums():
+    assert ROLES.keys() == RoleEnum.__members__.keys()
+    assert STATUSES.keys() == StatusEnum.__members__.keys()
+    assert PRIORITIES.keys() == PriorityEnum.__members__.keys()
+    for weights in (ROLES, STATUSES, PRIORITIES, ASSIGNEE_COUNTS):
+        assert abs(sum(weights.values()) - 1) < 1e-9
+
+
+def test_chunks_are_reproducible_from_the_seed():
+    assert tasks(seed=1, chunk=3) == tasks(seed=1, chunk=3)
+    assert tasks(seed=1, chunk=3) != tasks(seed=2, chunk=3)
+    assert tasks(seed=1, chunk=3) != tasks(seed=1, chunk=4)
+
+    users = generate_users(1, 0, 0, 10, 11, "seed-", "hash", END)
+    assert users == generate_users(1, 0, 0, 10, 11, "seed-", "hash", END)
+
+
+def test_users():
+    users = generate_users(0, 1, 50, 50, 11, "seed-", "hash", END)
+
+    assert [row[0] for row in users] == list(range(61, 111))
+    assert (users[0][1], users[0][2]) == ("seed-50", "seed-50@example.com")
+    assert {row[3] for row in users} == {"hash"}
+    assert all(row[5] == row[6] <= END for row in users)
+
+
+def test_tasks():
+    rows, assignees = tasks(start=2000)
+
+    assert [row[0] for row in rows] == list(range(3001, 5001))
+    assert all(row[0] == int(row[1].rsplit("#", 1)[1]) for row in rows)
+    assert all(11 <= row[3] <= 110 for row in rows)
+    assert all(END - timedelta(days=30) <= row[6] <= row[7] for row in rows)
+    # Creation times follow the ids, up to the minute of jitter
+    assert all(
+        later[6] > earlier[6] - timedelta(minutes=1)
+        for earlier, later in zip(rows, rows[1:])
+    )
+
+    assert {task_id for task_id, _ in assignees} <= {row[0] for row in rows}
+    assert len(set(assignees)) == len(assignees)
+    assert all(11 <= user_id <= 110 for _, user_id in assignees)
+
+
+def test_ownership_is_skewed_towards_the_first_users():
+    rows, _ = tasks(count=5000)
+    owners = Counter(row[3] for row in rows)
+
+    assert owners.most_common(1)[0][0] == 11
+    assert sum(owners[id] for id in range(11, 21)) > len(rows) / 2
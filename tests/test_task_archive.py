@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.db.common.enums import PriorityEnum, RoleEnum, StatusEnum
+from app.db.models.task import Task
+from app.db.models.task_archive import ArchivedTask
+from app.repositories.task import TaskRepository
+from app.repositories.task_archive import TaskArchiveRepository
+from app.repositories.task_counter import TaskCounterRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def archived_task_id(db, users) -> int:
+    """A done task with an assignee, moved to the archive next to an active one"""
+    alice, bob, _ = users
+    tasks = TaskRepository(db)
+    archive = TaskArchiveRepository(db)
+    old, recent = await tasks.create_many(
+        [
+            {
+                "title": title,
+                "responsible_person_id": alice,
+                "status": StatusEnum.DONE,
+                "priority": PriorityEnum.LOW,
+            }
+            for title in ("old", "recent")
+        ]
+    )
+    await tasks.add_assignees([old.id], [bob])
+
+    cutoff = await archive.get_cutoff(timedelta(days=90))
+    await db.execute(
+        update(Task)
+        .where(Task.id == old.id)
+        .values(updated_at=cutoff - timedelta(days=1))
+    )
+    assert await archive.ensure_partitions(cutoff)
+    assert await archive.archive_batch(cutoff, limit=10) == 1
+
+    return old.id
+
+
+async def test_archived_task_is_still_found(db, users, archived_task_id):
+    tasks = TaskRepository(db)
+
+    task = await tasks.get_by_id(archived_task_id)
+    assert isinstance(task, ArchivedTask)
+    assert [user.id for user in task.assignees] == [users[1]]
+    assert await tasks.get_version(archived_task_id) == task.version
+
+
+async def test_listings_and_exports_include_archived_tasks(db, users, archived_task_id):
+    tasks = TaskRepository(db)
+
+    listed = await tasks.list(10)
+    assert [task.title for task in listed] == ["recent", "old"]
+    assert listed[1].id == archived_task_id
+    assert await tasks.list(10, status=StatusEnum.TODO) == []
+
+    exported = [row async for rows in tasks.export(1) for row in rows]
+    assert [(row.title, row.assignee_ids) for row in exported] == [
+        ("old", [users[1]]),
+        ("recent", None),
+    ]
+
+
+async def test_archived_tasks_keep_counting(db, archived_task_id):
+    assert await TaskCounterRepository(db).find_mismatches() == []
+
+
+async def test_archived_tasks_cannot_be_changed(client, auth, users, archived_task_id):
+    path = f"/api/v1/tasks/{archived_task_id}"
+
+    response = await client.put(
+        path, json={"title": "x"}, headers=auth(users[0], RoleEnum.MANAGER)
+    )
+    assert response.status_code == 404
+    response = await client.delete(path, headers=auth(users[0], RoleEnum.ADMIN))
+    assert response.status_code == 404
+    response = await client.get(path, headers=auth(users[0]))
+    assert response.status_code == 200
@@ -0,0 +1,106 @@
+import pytest
+
+from app.db.common.enums import PriorityEnum, RoleEnum, StatusEnum
+from app.repositories.task import TaskRepository
+from app.services.exceptions.task import TaskNotFoundException
+from app.services.exceptions.user import UserNotFoundError
+from app.services.task import TaskService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def task_ids(db, users) -> list[int]:
+    tasks = await TaskRepository(db).create_many(
+        [
+            {
+                "title": f"task {i}",
+                "responsible_person_id": users[0],
+                "status": StatusEnum.TODO,
+                "priority": PriorityEnum.LOW,
+            }
+            for i in range(2)
+        ]
+    )
+    return [task.id for task in tasks]
+
+
+async def test_assignment_is_a_set_operation(db, users, task_ids):
+    tasks = TaskRepository(db)
+    alice, bob, carol = users
+
+    await tasks.add_assignees(task_ids, [alice, bob])
+    # Assigning again is not an error and adds no duplicates
+    await tasks.add_assignees(task_ids, [bob, carol])
+    assert await tasks.get_assignee_ids(task_ids) == {
+        task_ids[0]: [alice, bob, carol],
+        task_ids[1]: [alice, bob, carol],
+    }
+
+    await tasks.remove_assignees([task_ids[0]], [alice, carol])
+    await tasks.remove_assignees([task_ids[0]], [alice])
+    assert await tasks.get_assignee_ids(task_ids) == {
+        task_ids[0]: [bob],
+        task_ids[1]: [alice, bob, carol],
+    }
+
+
+async def test_assign_users_reports_skipped_ids(db, users, task_ids):
+    service = TaskService(db)
+    missing_task_id, missing_user_id = max(task_ids) + 1, max(users) + 1
+
+    assignees, skipped_task_ids, skipped_user_ids = await service.assign_users(
+        [task_ids[0], missing_task_id], [users[1], missing_user_id]
+    )
+    assert assignees == {task_ids[0]: [users[1]]}
+    assert (skipped_task_ids, skipped_user_ids) == (
+        [missing_task_id],
+        [missing_user_id],
+    )
+
+    assignees, skipped_task_ids, skipped_user_ids = await service.unassign_users(
+        [task_ids[0]], [users[1], missing_user_id]
+    )
+    assert assignees == {task_ids[0]: []}
+    assert (skipped_task_ids, skipped_user_ids) == ([], [missing_user_id])
+
+
+async def test_assign_task_checks_both_ids(db, users, task_ids):
+    service = TaskService(db)
+
+    with pytest.raises(TaskNotFoundException):
+        await service.assign_task(max(task_ids) + 1, users[1])
+    with pytest.raises(UserNotFoundError):
+        await service.assign_task(task_ids[0], max(users) + 1)
+
+    task = await service.assign_task(task_ids[0], users[1])
+    assert task.assignee_ids == (users[1],)
+
+
+async def test_assign_endpoints(client, auth, users, task_ids):
+    headers = auth(users[0], RoleEnum.MANAGER)
+
+    response = await client.post(
+        f"/api/v1/tasks/{task_ids[0]}/assign/{max(users) + 1}", headers=headers
+    )
+    assert response.status_code == 404
+    response = await client.post(
+        f"/api/v1/tasks/{max(task_ids) + 1}/assign/{users[1]}", headers=headers
+    )
+    assert response.status_code == 404
+
+    response = await client.post(
+        "/api/v1/tasks/assign",
+        json={"task_ids": [*task_ids, max(task_ids) + 1], "user_ids": [users[1]]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(body["items"], key=lambda item: item["task_id"]) == [
+        {"task_id": task_ids[0], "assignee_ids": [users[1]]},
+        {"task_id": task_ids[1], "assignee_ids": [users[1]]},
+    ]
+    assert (body["skipped_task_ids"], body["skipped_user_ids"]) == (
+        [max(task_ids) + 1],
+        [],
+    )
@@ -0,0 +1,80 @@
+import pytest
+
+from app.db.common.enums import RoleEnum
+from app.settings.config import get_config
+
+pytestmark = pytest.mark.anyio
+
+
+def new_task(title: str, **fields) -> dict:
+    return {
+        "title": title,
+        "description": "",
+        "status": "TODO",
+        "priority": "Low",
+        **fields,
+    }
+
+
+async def test_bulk_create_reports_invalid_items(client, auth, users):
+    response = await client.post(
+        "/api/v1/tasks/bulk",
+        json=[
+            new_task("first"),
+            new_task("bad status", status="Later"),
+            {"title": "no status"},
+            new_task("last"),
+        ],
+        headers=auth(users[0]),
+    )
+    assert response.status_code == 200
+
+    body = response.json()
+    assert [task["title"] for task in body["items"]] == ["first", "last"]
+    assert {task["responsible_person_id"] for task in body["items"]} == {users[0]}
+    assert [error["index"] for error in body["errors"]] == [1, 2]
+    assert "status" in body["errors"][0]["detail"]
+    assert "priority" in body["errors"][1]["detail"]
+
+
+async def test_bulk_update_reports_missing_and_duplicate_ids(client, auth, users):
+    created = await client.post(
+        "/api/v1/tasks/bulk",
+        json=[new_task("one"), new_task("two")],
+        headers=auth(users[0]),
+    )
+    one, two = (task["id"] for task in created.json()["items"])
+
+    response = await client.patch(
+        "/api/v1/tasks/bulk",
+        json=[
+            {"id": one, "status": "Done"},
+            {"id": 0, "title": "missing"},
+            {"id": one, "title": "again"},
+            {"id": two, "priority": "Urgent"},
+            {"id": two, "title": "renamed"},
+        ],
+        headers=auth(users[0], RoleEnum.MANAGER),
+    )
+    assert response.status_code == 200
+
+    body = response.json()
+    assert sorted(
+        (task["id"], task["title"], task["status"]) for task in body["items"]
+    ) == [
+        (one, "one", "Done"),
+        (two, "renamed", "TODO"),
+    ]
+    missing, duplicate, invalid = body["errors"]
+    assert missing == {"index": 1, "detail": "Task with id 0 not found"}
+    assert duplicate == {"index": 2, "detail": "Duplicate task id in batch"}
+    assert invalid["index"] == 3 and "priority" in invalid["detail"]
+
+
+async def test_bulk_requests_are_capped(client, auth, users):
+    response = await client.post(
+        "/api/v1/tasks/bulk",
+        json=[new_task(str(i)) for i in range(get_config().TASK_BULK_MAX_SIZE + 1)],
+        headers=auth(users[0]),
+    )
+    assert response.status_code == 422
@@ -0,0 +1,165 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from redis.asyncio import Redis
+from sqlalchemy import update
+
+from app.db.common.enums import PriorityEnum, StatusEnum
+from app.db.models.task import Task
+from app.repositories.task import TaskRepository
+from app.services import task_cache as task_cache_module
+from app.services.task import TaskService
+from app.services.task_cache import (
+    CachedTask,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    TaskCache,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def cached_task(id: int, title: str = "task") -> CachedTask:
+    return CachedTask(
+        id=id,
+        title=title,
+        description=None,
+        status=StatusEnum.TODO,
+        priority=PriorityEnum.LOW,
+        responsible_person_id=1,
+        assignee_ids=(2, 3),
+        version=1,
+        created_at=datetime(2026, 1, 1),
+        updated_at=datetime(2026, 1, 2, 3, 4, 5, 6),
+    )
+
+
+class Loader:
+    """Counts loads, each of which waits until `release` is set"""
+
+    def __init__(self, task: CachedTask | None) -> None:
+        self.task = task
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> CachedTask | None:
+        self.calls += 1
+        await self.release.wait()
+        return self.task
+
+
+def test_cached_task_round_trip():
+    assert CachedTask.loads(cached_task(1).dumps()) == cached_task(1)
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = TaskCache(MemoryCacheBackend(10), ttl=30)
+    load = Loader(cached_task(1))
+
+    readers = [asyncio.create_task(cache.get_or_load(1, load)) for _ in range(10)]
+    await asyncio.sleep(0)
+    load.release.set()
+
+    assert await asyncio.gather(*readers) == [cached_task(1)] * 10
+    assert await cache.get_or_load(1, load) == cached_task(1)
+    assert load.calls == 1
+
+
+async def test_task_invalidated_while_loading_is_not_stored():
+    cache = TaskCache(MemoryCacheBackend(10), ttl=30)
+    load = Loader(cached_task(1, "before"))
+
+    reader = asyncio.create_task(cache.get_or_load(1, load))
+    await asyncio.sleep(0)
+    await cache.invalidate(1)
+    load.release.set()
+
+    assert (await reader).title == "before"
+    assert await cache.backend.get("task:1") is None
+
+
+async def test_waiters_load_themselves_when_the_first_reader_goes_away():
+    cache = TaskCache(MemoryCacheBackend(10), ttl=30)
+    load = Loader(cached_task(1))
+
+    first = asyncio.create_task(cache.get_or_load(1, load))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(cache.get_or_load(1, load))
+    await asyncio.sleep(0)
+    first.cancel()
+    load.release.set()
+
+    assert await second == cached_task(1)
+    assert load.calls == 2
+
+
+async def test_memory_backend_expires_and_evicts(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(task_cache_module.time, "monotonic", lambda: now)
+    backend = MemoryCacheBackend(max_size=2)
+
+    await backend.set("a", b"a", ttl=10)
+    await backend.set("b", b"b", ttl=60)
+    await backend.get("a")
+    await backend.set("c", b"c", ttl=60)
+    assert await backend.get("b") is None
+
+    now += 30
+    assert await backend.get("a") is None
+    assert await backend.get("c") == b"c"
+
+
+def test_memory_backend_is_refused_with_several_workers(monkeypatch):
+    monkeypatch.setattr(task_cache_module.config, "TASK_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(task_cache_module.config, "WEB_CONCURRENCY", 4)
+
+    with pytest.raises(RuntimeError):
+        task_cache_module._task_cache_backend()
+
+
+async def test_redis_backend(redis_client):
+    cache = TaskCache(RedisCacheBackend(redis_client), ttl=30)
+    load = Loader(cached_task(7))
+    load.release.set()
+
+    assert await cache.get_or_load(7, load) == cached_task(7)
+    assert 0 < await redis_client.pttl("task:7") <= 30_000
+    assert await cache.get_or_load(7, load) == cached_task(7)
+    assert load.calls == 1
+
+    await cache.invalidate(7)
+    assert await redis_client.get("task:7") is None
+
+
+async def test_unreachable_redis_reads_through():
+    client = Redis.from_url("redis://127.0.0.1:1/0", socket_connect_timeout=1)
+    cache = TaskCache(RedisCacheBackend(client), ttl=30)
+    load = Loader(cached_task(7))
+    load.release.set()
+
+    assert await cache.get_or_load(7, load) == cached_task(7)
+    await cache.invalidate(7)
+    assert load.calls == 1
+
+
+async def test_service_writes_invalidate_cached_tasks(db, users):
+    service = TaskService(db)
+    service.task_cache = TaskCache(MemoryCacheBackend(10), ttl=30)
+    task = await TaskRepository(db).create(
+        "before", None, users[0], StatusEnum.TODO, PriorityEnum.LOW
+    )
+    assert (await service.get_task_by_id(task.id)).title == "before"
+
+    # Changed behind the cache's back, so reads keep the cached state
+    await db.execute(update(Task).where(Task.id == task.id).values(title="hidden"))
+    assert (await service.get_task_by_id(task.id)).title == "before"
+
+    await service.update_task(task.id, description="changed")
+    assert (await service.get_task_by_id(task.id)).title == "hidden"
+
+    await service.assign_task(task.id, users[1])
+    assert (await service.get_task_by_id(task.id)).assignee_ids == (users[1],)
+
+    await service.delete_task(task.id)
+    assert await service.task_cache.backend.get(f"task:{task.id}") is None
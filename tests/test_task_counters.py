@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import update
+
+from app.db.common.enums import PriorityEnum, StatusEnum, TaskRoleEnum
+from app.db.models.task_counter import TaskCounter
+from app.repositories.task import TaskRepository
+from app.repositories.task_counter import TaskCounterRepository
+from app.services.exceptions.user import UserNotFoundError
+from app.services.task import TaskService
+
+pytestmark = pytest.mark.anyio
+
+
+def counts(counters) -> dict[tuple, int]:
+    return {
+        (counter.role, counter.status, counter.priority): counter.count
+        for counter in counters
+    }
+
+
+async def test_counters_follow_writes(db, users):
+    alice, bob, carol = users
+    tasks = TaskRepository(db)
+    counters = TaskCounterRepository(db)
+
+    first, second = await tasks.create_many(
+        [
+            {
+                "title": "first",
+                "responsible_person_id": alice,
+                "status": StatusEnum.TODO,
+                "priority": PriorityEnum.HIGH,
+            },
+            {
+                "title": "second",
+                "responsible_person_id": alice,
+                "status": StatusEnum.TODO,
+                "priority": PriorityEnum.HIGH,
+            },
+        ]
+    )
+    await tasks.add_assignees([first.id, second.id], [bob, carol])
+    await tasks.update(first.id, status=StatusEnum.DONE)
+    await tasks.remove_assignees([second.id], [carol])
+    await tasks.delete(second.id)
+
+    assert counts(await counters.get_for_user(alice)) == {
+        (TaskRoleEnum.RESPONSIBLE, StatusEnum.DONE, PriorityEnum.HIGH): 1,
+    }
+    assert counts(await counters.get_for_user(bob)) == {
+        (TaskRoleEnum.ASSIGNEE, StatusEnum.DONE, PriorityEnum.HIGH): 1,
+    }
+    assert await counters.find_mismatches() == []
+
+
+async def test_repair_fixes_drifted_counters(db, users):
+    alice = users[0]
+    tasks = TaskRepository(db)
+    counters = TaskCounterRepository(db)
+    await tasks.create("task", None, alice, StatusEnum.TODO, PriorityEnum.LOW)
+
+    await db.execute(
+        update(TaskCounter)
+        .where(TaskCounter.user_id == alice)
+        .values(count=TaskCounter.count + 5)
+    )
+    [mismatch] = await counters.find_mismatches()
+    assert (mismatch.user_id, mismatch.stored, mismatch.actual) == (alice, 6, 1)
+
+    assert await counters.repair() == 1
+    assert await counters.find_mismatches() == []
+    db.expire_all()
+    assert counts(await counters.get_for_user(alice)) == {
+        (TaskRoleEnum.RESPONSIBLE, StatusEnum.TODO, PriorityEnum.LOW): 1,
+    }
+
+
+async def test_task_stats(db, users):
+    alice, bob, _ = users
+    service = TaskService(db)
+    task = await service.create_task(
+        "task", None, alice, StatusEnum.IN_PROGRESS, PriorityEnum.MEDIUM
+    )
+    await service.assign_users([task.id], [bob])
+
+    assert await service.get_task_stats(bob) == {
+        TaskRoleEnum.RESPONSIBLE: [],
+        TaskRoleEnum.ASSIGNEE: [
+            {
+                "status": StatusEnum.IN_PROGRESS,
+                "priority": PriorityEnum.MEDIUM,
+                "count": 1,
+            }
+        ],
+    }
+
+
+async def test_task_stats_of_missing_user(db, users):
+    with pytest.raises(UserNotFoundError):
+        await TaskService(db).get_task_stats(max(users) + 1)
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select, text, update
+
+from app.db.common.enums import PriorityEnum, RoleEnum, StatusEnum
+from app.db.models.associations import task_assignee
+from app.db.models.task import Task
+from app.db.models.task_archive import ArchivedTask
+from app.repositories.task import TaskRepository
+from app.repositories.task_archive import TaskArchiveRepository
+from app.repositories.task_counter import TaskCounterRepository
+from app.services.task import TaskService
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_tasks(db, user_id: int, *statuses: StatusEnum) -> list[int]:
+    tasks = await TaskRepository(db).create_many(
+        [
+            {
+                "title": f"task {i}",
+                "responsible_person_id": user_id,
+                "status": status,
+                "priority": PriorityEnum.LOW,
+            }
+            for i, status in enumerate(statuses)
+        ]
+    )
+    return [task.id for task in tasks]
+
+
+async def archive(db, task_ids: list[int]) -> None:
+    archive = TaskArchiveRepository(db)
+    cutoff = await archive.get_cutoff(timedelta(days=90))
+    await db.execute(
+        update(Task)
+        .where(Task.id.in_(task_ids))
+        .values(updated_at=cutoff - timedelta(days=40))
+    )
+    await archive.ensure_partitions(cutoff)
+    assert await archive.archive_batch(cutoff, limit=len(task_ids)) == len(task_ids)
+    # Only meant for the archive's own transaction, which here is the test's
+    await db.execute(text("SET LOCAL app.skip_task_counters = off"))
+
+
+async def test_delete_cascades_to_assignees(db, users):
+    tasks = TaskRepository(db)
+    task_id, other_id = await create_tasks(
+        db, users[0], StatusEnum.TODO, StatusEnum.TODO
+    )
+    await tasks.add_assignees([task_id, other_id], users[1:])
+
+    assert await tasks.delete(task_id)
+    assert not await tasks.delete(task_id)
+
+    assignments = await db.execute(
+        select(task_assignee.c.task_id, func.count()).group_by(task_assignee.c.task_id)
+    )
+    assert assignments.all() == [(other_id, 2)]
+    assert await TaskCounterRepository(db).find_mismatches() == []
+
+
+async def test_delete_many_takes_a_limited_batch(db, users):
+    todo = await create_tasks(db, users[0], *[StatusEnum.TODO] * 3)
+    done = await create_tasks(db, users[0], StatusEnum.DONE)
+
+    deleted = await TaskRepository(db).delete_many(2, status=StatusEnum.TODO)
+
+    assert len(deleted) == 2 and set(deleted) < set(todo)
+    remaining = await db.scalars(select(Task.id).order_by(Task.id))
+    assert set(remaining) == set(todo) - set(deleted) | set(done)
+
+
+async def test_purge_runs_batches_until_done(db, users):
+    await create_tasks(db, users[0], *[StatusEnum.TODO] * 5, StatusEnum.DONE)
+
+    purged = await TaskService(db).purge_tasks(2, status=StatusEnum.TODO)
+
+    assert purged == 5
+    assert list(await db.scalars(select(Task.status))) == [StatusEnum.DONE]
+
+
+async def test_purge_includes_archived_tasks(db, users):
+    alice, bob, _ = users
+    archived = await create_tasks(db, alice, StatusEnum.DONE, StatusEnum.DONE)
+    await TaskRepository(db).add_assignees(archived, [bob])
+    await archive(db, archived)
+    await create_tasks(db, alice, StatusEnum.DONE, StatusEnum.TODO)
+    service = TaskService(db)
+
+    assert await service.purge_tasks(10, status=StatusEnum.TODO) == 1
+    assert await db.scalar(select(func.count()).select_from(ArchivedTask)) == 2
+
+    later = await db.scalar(select(func.localtimestamp() + timedelta(minutes=1)))
+    assert await service.purge_tasks(1, updated_before=later) == 3
+    assert await db.scalar(select(func.count()).select_from(ArchivedTask)) == 0
+    assert await db.scalar(select(func.count()).select_from(Task)) == 0
+
+    counters = TaskCounterRepository(db)
+    assert await counters.find_mismatches() == []
+    for user_id in (alice, bob):
+        assert all(c.count == 0 for c in await counters.get_for_user(user_id))
+
+
+async def test_purge_endpoint_requires_a_filter(client, db, auth, users):
+    await create_tasks(db, users[0], StatusEnum.TODO, StatusEnum.DONE)
+    headers = auth(users[0], RoleEnum.ADMIN)
+
+    response = await client.delete("/api/v1/tasks", headers=headers)
+    assert response.status_code == 422
+
+    response = await client.delete(
+        "/api/v1/tasks", params={"status": StatusEnum.DONE.value}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json() == {"deleted": 1}
+    assert list(await db.scalars(select(Task.status))) == [StatusEnum.TODO]
@@ -0,0 +1,82 @@
+import pytest
+
+from app.db.common.enums import PriorityEnum, RoleEnum, StatusEnum
+from app.repositories.task import TaskRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def task_id(db, users) -> int:
+    task = await TaskRepository(db).create(
+        "task", None, users[0], StatusEnum.TODO, PriorityEnum.LOW
+    )
+    return task.id
+
+
+async def test_get_answers_304_for_a_matching_etag(client, auth, users, task_id):
+    headers = auth(users[0])
+
+    response = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag == f'"{task_id}-1"'
+
+    for if_none_match in (etag, f'"other", W/{etag}', "*"):
+        response = await client.get(
+            f"/api/v1/tasks/{task_id}",
+            headers={**headers, "If-None-Match": if_none_match},
+        )
+        assert (response.status_code, response.headers["ETag"]) == (304, etag)
+
+    response = await client.get(
+        f"/api/v1/tasks/{task_id}",
+        headers={**headers, "If-None-Match": f'"{task_id}-0"'},
+    )
+    assert response.status_code == 200
+
+
+async def test_get_missing_task(client, auth, users, task_id):
+    headers = auth(users[0])
+
+    response = await client.get(f"/api/v1/tasks/{task_id + 1}", headers=headers)
+    assert response.status_code == 404
+    response = await client.get(
+        f"/api/v1/tasks/{task_id + 1}", headers={**headers, "If-None-Match": "*"}
+    )
+    assert response.status_code == 404
+
+
+async def test_put_honours_if_match(client, auth, users, task_id):
+    headers = auth(users[0], RoleEnum.MANAGER)
+
+    response = await client.put(
+        f"/api/v1/tasks/{task_id}",
+        json={"title": "renamed"},
+        headers={**headers, "If-Match": f'"{task_id}-1"'},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{task_id}-2"'
+
+    # Stale, weak, or naming another task
+    for if_match in (f'"{task_id}-1"', f'W/"{task_id}-2"', f'"{task_id + 1}-2"'):
+        response = await client.put(
+            f"/api/v1/tasks/{task_id}",
+            json={"title": "stale"},
+            headers={**headers, "If-Match": if_match},
+        )
+        assert response.status_code == 412
+
+    response = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert response.json()["title"] == "renamed"
+
+
+async def test_put_with_a_stale_version_in_the_body(client, auth, users, task_id):
+    headers = auth(users[0], RoleEnum.MANAGER)
+    await client.put(f"/api/v1/tasks/{task_id}", json={"title": "a"}, headers=headers)
+
+    response = await client.put(
+        f"/api/v1/tasks/{task_id}", json={"title": "b", "version": 1}, headers=headers
+    )
+    assert response.status_code == 409
+    assert response.headers["ETag"] == f'"{task_id}-2"'
@@ -0,0 +1,88 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+import app.services.task_export
+from app.db.common.enums import PriorityEnum, StatusEnum
+from app.repositories.task import TaskRepository
+from app.services.task_export import EXPORT_FIELDS, stream_task_export
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def task_ids(db, users, session_database, monkeypatch) -> list[int]:
+    monkeypatch.setattr(app.services.task_export, "database", session_database)
+    tasks = TaskRepository(db)
+    created = await tasks.create_many(
+        [
+            {
+                "title": title,
+                "description": description,
+                "responsible_person_id": users[0],
+                "status": status,
+                "priority": PriorityEnum.HIGH,
+            }
+            for title, description, status in [
+                ("first", 'Quotes " and, commas\nand lines', StatusEnum.TODO),
+                ("second", None, StatusEnum.DONE),
+            ]
+        ]
+    )
+    await tasks.add_assignees([created[0].id], [users[2], users[1]])
+    return [task.id for task in created]
+
+
+async def export(client, auth, users, **params) -> tuple[bytes, dict]:
+    async with client.stream(
+        "GET", "/api/v1/tasks/export", params=params, headers=auth(users[0])
+    ) as response:
+        assert response.status_code == 200
+        return b"".join([chunk async for chunk in response.aiter_raw()]), dict(
+            response.headers
+        )
+
+
+async def test_ndjson_export(client, auth, users, task_ids):
+    body, headers = await export(client, auth, users)
+
+    assert headers["content-disposition"] == 'attachment; filename="tasks.ndjson"'
+    records = [json.loads(line) for line in body.decode().splitlines()]
+    assert [record["id"] for record in records] == task_ids
+    assert list(records[0]) == list(EXPORT_FIELDS)
+    assert records[0]["status"] == "TODO" and records[0]["priority"] == "High"
+    assert records[0]["assignee_ids"] == sorted(users[1:])
+    assert records[1]["description"] is None and records[1]["assignee_ids"] == []
+
+
+async def test_csv_export(client, auth, users, task_ids):
+    body, _ = await export(client, auth, users, format="csv", status="Done")
+
+    rows = list(csv.DictReader(io.StringIO(body.decode(), newline="")))
+    assert [int(row["id"]) for row in rows] == task_ids[1:]
+
+    body, _ = await export(client, auth, users, format="csv")
+    first, second = csv.DictReader(io.StringIO(body.decode(), newline=""))
+    assert first["description"] == 'Quotes " and, commas\nand lines'
+    assert first["assignee_ids"] == " ".join(map(str, sorted(users[1:])))
+    assert second["description"] == second["assignee_ids"] == ""
+
+
+async def test_gzip_export(client, auth, users, task_ids):
+    plain, _ = await export(client, auth, users, format="csv")
+    compressed, headers = await export(client, auth, users, format="csv", gzip=True)
+
+    assert headers["content-encoding"] == "gzip"
+    assert gzip.decompress(compressed) == plain
+
+
+async def test_export_streams_one_chunk_per_batch(task_ids):
+    chunks = [chunk async for chunk in stream_task_export("ndjson", False, 1)]
+    assert len(chunks) == 2
+
+    chunks = [chunk async for chunk in stream_task_export("csv", False, 1)]
+    assert chunks[0] == (",".join(EXPORT_FIELDS) + "\r\n").encode()
+    assert len(chunks) == 3
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import asyncpg
+import pytest
+
+from app.repositories.task import TASK_CHANGES_CHANNEL
+from app.services.task_feed import (
+    RESYNC_EVENT,
+    TaskFeed,
+    TaskFeedFilter,
+    feed_dropped_total,
+    stream_task_events,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def event(task_id: int = 1, responsible: int = 1, assignees=(), users=None) -> dict:
+    return {
+        "op": "updated",
+        "task_id": task_id,
+        "responsible_person_id": responsible,
+        "status": "Done",
+        "priority": "Low",
+        "assignee_ids": list(assignees),
+        "user_ids": users,
+    }
+
+
+def test_filters():
+    everything = TaskFeedFilter()
+    assert everything.matches(event())
+
+    tasks = TaskFeedFilter(task_ids=frozenset({1, 2}))
+    assert tasks.matches(event(task_id=2)) and not tasks.matches(event(task_id=3))
+
+    responsible = TaskFeedFilter(responsible_person_id=5)
+    assert responsible.matches(event(responsible=5))
+    assert not responsible.matches(event(responsible=6))
+
+    assignee = TaskFeedFilter(assignee_id=7)
+    assert assignee.matches(event(assignees=[3, 7]))
+    # Unassigning is only visible through user_ids
+    assert assignee.matches(event(assignees=[3], users=[7]))
+    assert not assignee.matches(event(assignees=[3], users=[8]))
+
+    combined = TaskFeedFilter(task_ids=frozenset({1}), responsible_person_id=5)
+    assert not combined.matches(event(task_id=1, responsible=6))
+    assert combined.matches(RESYNC_EVENT)
+
+
+async def test_slow_subscribers_are_dropped():
+    feed = TaskFeed(dsn="", queue_size=2)
+    slow = feed.subscribe(TaskFeedFilter())
+    fast = feed.subscribe(TaskFeedFilter())
+    other = feed.subscribe(TaskFeedFilter(task_ids=frozenset({2})))
+    dropped = feed_dropped_total.get()
+
+    for _ in range(3):
+        feed.publish(event())
+        await fast.get()
+
+    assert feed.subscriptions == {fast, other}
+    assert feed_dropped_total.get() == dropped + 1
+    # Whatever the slow one had not read is skipped
+    assert await slow.get() is None
+    assert other.queue.empty()
+
+
+async def test_notifications_are_decoded_once(caplog):
+    feed = TaskFeed(dsn="")
+    subscription = feed.subscribe(TaskFeedFilter())
+    payload = {**event(), "status": "IN_PROGRESS", "priority": "HIGHEST"}
+
+    feed._on_notification(None, 0, TASK_CHANGES_CHANNEL, "not json")
+    feed._on_notification(None, 0, TASK_CHANGES_CHANNEL, json.dumps(payload))
+
+    received = json.loads(await subscription.get())
+    assert (received["status"], received["priority"]) == ("In progress", "Highest")
+    assert subscription.queue.empty()
+    assert "Ignoring malformed task change" in caplog.text
+
+
+async def test_event_stream():
+    feed = TaskFeed(dsn="", queue_size=1)
+    stream = stream_task_events(feed, TaskFeedFilter(), heartbeat=0.01)
+
+    assert await anext(stream) == ": keepalive\n\n"
+    feed.publish(event())
+    assert await anext(stream) == f"event: task\ndata: {json.dumps(event())}\n\n"
+
+    feed.publish(event())
+    feed.publish(event())
+    assert await anext(stream) == "event: dropped\ndata: {}\n\n"
+    with pytest.raises(StopAsyncIteration):
+        await anext(stream)
+    assert feed.subscriptions == set()
+
+
+async def test_feed_listens_to_postgres(database_url):
+    dsn = database_url.replace("+asyncpg", "", 1)
+    feed = TaskFeed(dsn=dsn)
+    subscription = feed.subscribe(TaskFeedFilter(task_ids=frozenset({1})))
+    connection = await asyncpg.connect(dsn)
+    feed.start()
+    try:
+        payload = json.dumps({**event(), "status": "DONE", "priority": "LOW"})
+        # Notify until the listener is connected
+        received = None
+        for _ in range(100):
+            await connection.execute(
+                "SELECT pg_notify($1, $2)", TASK_CHANGES_CHANNEL, payload
+            )
+            try:
+                received = await asyncio.wait_for(subscription.get(), 0.05)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+        assert json.loads(received) == event()
+    finally:
+        await connection.close()
+        await feed.stop()
+
+    assert await subscription.get() is None
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+import app.api.v1.task
+from app.db.models.associations import task_assignee
+from app.db.models.task import Task
+
+pytestmark = pytest.mark.anyio
+
+
+async def upload(client, auth, user_id: int, filename: str, content: bytes, **params):
+    response = await client.post(
+        "/api/v1/tasks/import",
+        params=params,
+        files={"file": (filename, content)},
+        headers=auth(user_id),
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_ndjson_import_reports_rejected_rows(client, db, auth, users):
+    alice, bob, _ = users
+    lines = [
+        {"title": "ok", "status": "TODO", "priority": "Low", "assignee_ids": [bob]},
+        "{not json",
+        "",
+        ["not", "an", "object"],
+        {"status": "TODO", "priority": "Low"},
+        {"title": "nobody", "status": "Done", "priority": "Low", "assignee_ids": [0]},
+        {"title": "also ok", "status": "Done", "priority": "High"},
+    ]
+    content = "\n".join(
+        line if isinstance(line, str) else json.dumps(line) for line in lines
+    )
+
+    body = await upload(client, auth, alice, "tasks.ndjson", content.encode())
+
+    assert body["imported"] == 2
+    assert body["rejected_count"] == 4
+    assert [error["row"] for error in body["rejected"]] == [2, 3, 4, 5]
+    assert body["rejected"][0]["detail"].startswith("Invalid JSON")
+    assert body["rejected"][1]["detail"] == "Expected an object"
+    assert "title" in body["rejected"][2]["detail"]
+    assert body["rejected"][3]["detail"] == "assignee_ids: unknown user"
+
+    tasks = (await db.execute(select(Task.title, Task.responsible_person_id))).all()
+    assert sorted(tasks) == [("also ok", alice), ("ok", alice)]
+    assert list(await db.scalars(select(task_assignee.c.user_id))) == [bob]
+
+
+async def test_csv_import(client, db, auth, users):
+    alice, bob, carol = users
+    content = (
+        "title,description,status,priority,assignee_ids\r\n"
+        f"first,,TODO,Low,{bob} {carol}\r\n"
+        "second,Has a description,Later,Low,\r\n"
+        'third,"Quoted, with a comma",Done,High,,extra\r\n'
+    )
+
+    body = await upload(client, auth, alice, "tasks.csv", content.encode())
+
+    assert (body["imported"], body["rejected_count"]) == (2, 1)
+    assert body["rejected"][0]["row"] == 2
+    assert "status" in body["rejected"][0]["detail"]
+
+    tasks = await db.execute(select(Task.title, Task.description).order_by(Task.id))
+    assert tasks.all() == [("first", None), ("third", "Quoted, with a comma")]
+    assignees = await db.scalars(select(task_assignee.c.user_id).order_by("user_id"))
+    assert list(assignees) == [bob, carol]
+
+
+async def test_rejected_rows_reported_are_capped(client, auth, users, monkeypatch):
+    monkeypatch.setattr(app.api.v1.task.config, "TASK_IMPORT_MAX_REJECTED", 2)
+    content = b"\n".join(b"[]" for _ in range(5))
+
+    body = await upload(client, auth, users[0], "tasks.txt", content, format="ndjson")
+
+    assert body == {
+        "imported": 0,
+        "rejected_count": 5,
+        "rejected": [
+            {"row": 1, "detail": "Expected an object"},
+            {"row": 2, "detail": "Expected an object"},
+        ],
+    }
+
+
+async def test_uploads_must_be_utf8(client, auth, users):
+    response = await client.post(
+        "/api/v1/tasks/import",
+        files={"file": ("tasks.csv", "title\r\nCaf\xe9\r\n".encode("latin-1"))},
+        headers=auth(users[0]),
+    )
+    assert response.status_code == 400
@@ -0,0 +1,77 @@
+import pytest
+
+from app.db.common.enums import PriorityEnum, StatusEnum
+from app.repositories.task import TaskRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def task_ids(db, users) -> dict[str, int]:
+    tasks = await TaskRepository(db).create_many(
+        [
+            {
+                "title": title,
+                "description": description,
+                "responsible_person_id": users[0],
+                "status": StatusEnum.TODO,
+                "priority": PriorityEnum.LOW,
+            }
+            for title, description in [
+                ("Fix the invoice dashboard", "Totals are off"),
+                ("Update dependencies", "The dashboard build is failing"),
+                ("Write release notes", None),
+            ]
+        ]
+    )
+    return {task.title: task.id for task in tasks}
+
+
+async def test_title_matches_rank_above_description_matches(db, task_ids):
+    hits = await TaskRepository(db).search("dashboard", 10)
+
+    assert [task.id for task, _ in hits] == [
+        task_ids["Fix the invoice dashboard"],
+        task_ids["Update dependencies"],
+    ]
+    assert hits[0][1] > hits[1][1] > 0
+
+
+async def test_misspelled_titles_still_match(db, task_ids):
+    hits = await TaskRepository(db).search("relase notes", 10)
+
+    assert [task.id for task, _ in hits] == [task_ids["Write release notes"]]
+    assert await TaskRepository(db).search("kubernetes", 10) == []
+
+
+async def test_search_pages_through_the_rank_cursor(client, auth, users, task_ids):
+    seen, cursor = [], None
+    while True:
+        params = {"q": "dashboard", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(
+            "/api/v1/tasks/search", params=params, headers=auth(users[0])
+        )
+        assert response.status_code == 200
+
+        page = response.json()
+        seen += [(hit["task"]["id"], hit["rank"]) for hit in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [task_id for task_id, _ in seen] == [
+        task_ids["Fix the invoice dashboard"],
+        task_ids["Update dependencies"],
+    ]
+    assert seen == sorted(seen, key=lambda hit: hit[1], reverse=True)
+
+
+async def test_search_rejects_a_malformed_cursor(client, auth, users):
+    response = await client.get(
+        "/api/v1/tasks/search",
+        params={"q": "dashboard", "cursor": "not-a-cursor"},
+        headers=auth(users[0]),
+    )
+    assert response.status_code == 400
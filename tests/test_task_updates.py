@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete, insert, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.common.enums import PriorityEnum, RoleEnum, StatusEnum
+from app.db.models.task import Task
+from app.db.models.user import User
+from app.repositories.task import TaskRepository
+from app.services.exceptions.task import (
+    TaskNotFoundException,
+    TaskVersionConflictException,
+)
+from app.services.task import TaskService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def task_id(db, users) -> int:
+    task = await TaskRepository(db).create(
+        "task", "details", users[0], StatusEnum.TODO, PriorityEnum.LOW
+    )
+    return task.id
+
+
+async def test_update_with_expected_version(db, task_id):
+    tasks = TaskRepository(db)
+
+    task, version = await tasks.update(task_id, expected_version=1, title="renamed")
+
+    assert (task.title, task.version, version) == ("renamed", 2, 1)
+    assert await tasks.get_version(task_id) == 2
+
+
+async def test_update_version_conflict(db, task_id):
+    tasks = TaskRepository(db)
+    await tasks.update(task_id, title="renamed")
+
+    task, version = await tasks.update(task_id, expected_version=1, title="stale")
+
+    assert (task, version) == (None, 2)
+    assert (await tasks.get_by_id(task_id)).title == "renamed"
+
+
+async def test_update_without_changes_checks_version(db, task_id):
+    tasks = TaskRepository(db)
+
+    task, version = await tasks.update(task_id, expected_version=1)
+    assert (task.id, version) == (task_id, 1)
+    assert await tasks.update(task_id, expected_version=3) == (None, 1)
+
+
+async def test_update_conflicting_with_a_concurrent_commit(database_url):
+    # Needs transactions that really commit, so it cleans up after itself
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessionmaker() as session:
+        user_id = await session.scalar(
+            insert(User)
+            .values(username="concurrent", email="concurrent@example.com", password="x")
+            .returning(User.id)
+        )
+        task = await TaskRepository(session).create(
+            "task", None, user_id, StatusEnum.TODO, PriorityEnum.LOW
+        )
+        await session.commit()
+
+    try:
+        async with sessionmaker() as ours, sessionmaker() as theirs:
+            await TaskRepository(theirs).update(task.id, title="theirs")
+            update = asyncio.create_task(
+                TaskRepository(ours).update(task.id, expected_version=1, title="ours")
+            )
+            # Until our UPDATE waits for their row lock
+            waiting = text("SELECT count(*) FROM pg_locks WHERE NOT granted")
+            while not await theirs.scalar(waiting):
+                await asyncio.sleep(0.01)
+            await theirs.commit()
+
+            assert await asyncio.wait_for(update, 5) == (None, 2)
+    finally:
+        async with sessionmaker() as session:
+            await session.execute(delete(Task).where(Task.id == task.id))
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+        await engine.dispose()
+
+
+async def test_update_missing_task(db, task_id):
+    assert await TaskRepository(db).update(task_id + 1, title="x") == (None, None)
+
+
+async def test_update_many(db, users, task_id):
+    tasks = TaskRepository(db)
+    other = await tasks.create(
+        "other", "details", users[0], StatusEnum.TODO, PriorityEnum.LOW
+    )
+
+    updated = await tasks.update_many(
+        [
+            {"id": task_id, "description": None},
+            {"id": other.id, "status": StatusEnum.DONE},
+            {"id": other.id + 1, "title": "missing"},
+        ]
+    )
+
+    by_id = {task.id: task for task in updated}
+    assert by_id.keys() == {task_id, other.id}
+    assert (by_id[task_id].description, by_id[task_id].version) == (None, 2)
+    assert by_id[task_id].status is StatusEnum.TODO
+    assert (by_id[other.id].description, by_id[other.id].status) == (
+        "details",
+        StatusEnum.DONE,
+    )
+
+
+async def test_update_task_service(db, task_id):
+    service = TaskService(db)
+
+    task = await service.update_task(task_id, expected_version=1, title="renamed")
+    assert task.version == 2
+
+    with pytest.raises(TaskVersionConflictException) as conflict:
+        await service.update_task(task_id, expected_version=1, title="stale")
+    assert conflict.value.current_version == 2
+
+    with pytest.raises(TaskNotFoundException):
+        await service.update_task(task_id + 1, title="missing")
+
+
+async def test_update_tasks_reports_missing_ids(db, task_id):
+    updated, missing_ids = await TaskService(db).update_tasks(
+        [{"id": task_id, "priority": PriorityEnum.HIGH}, {"id": task_id + 1}]
+    )
+
+    assert [task.priority for task in updated] == [PriorityEnum.HIGH]
+    assert missing_ids == [task_id + 1]
+
+
+async def test_missing_task_endpoints(client, auth, users, task_id):
+    missing = f"/api/v1/tasks/{task_id + 1}"
+
+    response = await client.put(
+        missing, json={"title": "x"}, headers=auth(users[0], RoleEnum.MANAGER)
+    )
+    assert response.status_code == 404
+    response = await client.delete(missing, headers=auth(users[0], RoleEnum.ADMIN))
+    assert response.status_code == 404
+    response = await client.put(
+        f"{missing}/status", params={"new_status": "Done"}, headers=auth(users[0])
+    )
+    assert response.status_code == 404
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+import app.services.auth
+from app.services.auth import create_access_token, verify_access_token
+from app.services.token_cache import TokenCache
+
+
+@pytest.fixture
+def now(monkeypatch) -> list[float]:
+    """The clock the cache reads, frozen until a test moves it"""
+    clock = [time.time()]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    return clock
+
+
+def test_entries_expire_with_their_token(now):
+    cache = TokenCache(max_size=10)
+    cache.put("token", {"sub": "alice", "exp": now[0] + 60})
+
+    assert cache.get("token") == {"sub": "alice", "exp": now[0] + 60}
+    now[0] += 60
+    assert cache.get("token") is None
+
+
+def test_tokens_without_a_future_exp_are_not_cached(now):
+    cache = TokenCache(max_size=10)
+    cache.put("no-exp", {"sub": "alice"})
+    cache.put("expired", {"sub": "alice", "exp": now[0]})
+
+    assert cache.get("no-exp") is None
+    assert cache.get("expired") is None
+
+
+def test_least_recently_used_entries_are_evicted(now):
+    cache = TokenCache(max_size=2)
+    for token in ("a", "b"):
+        cache.put(token, {"sub": token, "exp": now[0] + 60})
+
+    assert cache.get("a") is not None
+    cache.put("c", {"sub": "c", "exp": now[0] + 60})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_cached_payloads_cannot_be_changed_by_callers(now):
+    cache = TokenCache(max_size=10)
+    cache.put("token", {"sub": "alice", "exp": now[0] + 60})
+
+    cache.get("token")["sub"] = "mallory"
+    assert cache.get("token")["sub"] == "alice"
+
+
+def test_verified_tokens_are_served_from_the_cache(monkeypatch):
+    cache = TokenCache(max_size=10)
+    monkeypatch.setattr(app.services.auth, "token_cache", cache)
+    token = create_access_token({"sub": "alice"})
+
+    assert verify_access_token(token)["sub"] == "alice"
+    hits = cache.hits
+    assert verify_access_token(token)["sub"] == "alice"
+    assert cache.hits == hits + 1
+
+    assert verify_access_token(token + "x") is None
+    assert cache.get(token + "x") is None
@@ -0,0 +1,110 @@
+import pytest
+from sqlalchemy import event, func, select, text
+
+from app.db.database import Database
+from app.db.models.user import User
+from app.db.unit_of_work import UnitOfWork
+
+pytestmark = pytest.mark.anyio
+
+
+def new_user(name: str) -> User:
+    return User(username=name, email=f"{name}@example.com", password="x")
+
+
+async def count_users(db) -> int:
+    return await db.scalar(select(func.count()).select_from(User))
+
+
+async def test_reads_are_not_writes(db):
+    await db.execute(select(User).limit(1))
+
+    assert not db.sync_session.has_pending_writes
+    await db.commit()
+    assert not db.sync_session.wrote
+
+
+async def test_flushes_and_commits_are_tracked(db):
+    db.add(new_user("alice"))
+    await db.flush()
+    assert db.sync_session.has_pending_writes
+
+    await db.commit()
+    assert not db.sync_session.has_pending_writes
+    assert db.sync_session.wrote
+
+
+async def test_rollback_forgets_pending_writes(db):
+    db.add(new_user("alice"))
+    await db.flush()
+
+    await db.rollback()
+    assert not db.sync_session.has_pending_writes
+    assert not db.sync_session.wrote
+
+
+async def test_commits_once_when_the_outermost_block_exits(db):
+    uow = UnitOfWork(db)
+    commits = []
+    event.listen(db.sync_session, "after_commit", commits.append)
+
+    async with uow:
+        async with uow:
+            db.add(new_user("alice"))
+            await db.flush()
+        assert commits == []
+
+    assert len(commits) == 1
+    assert db.sync_session.wrote
+
+
+async def test_rolls_back_when_the_block_raises(db):
+    uow = UnitOfWork(db)
+    users_before = await count_users(db)
+
+    with pytest.raises(RuntimeError):
+        async with uow:
+            async with uow:
+                db.add(new_user("alice"))
+                await db.flush()
+            raise RuntimeError
+
+    assert await count_users(db) == users_before
+
+
+async def test_block_without_statements_sends_nothing(db):
+    commits = []
+    event.listen(db.sync_session, "after_commit", commits.append)
+
+    async with UnitOfWork(db):
+        pass
+
+    assert commits == []
+
+
+async def test_commits_statements_not_recognised_as_writes(db):
+    # As a SELECT fed by a data-modifying CTE would be
+    async with UnitOfWork(db):
+        await db.execute(select(User).limit(1))
+
+    assert db.sync_session.wrote
+
+
+@pytest.fixture
+async def database(database_url):
+    database = Database(database_url)
+    yield database
+    await database.dispose()
+
+
+async def test_session_commits_only_pending_writes(database):
+    for statement, committed in (
+        (select(1), False),
+        (text("SET LOCAL statement_timeout = 1000"), True),
+    ):
+        commits = []
+        async with database.get_session() as session:
+            event.listen(session.sync_session, "after_commit", commits.append)
+            await session.execute(statement)
+
+        assert len(commits) == committed
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+import app.repositories.user
+from app.db.models.user import User
+from app.repositories.user import UserCache, UserRepository
+
+pytestmark = pytest.mark.anyio
+
+
+def user(id: int, username: str) -> User:
+    return User(id=id, username=username, email=f"{username}@example.com")
+
+
+@pytest.fixture
+def cache(monkeypatch) -> UserCache:
+    cache = UserCache(ttl=60, max_size=10)
+    monkeypatch.setattr(app.repositories.user, "user_cache", cache)
+    return cache
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [time.monotonic()]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = UserCache(ttl=60, max_size=10)
+    cache.put(user(1, "alice"))
+
+    assert cache.get_by_username("alice").id == 1
+    now[0] += 60
+    assert cache.get_by_id(1) is None
+    assert cache.get_by_username("alice") is None
+
+
+def test_evicted_users_are_gone_by_username_too():
+    cache = UserCache(ttl=60, max_size=1)
+    cache.put(user(1, "alice"))
+    cache.put(user(2, "bob"))
+
+    assert cache.get_by_username("alice") is None
+    assert cache.get_by_username("bob").id == 2
+
+
+def test_invalidating_by_username_drops_the_entry():
+    cache = UserCache(ttl=60, max_size=10)
+    cache.put(user(1, "alice"))
+
+    cache.invalidate(username="alice")
+    assert cache.get_by_id(1) is None
+
+
+async def test_lookups_are_cached_by_id_and_username(db, users, cache):
+    repository = UserRepository(db)
+
+    alice = await repository.get_by_username("alice")
+    assert cache.get_by_id(users[0]).username == "alice"
+    assert await repository.get_by_id(users[0]) is alice
+    assert await repository.get_by_username("nobody") is None
+
+
+async def test_committed_changes_invalidate_old_and_new_usernames(db, users, cache):
+    await db.commit()
+    repository = UserRepository(db)
+    alice = await repository.get_by_id(users[0])
+
+    alice.username = "alicia"
+    await db.flush()
+    await db.rollback()
+    assert cache.get_by_username("alice") is not None
+
+    alice = await repository.get_by_id(users[0])
+    alice.username = "alicia"
+    await db.commit()
+    assert cache.get_by_id(users[0]) is None
+    assert cache.get_by_username("alice") is None
+
+    assert (await repository.get_by_username("alicia")).id == users[0]